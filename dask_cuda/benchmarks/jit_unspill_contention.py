@@ -0,0 +1,109 @@
+import argparse
+import threading
+from time import perf_counter as clock
+
+from dask.utils import format_bytes, format_time, parse_bytes
+
+from dask_cuda.proxify_host_file import ProxifyHostFile
+
+
+def _worker(dhf, thread_index, args, barrier):
+    import cupy
+
+    keys = [f"t{thread_index}-k{i}" for i in range(args.nkeys)]
+    for key in keys:
+        dhf[key] = cupy.arange(args.size // 8, dtype="int64")
+    barrier.wait()
+    for i in range(args.iterations):
+        key = keys[i % len(keys)]
+        # Simulate a task: fetch an input, use it, and store an output
+        # that refers to the input, which proxifies the existing proxy
+        x = dhf[key]
+        dhf[f"{key}-out"] = [x, len(x)]
+        del dhf[f"{key}-out"]
+
+
+def run_with_threads(args, nthreads):
+    dhf = ProxifyHostFile(
+        device_memory_limit=args.device_memory_limit, memory_limit=args.memory_limit,
+    )
+    barrier = threading.Barrier(nthreads + 1)
+    threads = [
+        threading.Thread(target=_worker, args=(dhf, i, args, barrier))
+        for i in range(nthreads)
+    ]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    t1 = clock()
+    for t in threads:
+        t.join()
+    return clock() - t1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Lock contention of JIT-unspill (ProxifyHostFile) when "
+        "multiple task threads proxify and access proxies concurrently."
+    )
+    parser.add_argument(
+        "--threads",
+        default="1,2,4,8",
+        type=lambda s: [int(n) for n in s.split(",")],
+        help="Comma separated list of the number of threads (default '1,2,4,8').",
+    )
+    parser.add_argument(
+        "--iterations",
+        default=10_000,
+        type=int,
+        help="Number of accesses per thread (default 10000).",
+    )
+    parser.add_argument(
+        "--nkeys", default=10, type=int, help="Number of keys per thread (default 10)."
+    )
+    parser.add_argument(
+        "--size",
+        default="1 KiB",
+        type=parse_bytes,
+        help="Size of each array (default '1 KiB').",
+    )
+    parser.add_argument(
+        "--device-memory-limit",
+        default="1 TiB",
+        type=parse_bytes,
+        help="Device memory limit, set it low to include spilling (default '1 TiB').",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        default="1 TiB",
+        type=parse_bytes,
+        help="Host memory limit (default '1 TiB').",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("JIT-unspill lock contention benchmark")
+    print("-------------------------------")
+    print(f"Iterations per thread | {args.iterations}")
+    print(f"Keys per thread       | {args.nkeys}")
+    print(f"Array size            | {format_bytes(args.size)}")
+    print(f"Device memory limit   | {format_bytes(args.device_memory_limit)}")
+    print(f"Host memory limit     | {format_bytes(args.memory_limit)}")
+    print("===============================")
+    print("Threads | Wall clock | Accesses/s | Speedup")
+    baseline = None
+    for nthreads in args.threads:
+        took = run_with_threads(args, nthreads)
+        rate = nthreads * args.iterations / took
+        if baseline is None:
+            baseline = rate
+        print(
+            f"{nthreads:7} | {format_time(took):>10} | {rate:10.0f} | "
+            f"{rate / baseline:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import gc
+import tracemalloc
+from time import perf_counter as clock
+
+from dask.utils import format_bytes, format_time
+
+from dask_cuda.proxy_object import asproxy
+
+
+def _make_object(backend: str, i: int):
+    if backend == "cupy":
+        import cupy
+
+        return cupy.arange(1) + i
+    else:
+        import numpy
+
+        return numpy.arange(1) + i
+
+
+def measure(args):
+    objs = [_make_object(args.backend, i) for i in range(args.n)]
+    gc.collect()
+    tracemalloc.start()
+    t1 = clock()
+    proxies = [asproxy(o) for o in objs]
+    create_time = clock() - t1
+    nbytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Typical access pattern: a copy-on-write state update and cached lookups
+    t1 = clock()
+    for p in proxies:
+        pxy = p._pxy_get(copy=True)
+        p._pxy_set(pxy)
+        p.__sizeof__()
+        p.__class__
+    access_time = clock() - t1
+    return nbytes / args.n, create_time / args.n, access_time / args.n
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Memory and time overhead of each ProxyObject."
+    )
+    parser.add_argument(
+        "-n", default=100_000, type=int, help="Number of proxies (default 100000)."
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        choices=["numpy", "cupy"],
+        default="numpy",
+        type=str,
+        help="The array library of the proxied objects (default numpy).",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    nbytes, create_time, access_time = measure(args)
+    print("Proxy memory benchmark")
+    print("-------------------------------")
+    print(f"Number of proxies  | {args.n}")
+    print(f"Backend            | {args.backend}")
+    print("===============================")
+    print(f"Memory per proxy   | {format_bytes(int(nbytes))}")
+    print(f"Creation per proxy | {format_time(create_time)}")
+    print(f"Access per proxy   | {format_time(access_time)}")
+
+
+if __name__ == "__main__":
+    main()
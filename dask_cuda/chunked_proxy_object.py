@@ -0,0 +1,301 @@
+import bisect
+import operator
+from typing import Callable, List
+
+import dask
+import dask.array.core
+import dask.dataframe.methods
+from dask.sizeof import sizeof
+from dask.utils import parse_bytes
+
+from .composite_proxy_object import (
+    CompositeProxyObject,
+    ProxiedParts,
+    _composite_proxy_from_parts,
+)
+from .proxy_object import ProxyObject, asproxy, make_meta_dispatch
+
+
+def _is_frame(obj) -> bool:
+    """Whether `obj` is a dataframe or series (or the type of one)"""
+    return hasattr(obj, "iloc")
+
+
+def _take_rows(obj, key):
+    """Index the rows (first axis) of an array or a dataframe"""
+    return obj.iloc[key] if _is_frame(obj) else obj[key]
+
+
+def _concat(parts: list):
+    if _is_frame(parts[0]):
+        return dask.dataframe.methods.concat(parts)
+    return dask.array.core.concatenate_lookup.dispatch(type(parts[0]))(parts)
+
+
+class ProxiedChunks(ProxiedParts):
+    """Rows of an array or a dataframe split into individually proxied chunks
+
+    Parameters
+    ----------
+    proxies: list of ProxyObject
+        The proxies of the chunks ordered by row.
+    lengths: list of int
+        The number of rows in each chunk.
+    """
+
+    __slots__ = ("lengths", "offsets")
+
+    def __init__(self, proxies: List[ProxyObject], lengths: List[int]):
+        assert len(proxies) == len(lengths)
+        super().__init__(proxies)
+        self.lengths = lengths
+        self.offsets = [0]
+        for n in lengths:
+            self.offsets.append(self.offsets[-1] + n)
+
+    def get_state(self) -> dict:
+        return {"lengths": self.lengths}
+
+    def __len__(self) -> int:
+        return self.offsets[-1]
+
+    def assemble(self, obj_type: type, get: Callable):
+        return _concat([get(p) for p in self.proxies])
+
+    def get_rows(self, key: slice, get: Callable):
+        """Return the rows `key` by assembling only the chunks of the rows
+
+        Parameters
+        ----------
+        key: slice
+            Rows to return, the step must be None or 1.
+        get: callable
+            Function that given the proxy of a chunk returns the chunk.
+        """
+        start, stop, _ = key.indices(len(self))
+        ret = []
+        for p, offset, n in zip(self.proxies, self.offsets, self.lengths):
+            if offset + n <= start:
+                continue
+            if offset >= stop and ret:
+                break
+            ret.append(
+                _take_rows(get(p), slice(max(start - offset, 0), max(stop - offset, 0)))
+            )
+        if not ret:  # Empty slice after the last row
+            return _take_rows(get(self.proxies[-1]), slice(0, 0))
+        return _concat(ret) if len(ret) > 1 else ret[0]
+
+
+def _get_rows(chunks: ProxiedChunks, key, take: Callable, get: Callable):
+    """Index `chunks` with `key`, which only assembles the touched chunks
+
+    Returns NotImplemented if `key` might touch all chunks.
+    """
+    rest = ()
+    if isinstance(key, tuple) and len(key) > 0:
+        key, rest = key[0], key[1:]
+    if isinstance(key, slice) and key.step in (None, 1):
+        rows = chunks.get_rows(key, get)
+        return take(rows, (slice(None),) + rest) if rest else rows
+    try:
+        i = operator.index(key)
+    except TypeError:
+        return NotImplemented
+    if i < 0:
+        i += len(chunks)
+    if not 0 <= i < len(chunks):
+        raise IndexError(f"index {key} is out of bounds for length {len(chunks)}")
+    rows = chunks.get_rows(slice(i, i + 1), get)
+    return take(rows, (0,) + rest)
+
+
+def _is_integer(key) -> bool:
+    if isinstance(key, bool):
+        return False
+    try:
+        operator.index(key)
+    except TypeError:
+        return False
+    return True
+
+
+def _set_rows(chunks: ProxiedChunks, key, value, ndim: int) -> bool:
+    """Assign `value` to `key` in place, which only modifies the touched chunks
+
+    Returns False, without assigning anything, if `key` might touch all chunks
+    or if `value` doesn't broadcast to the rows of `key` chunk by chunk.
+    """
+    rest = ()
+    if isinstance(key, tuple) and len(key) > 0:
+        key, rest = key[0], key[1:]
+    if not all(isinstance(k, slice) or _is_integer(k) for k in rest):
+        return False
+    if _is_integer(key):
+        i = operator.index(key)
+        if i < 0:
+            i += len(chunks)
+        if not 0 <= i < len(chunks):
+            raise IndexError(f"index {key} is out of bounds for length {len(chunks)}")
+        c = bisect.bisect_right(chunks.offsets, i) - 1
+        chunks.proxies[c][(i - chunks.offsets[c],) + rest] = value
+        return True
+    if not isinstance(key, slice) or key.step not in (None, 1):
+        return False
+    start, stop, _ = key.indices(len(chunks))
+    nrows = max(stop - start, 0)
+    # The value is split by rows unless it broadcasts along the rows
+    region_ndim = ndim - sum(1 for k in rest if not isinstance(k, slice))
+    value_ndim = getattr(value, "ndim", 0)
+    if value_ndim > region_ndim:
+        return False
+    split = value_ndim == region_ndim and len(value) != 1
+    if split and len(value) != nrows:
+        return False
+    for p, offset, n in zip(chunks.proxies, chunks.offsets, chunks.lengths):
+        lo, hi = max(start - offset, 0), min(stop - offset, n)
+        if lo < hi:
+            v = value[offset + lo - start : offset + hi - start] if split else value
+            p[(slice(lo, hi),) + rest] = v
+    return True
+
+
+class _ChunkedILoc:
+    """The `iloc` indexer of a chunked dataframe"""
+
+    __slots__ = ("proxy",)
+
+    def __init__(self, proxy: "ChunkedProxyObject"):
+        self.proxy = proxy
+
+    def __getitem__(self, key):
+        ret = _get_rows(
+            self.proxy._pxy_get_parts(),
+            key,
+            lambda obj, k: obj.iloc[k if len(k) > 1 else k[0]],
+            lambda p: p._pxy_deserialize(),
+        )
+        if ret is NotImplemented:
+            return self.proxy._pxy_deserialize().iloc[key]
+        return ret
+
+
+class ChunkedProxyObject(CompositeProxyObject):
+    """Proxy of a large array or dataframe split into row chunks
+
+    Each chunk is a copy of a range of rows proxied by its own ProxyObject,
+    which the ProxyManager tracks and spills individually. Thus, eviction only
+    spills the chunks needed to free the required memory and slicing the rows,
+    e.g. ``x[10:20]`` or ``df.iloc[10:20]``, only unspills the chunks of the
+    rows. The shape, dtype(s), and column labels are available without
+    unspilling. Any other access assembles (concatenates) all chunks.
+
+    Likewise, assigning rows of an array, e.g. ``x[10:20] = 0``, only unspills
+    and modifies the chunks of the rows in place. Any other modification, such
+    as assigning a column of a dataframe, assembles all chunks and splits the
+    result again into chunks of the same number of rows.
+
+    The size of the chunks is set by the "jit-unspill-chunk-size" config value,
+    which defaults to "256 MiB", or by `from_chunk_size()`. When the config
+    value is set, JIT-unspill splits all device objects larger than the chunk
+    size into chunks, see ``ProxifyHostFile``.
+
+    Notice, the rows are copied when split thus the original object and the
+    chunks exist simultaneously until the original object is freed. Therefore,
+    JIT-unspill doesn't chunk objects larger than half of the device memory
+    limit. Zero-copy slices of the original object aren't an option since the
+    chunks would share, and keep alive, the device memory of the original object.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def supports(obj) -> bool:
+        """Whether `obj` is an array or a dataframe with multiple rows"""
+        if not (
+            _is_frame(obj)
+            or hasattr(obj, "__array_interface__")
+            or hasattr(obj, "__cuda_array_interface__")
+        ):
+            return False
+        try:
+            return obj.ndim > 0 and len(obj) > 1
+        except (AttributeError, TypeError):
+            return False
+
+    @classmethod
+    def from_chunk_size(cls, obj, chunk_size: int) -> "ChunkedProxyObject":
+        """Proxy `obj` split into chunks of about `chunk_size` bytes"""
+        return _composite_proxy_from_parts(
+            cls, type(obj), cls._pxy_split(obj, chunk_size=chunk_size)
+        )
+
+    @classmethod
+    def _pxy_split(
+        cls, obj, like: ProxiedChunks = None, chunk_size: int = None
+    ) -> ProxiedChunks:
+        nrows = len(obj)
+        if like is not None:
+            rows_per_chunk = max(like.lengths)
+        else:
+            if chunk_size is None:
+                chunk_size = parse_bytes(
+                    dask.config.get("jit-unspill-chunk-size", default=None)
+                    or "256 MiB"
+                )
+            rows_per_chunk = max(1, chunk_size * nrows // max(sizeof(obj), 1))
+        proxies = []
+        lengths = []
+        for start in range(0, nrows, rows_per_chunk):
+            chunk = _take_rows(obj, slice(start, start + rows_per_chunk)).copy()
+            proxies.append(asproxy(chunk))
+            lengths.append(len(chunk))
+        return ProxiedChunks(proxies, lengths)
+
+    def __getattr__(self, name):
+        chunks: ProxiedChunks = self._pxy_get_parts()
+        first = chunks.proxies[0]
+        if name == "shape":
+            return (len(chunks),) + tuple(first.shape[1:])
+        if name in ("ndim", "dtype", "dtypes", "columns", "itemsize", "name"):
+            return getattr(first, name)
+        if name == "size":
+            size = 1
+            for n in self.shape:
+                size *= n
+            return size
+        if name == "nbytes" and not _is_frame(self.__class__):
+            return sum(p.nbytes for p in chunks.proxies)
+        if name == "empty":
+            return False  # Chunked objects have multiple rows
+        if name == "iloc" and _is_frame(self.__class__):
+            return _ChunkedILoc(self)
+        return super().__getattr__(name)
+
+    def __len__(self):
+        return len(self._pxy_get_parts())
+
+    def __getitem__(self, key):
+        if not _is_frame(self.__class__):
+            ret = _get_rows(
+                self._pxy_get_parts(),
+                key,
+                operator.getitem,
+                lambda p: p._pxy_deserialize(),
+            )
+            if ret is not NotImplemented:
+                return ret
+        return self._pxy_deserialize()[key]
+
+    def __setitem__(self, key, value):
+        if not _is_frame(self.__class__) and _set_rows(
+            self._pxy_get_parts(), key, value, self.ndim
+        ):
+            return
+        super().__setitem__(key, value)
+
+
+@make_meta_dispatch.register(ChunkedProxyObject)
+def make_meta_chunked_proxy_object(x: ChunkedProxyObject, index=None):
+    """Create the meta from the meta of the first chunk, which doesn't unspill"""
+    return make_meta_dispatch(x._pxy_get_part_proxies()[0], index=index)
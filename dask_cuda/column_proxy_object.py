@@ -0,0 +1,131 @@
+from typing import Callable, Hashable, List, Optional
+
+import pandas
+
+from .composite_proxy_object import CompositeProxyObject, ProxiedParts
+from .proxy_object import ProxyObject, asproxy, make_meta_dispatch
+
+
+class ProxiedColumns(ProxiedParts):
+    """The columns of a dataframe, where each column is proxied individually
+
+    Parameters
+    ----------
+    proxies: list of ProxyObject
+        The proxies of the columns (series) ordered as `columns`.
+    columns: pandas.Index
+        The column labels of the dataframe.
+    """
+
+    __slots__ = ("columns", "label_to_proxy")
+
+    def __init__(self, proxies: List[ProxyObject], columns: pandas.Index):
+        assert len(columns) == len(proxies)
+        super().__init__(proxies)
+        self.columns = columns
+        self.label_to_proxy = dict(zip(columns, proxies))
+
+    def get_state(self) -> dict:
+        return {"columns": self.columns}
+
+    def assemble(
+        self, obj_type: type, get: Callable, labels: Optional[List[Hashable]] = None
+    ):
+        """Create a dataframe of the columns `labels` (all columns if None)"""
+        if labels is None:
+            labels = self.columns
+        ret = obj_type({c: get(self.label_to_proxy[c]) for c in labels})
+        if len(labels) == len(self.columns):
+            ret.columns = self.columns  # Preserves the name and type of the labels
+        return ret
+
+
+class ColumnProxyObject(CompositeProxyObject):
+    """Proxy of a dataframe that spills and unspills each column independently
+
+    Each column (series) is proxied by its own ProxyObject, which the
+    ProxyManager tracks individually thus the device memory usage and the
+    spilling is per column. Accessing a column, e.g. ``df["a"]``, or a subset
+    of columns, e.g. ``df[["a", "b"]]``, only unspills the accessed columns and
+    the column labels, dtypes, and shape are available without unspilling.
+    Any other access assembles the full dataframe, which unspills all columns.
+
+    Use the `subclass` argument of `asproxy()` to create a column proxy or set
+    the "jit-unspill-column-granular" config value (or the environment variable
+    ``DASK_JIT_UNSPILL_COLUMN_GRANULAR=True``) to make JIT-unspill proxify all
+    cuDF dataframes this way.
+
+    Notice, modifications through the proxy, like ``df["c"] = 42``, are
+    supported but re-proxifies all columns.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def supports(obj) -> bool:
+        """Whether the columns of `obj` can be proxied individually
+
+        `obj` must be a dataframe with at least one column and unique and
+        non-hierarchical column labels.
+        """
+        columns = getattr(obj, "columns", None)
+        return (
+            getattr(obj, "ndim", None) == 2
+            and isinstance(columns, pandas.Index)
+            and not isinstance(columns, pandas.MultiIndex)
+            and len(columns) > 0
+            and columns.is_unique
+        )
+
+    @classmethod
+    def _pxy_split(cls, obj, like=None) -> ProxiedColumns:
+        return ProxiedColumns([asproxy(obj[c]) for c in obj.columns], obj.columns)
+
+    def __getattr__(self, name):
+        columns: ProxiedColumns = self._pxy_get_parts()
+        if name == "columns":
+            return columns.columns
+        if name == "dtypes":
+            return pandas.Series(
+                [p.dtype for p in columns.proxies], index=columns.columns
+            )
+        if name == "shape":
+            return (len(self), len(columns.columns))
+        if name == "ndim":
+            return 2
+        if name == "empty":
+            return len(self) == 0
+        if name == "index":
+            return columns.proxies[0].index
+        if name in columns.label_to_proxy and not hasattr(self.__class__, name):
+            return columns.label_to_proxy[name]._pxy_deserialize()
+        return super().__getattr__(name)
+
+    def __len__(self):
+        return len(self._pxy_get_part_proxies()[0])
+
+    def __contains__(self, value):
+        return value in self._pxy_get_parts().label_to_proxy
+
+    def __iter__(self):
+        return iter(self._pxy_get_parts().columns)
+
+    def __getitem__(self, key):
+        columns: ProxiedColumns = self._pxy_get_parts()
+        if isinstance(key, Hashable) and key in columns.label_to_proxy:
+            return columns.label_to_proxy[key]._pxy_deserialize()
+        if isinstance(key, list) and all(
+            isinstance(k, Hashable) and k in columns.label_to_proxy for k in key
+        ):
+            return columns.assemble(
+                self.__class__, lambda p: p._pxy_deserialize(), labels=key
+            )
+        return self._pxy_deserialize()[key]
+
+
+@make_meta_dispatch.register(ColumnProxyObject)
+def make_meta_column_proxy_object(x: ColumnProxyObject, index=None):
+    """Create the meta from the metas of the columns, which doesn't unspill"""
+    return x._pxy_get_parts().assemble(
+        x.__class__, lambda p: make_meta_dispatch(p, index=index)
+    )
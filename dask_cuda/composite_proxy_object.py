@@ -0,0 +1,224 @@
+import abc
+import pickle
+from typing import Callable, List
+
+import distributed.protocol
+from distributed.worker import dumps_function
+
+from .get_device_memory_objects import dispatch as get_device_memory_objects_dispatch
+from .is_device_object import is_device_object
+from .proxy_object import ProxyDetail, ProxyObject
+from .type_registry import type_registry
+
+
+class ProxiedParts(abc.ABC):
+    """Abstract base class of an object split into individually proxied parts
+
+    Parameters
+    ----------
+    proxies: list of ProxyObject
+        The proxies of the parts.
+    """
+
+    __slots__ = ("proxies",)
+
+    def __init__(self, proxies: List[ProxyObject]):
+        self.proxies = proxies
+
+    def get_state(self) -> dict:
+        """Return the keyword arguments, besides the proxies, of the constructor
+
+        Notice, the values must be pickleable.
+        """
+        return {}
+
+    @abc.abstractmethod
+    def assemble(self, obj_type: type, get: Callable):
+        """Create the object from its parts
+
+        Parameters
+        ----------
+        obj_type: type
+            The type of the object to create.
+        get: callable
+            Function that given the proxy of a part returns the part.
+        """
+
+    def __reduce__(self):
+        return (_new_proxied_parts, (type(self), self.proxies, self.get_state()))
+
+
+def _new_proxied_parts(parts_type, proxies, state) -> ProxiedParts:
+    return parts_type(proxies, **state)
+
+
+@get_device_memory_objects_dispatch.register(ProxiedParts)
+def get_device_memory_objects_proxied_parts(obj: ProxiedParts):
+    return get_device_memory_objects_dispatch(obj.proxies)
+
+
+class CompositeProxyObject(ProxyObject):
+    """Abstract base class of proxies that split the proxied object into parts
+
+    Each part is proxied by its own ProxyObject, which the ProxyManager tracks
+    and spills individually. The composite proxy itself is never serialized
+    and isn't registered with the ProxyManager. Accessing the proxy, as a
+    regular ProxyObject, assembles the object from all its parts thus
+    subclasses override the access of the proxied object that only requires
+    some of the parts.
+
+    Subclasses implement `supports()` and `_pxy_split()`.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, detail: ProxyDetail):
+        if not isinstance(detail.obj, ProxiedParts):
+            if detail.is_serialized() or not self.supports(detail.obj):
+                raise ValueError(
+                    f"Cannot split a {detail.typename} object into "
+                    f"{type(self).__name__} parts"
+                )
+            detail.obj = self._pxy_split(detail.obj)
+        super().__init__(detail)
+
+    @staticmethod
+    def supports(obj) -> bool:
+        """Whether `obj` can be split into parts"""
+        raise NotImplementedError()
+
+    @classmethod
+    def _pxy_split(cls, obj, like: ProxiedParts = None) -> ProxiedParts:
+        """Split `obj` into individually proxied parts
+
+        If `like` is given, `obj` is a modified version of the object split
+        into the parts `like`, which the new parts should resemble.
+        """
+        raise NotImplementedError()
+
+    def _pxy_get_parts(self) -> ProxiedParts:
+        return self._pxy_get().obj
+
+    def _pxy_get_part_proxies(self) -> List[ProxyObject]:
+        """Return the proxies of the parts"""
+        return self._pxy_get_parts().proxies
+
+    def _pxy_serialize(self, serializers, proxy_detail: ProxyDetail = None) -> None:
+        pxy = self._pxy_get() if not proxy_detail else proxy_detail
+        for p in pxy.obj.proxies:
+            p._pxy_serialize(serializers=serializers)
+
+    def _pxy_deserialize(
+        self, maybe_evict: bool = True, proxy_detail: ProxyDetail = None
+    ):
+        pxy = self._pxy_get() if not proxy_detail else proxy_detail
+        return pxy.obj.assemble(
+            self.__class__, lambda p: p._pxy_deserialize(maybe_evict=maybe_evict)
+        )
+
+    def _pxy_get_device_memory_objects(self) -> set:
+        # Not cached since the parts are spilled independently
+        ret = set()
+        for p in self._pxy_get_part_proxies():
+            ret.update(p._pxy_get_device_memory_objects())
+        return ret
+
+    def _pxy_mutate(self, func: Callable):
+        """Apply `func` to the assembled object and split it again"""
+        pxy = self._pxy_get(copy=True)
+        old_proxies = pxy.obj.proxies
+        obj = self._pxy_deserialize()
+        ret = func(obj)
+        if not self.supports(obj):
+            raise ValueError("The modification makes the object unsplittable")
+        pxy.obj = self._pxy_split(obj, like=pxy.obj)
+        # Register the new parts with the manager of the old parts
+        old_proxies[0]._pxy_get().manager.proxify(pxy.obj.proxies)
+        self._pxy_set(pxy)
+        return ret
+
+    def __reduce__(self):
+        return (
+            _composite_proxy_from_parts,
+            (type(self), self.__class__, self._pxy_get_parts()),
+        )
+
+    def __setattr__(self, name: str, val):
+        if name.startswith("_pxy_"):
+            return object.__setattr__(self, name, val)
+        self._pxy_mutate(lambda obj: setattr(obj, name, val))
+
+    def __sizeof__(self):
+        return sum(p.__sizeof__() for p in self._pxy_get_part_proxies())
+
+    def __setitem__(self, key, value):
+        def f(obj):
+            obj[key] = value
+
+        self._pxy_mutate(f)
+
+    def __delitem__(self, key):
+        def f(obj):
+            del obj[key]
+
+        self._pxy_mutate(f)
+
+
+def _composite_proxy_from_parts(
+    subclass: type, obj_type: type, parts: ProxiedParts
+) -> CompositeProxyObject:
+    """Create a composite proxy of already proxied parts"""
+    type_id = type_registry.type_id(obj_type)
+    return subclass(
+        ProxyDetail(
+            obj=parts,
+            fixed_attr={},
+            type_id=type_id,
+            typename=type_registry.get_typename(type_id),
+            is_cuda_object=any(is_device_object(p) for p in parts.proxies),
+            subclass=dumps_function(subclass),
+            serializer=None,
+            explicit_proxy=False,
+        )
+    )
+
+
+def _serialize_parts(obj: CompositeProxyObject, serializers):
+    # Each part is serialized by the serialization of ProxyObject
+    parts = obj._pxy_get_parts()
+    sub_header, frames = distributed.protocol.serialize(
+        parts.proxies,
+        serializers=serializers,
+        on_error="raise",
+        iterate_collection=True,
+    )
+    header = {
+        "composite": pickle.dumps((type(obj), type(parts), parts.get_state())),
+        "proxied-type": type_registry.get_serialized(obj._pxy_get().type_id),
+        "parts-header": sub_header,
+    }
+    return header, frames
+
+
+@distributed.protocol.dask_serialize.register(CompositeProxyObject)
+def composite_pxy_dask_serialize(obj: CompositeProxyObject):
+    return _serialize_parts(obj, serializers=("dask", "pickle"))
+
+
+@distributed.protocol.cuda.cuda_serialize.register(CompositeProxyObject)
+def composite_pxy_cuda_serialize(obj: CompositeProxyObject):
+    return _serialize_parts(obj, serializers=("cuda",))
+
+
+@distributed.protocol.dask_deserialize.register(CompositeProxyObject)
+@distributed.protocol.cuda.cuda_deserialize.register(CompositeProxyObject)
+def composite_pxy_dask_deserialize(header, frames):
+    subclass, parts_type, state = pickle.loads(header["composite"])
+    proxies = distributed.protocol.deserialize(header["parts-header"], frames)
+    return _composite_proxy_from_parts(
+        subclass,
+        type_registry.get_type(
+            type_registry.type_id_from_serialized(header["proxied-type"])
+        ),
+        parts_type(list(proxies), **state),
+    )
@@ -0,0 +1,123 @@
+import hashlib
+import struct
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def content_hash(frames: Iterable) -> str:
+    """Return a digest of the content of `frames`
+
+    The digest covers the number and lengths of the frames, thus frame lists
+    only have the same digest if they consist of the same bytes split the same
+    way.
+
+    Parameters
+    ----------
+    frames: Iterable
+        Bytes-like objects to hash, must be C-contiguous.
+
+    Returns
+    -------
+    digest: str
+        Hex digest of the frames
+    """
+    frames = [memoryview(f).cast("B") for f in frames]
+    h = hashlib.blake2b(digest_size=20)
+    h.update(struct.pack(f"Q{len(frames)}Q", len(frames), *(f.nbytes for f in frames)))
+    for f in frames:
+        h.update(f)
+    return h.hexdigest()
+
+
+def readonly_frames(frames: Iterable) -> List[memoryview]:
+    """Return read-only views of `frames`, which doesn't copy the data
+
+    Frames shared between multiple owners must not be modified through any of
+    the owners. Notice, deserialization of a read-only frame into a writeable
+    object, such as a writeable NumPy array, copies the frame.
+    """
+    return [memoryview(f).toreadonly() for f in frames]
+
+
+class ContentStore:
+    """Reference counted store of values, such as spilled frames, by content hash
+
+    Used to deduplicate byte-identical payloads. The first owner of a payload
+    inserts it and subsequent owners of the same content acquire a reference to
+    the stored value instead of keeping their own copy. The value is released
+    when the last owner releases its reference.
+
+    This class is threadsafe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, List] = {}  # digest -> [value, refcount]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, digest: Hashable) -> bool:
+        return digest in self._entries
+
+    def refcount(self, digest: Hashable) -> int:
+        """Return the number of references to `digest` (zero if unknown)"""
+        with self._lock:
+            entry = self._entries.get(digest)
+            return 0 if entry is None else entry[1]
+
+    def acquire(self, digest: Hashable) -> Optional[Any]:
+        """Acquire a reference to the value of `digest`
+
+        Returns
+        -------
+        The stored value or None if `digest` isn't in the store, in which
+        case no reference is acquired.
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            entry[1] += 1
+            return entry[0]
+
+    def insert(self, digest: Hashable, value: Any) -> Tuple[Any, bool]:
+        """Insert `value` or acquire a reference to the value of `digest`
+
+        Returns
+        -------
+        value: Any
+            The stored value, which is `value` if `digest` was new.
+        inserted: bool
+            Whether `value` was inserted. If False, another owner inserted
+            the same content first and `value` should be discarded.
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0], False
+            self._entries[digest] = [value, 1]
+            return value, True
+
+    def release(self, digest: Hashable) -> Tuple[Any, bool]:
+        """Release a reference to the value of `digest`
+
+        Returns
+        -------
+        value: Any
+            The stored value or None if `digest` isn't in the store.
+        freed: bool
+            Whether this was the last reference, in which case the value has
+            been removed from the store and the caller must free it. Also
+            True if `digest` isn't in the store.
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None, True
+            entry[1] -= 1
+            if entry[1] > 0:
+                return entry[0], False
+            del self._entries[digest]
+            return entry[0], True
@@ -24,6 +24,11 @@ from .initialize import initialize
 from .proxify_host_file import ProxifyHostFile
 from .utils import (
     CPUAffinity,
+    DiskQuotaBackpressure,
+    JITUnspillEvictionHints,
+    JITUnspillMetrics,
+    JITUnspillPrefetch,
+    PinKeys,
     RMMSetup,
     _ucx_111,
     cuda_visible_devices,
@@ -241,6 +246,11 @@ class CUDAWorker(Server):
                     RMMSetup(
                         rmm_pool_size, rmm_managed_memory, rmm_async, rmm_log_directory,
                     ),
+                    JITUnspillMetrics(),
+                    JITUnspillPrefetch(),
+                    JITUnspillEvictionHints(),
+                    PinKeys(),
+                    DiskQuotaBackpressure(),
                 },
                 name=name if nprocs == 1 or name is None else str(name) + "-" + str(i),
                 local_directory=local_directory,
@@ -1,12 +1,17 @@
 import functools
+import itertools
 import logging
 import os
 import time
+from typing import Tuple
 
+import zict
+from packaging.version import parse as parse_version
 from zict import Buffer, File, Func
 from zict.common import ZictBase
 
 import dask
+from dask.utils import parse_bytes
 from distributed.protocol import (
     dask_deserialize,
     dask_serialize,
@@ -18,8 +23,14 @@ from distributed.protocol import (
 from distributed.sizeof import safe_sizeof
 from distributed.utils import nbytes
 
+from .disk_io import DiskQuota, DiskQuotaExceeded
+from .host_arena import register_host_arena
 from .is_device_object import is_device_object
-from .utils import nvtx_annotate
+from .utils import nvtx_annotate, parse_pin_limit
+
+# Older versions of zict lose a value whose move to the slow mapping fails,
+# see `QuotaBuffer`
+_zict_keeps_failed_evictions = parse_version(zict.__version__) >= parse_version("2.1")
 
 
 class LoggedBuffer(Buffer):
@@ -97,6 +108,85 @@ class LoggedBuffer(Buffer):
         }
 
 
+class QuotaFile(File):
+    """Extends zict.File with a quota on the number of bytes written
+
+    The bytes of a value are reserved in `quota` before the value is written,
+    which raises ``disk_io.DiskQuotaExceeded`` if the quota is exhausted, and
+    are given back when the value is deleted.
+    """
+
+    def __init__(self, directory, quota: DiskQuota):
+        super().__init__(directory)
+        self.quota = quota
+        self.key_nbytes = dict()
+
+    def __setitem__(self, key, value):
+        if key in self:
+            del self[key]
+        if isinstance(value, (tuple, list)):
+            n = sum(map(nbytes, value))
+        else:
+            n = nbytes(value)
+        self.quota.acquire(n)
+        try:
+            super().__setitem__(key, value)
+        except BaseException:
+            self.quota.release(n)
+            raise
+        self.key_nbytes[key] = n
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.quota.release(self.key_nbytes.pop(key, 0))
+
+
+class QuotaBuffer(Buffer):
+    """Extends zict.Buffer to keep values in fast when the disk quota is exhausted
+
+    When moving a value to the slow mapping, a QuotaFile, raises
+    DiskQuotaExceeded, zict keeps it in the fast mapping, which then exceeds
+    its limit. Instead of failing the access that triggered the eviction, the
+    error is logged and the value stays in the fast mapping until the quota
+    frees up. Notice, this requires zict 2.1 or newer, older versions lose
+    the value that failed to be evicted thus `DeviceHostFile` refuses a disk
+    quota when an older zict is installed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.quota_exceeded = False
+
+    def _quota_exceeded(self, e):
+        if not self.quota_exceeded:
+            logging.getLogger("distributed.worker").warning(
+                "%s, keeping the data in host memory", str(e)
+            )
+        self.quota_exceeded = True
+
+    def fast_to_slow(self, key, value):
+        ret = super().fast_to_slow(key, value)
+        self.quota_exceeded = False
+        return ret
+
+    def __setitem__(self, key, value):
+        try:
+            super().__setitem__(key, value)
+        except DiskQuotaExceeded as e:
+            self._quota_exceeded(e)
+
+    def __getitem__(self, key):
+        try:
+            return super().__getitem__(key)
+        except DiskQuotaExceeded as e:
+            self._quota_exceeded(e)
+            return self.fast[key]
+
+
+class LoggedQuotaBuffer(LoggedBuffer, QuotaBuffer):
+    """A LoggedBuffer that keeps values in fast when the disk quota is exhausted"""
+
+
 class DeviceSerialized:
     """Store device object on the host
 
@@ -132,8 +222,10 @@ def device_deserialize(header, frames):
 
 
 @nvtx_annotate("SPILL_D2H", color="red", domain="dask_cuda")
-def device_to_host(obj: object) -> DeviceSerialized:
-    header, frames = serialize(obj, serializers=("dask", "pickle"), on_error="raise")
+def device_to_host(
+    obj: object, serializers: Tuple[str, ...] = ("dask", "pickle")
+) -> DeviceSerialized:
+    header, frames = serialize(obj, serializers=serializers, on_error="raise")
     return DeviceSerialized(header, frames)
 
 
@@ -166,6 +258,16 @@ class DeviceHostFile(ZictBase):
         If True, all spilling operations will be logged directly to
         distributed.worker with an INFO loglevel. This will eventually be
         replaced by a Dask configuration flag.
+    host_arena: bool
+        If True, spill device objects into reusable host buffers of the host
+        arena, see ``host_arena.HostArena``.
+    pin_limit: float, int, str or None
+        Maximum size of the device objects pinned by `pin()`, see
+        ``utils.parse_pin_limit()``.
+    disk_quota: int, str or None
+        Maximum number of bytes spilled to disk, see ``QuotaFile``. If None,
+        the "disk-spill-quota" config value is used, which defaults to None
+        (unlimited). Setting a quota requires zict 2.1 or newer.
     """
 
     def __init__(
@@ -174,6 +276,9 @@ class DeviceHostFile(ZictBase):
         memory_limit=None,
         local_directory=None,
         log_spilling=False,
+        host_arena=False,
+        pin_limit=None,
+        disk_quota=None,
     ):
         self.disk_func_path = os.path.join(
             local_directory or dask.config.get("temporary-directory") or os.getcwd(),
@@ -182,25 +287,36 @@ class DeviceHostFile(ZictBase):
         )
         os.makedirs(self.disk_func_path, exist_ok=True)
 
+        if disk_quota is None:
+            disk_quota = dask.config.get("disk-spill-quota", default=None)
+        self.disk_quota = DiskQuota(
+            None if disk_quota is None else parse_bytes(disk_quota)
+        )
+        if self.disk_quota.limit is not None and not _zict_keeps_failed_evictions:
+            raise ValueError(
+                "A disk spill quota requires zict 2.1 or newer, "
+                f"zict {zict.__version__} is installed"
+            )
+
         self.host_func = dict()
         self.disk_func = Func(
             functools.partial(serialize_bytelist, on_error="raise"),
             deserialize_bytes,
-            File(self.disk_func_path),
+            QuotaFile(self.disk_func_path, self.disk_quota),
         )
 
         host_buffer_kwargs = {}
         device_buffer_kwargs = {}
-        buffer_class = Buffer
+        host_buffer_class = QuotaBuffer
         if log_spilling is True:
-            buffer_class = LoggedBuffer
+            host_buffer_class = LoggedQuotaBuffer
             host_buffer_kwargs = {"fast_name": "Host", "slow_name": "Disk"}
             device_buffer_kwargs = {"fast_name": "Device", "slow_name": "Host"}
 
         if memory_limit == 0:
             self.host_buffer = self.host_func
         else:
-            self.host_buffer = buffer_class(
+            self.host_buffer = host_buffer_class(
                 self.host_func,
                 self.disk_func,
                 memory_limit,
@@ -210,7 +326,14 @@ class DeviceHostFile(ZictBase):
 
         self.device_keys = set()
         self.device_func = dict()
-        self.device_host_func = Func(device_to_host, host_to_device, self.host_buffer)
+        if host_arena:
+            register_host_arena()
+            dumps = functools.partial(
+                device_to_host, serializers=("arena", "dask", "pickle")
+            )
+        else:
+            dumps = device_to_host
+        self.device_host_func = Func(dumps, host_to_device, self.host_buffer)
         self.device_buffer = Buffer(
             self.device_func,
             self.device_host_func,
@@ -226,8 +349,15 @@ class DeviceHostFile(ZictBase):
         # For Worker compatibility only, where `fast` is host memory buffer
         self.fast = self.host_buffer if memory_limit == 0 else self.host_buffer.fast
 
+        # Pinned device objects are kept outside of the device buffer, which
+        # limit is reduced by their size
+        self.device_memory_limit = device_memory_limit
+        self.pin_limit = parse_pin_limit(pin_limit, device_memory_limit)
+        self.pinned = dict()
+        self.pinned_nbytes = 0
+
     def __setitem__(self, key, value):
-        if key in self.device_buffer:
+        if key in self.device_buffer or key in self.pinned:
             # Make sure we register the removal of an existing key
             del self[key]
 
@@ -238,7 +368,9 @@ class DeviceHostFile(ZictBase):
             self.host_buffer[key] = value
 
     def __getitem__(self, key):
-        if key in self.device_keys:
+        if key in self.pinned:
+            return self.pinned[key]
+        elif key in self.device_keys:
             return self.device_buffer[key]
         elif key in self.host_buffer:
             return self.host_buffer[key]
@@ -246,14 +378,70 @@ class DeviceHostFile(ZictBase):
             raise KeyError(key)
 
     def __len__(self):
-        return len(self.device_buffer)
+        return len(self.device_buffer) + len(self.pinned)
 
     def __iter__(self):
-        return iter(self.device_buffer)
+        return itertools.chain(self.device_buffer, list(self.pinned))
 
     def __delitem__(self, key):
+        if key in self.pinned:
+            self.pinned_nbytes -= safe_sizeof(self.pinned.pop(key))
+            self._update_device_buffer_limit()
+            return
+        self.device_keys.discard(key)
+        del self.device_buffer[key]
+
+    def _update_device_buffer_limit(self):
+        """Deduct the size of the pinned objects from the device buffer limit"""
+        n = self.device_memory_limit - self.pinned_nbytes
+        self.device_buffer.n = self.device_buffer.fast.n = n
+        lru = self.device_buffer.fast
+        while lru.total_weight > n and len(lru) > 0:
+            lru.evict()
+
+    def pin(self, key):
+        """Pin the device object of `key` in device memory
+
+        The object is unspilled if needed and excluded from spilling until
+        `unpin()` is called or the key is deleted. Its size is accounted
+        separately and deducted from the device memory limit.
+
+        Raises
+        ------
+        KeyError
+            If `key` isn't found.
+        ValueError
+            If `key` isn't a device object or if pinning it would exceed
+            `pin_limit`.
+        """
+        if key in self.pinned:
+            return
+        if key not in self.device_keys:
+            if key in self.host_buffer:
+                raise ValueError(f"Cannot pin {key}, it isn't a device object")
+            raise KeyError(key)
+        value = self.device_buffer[key]  # Unspills `key` if spilled
+        nbytes = safe_sizeof(value)
+        if self.pinned_nbytes + nbytes > self.pin_limit:
+            raise ValueError(
+                f"Cannot pin {key} of {nbytes} bytes, the pinned device memory "
+                f"would exceed the pin limit of {self.pin_limit} bytes"
+            )
         self.device_keys.discard(key)
         del self.device_buffer[key]
+        self.pinned[key] = value
+        self.pinned_nbytes += nbytes
+        self._update_device_buffer_limit()
+
+    def unpin(self, key):
+        """Unpin `key`, which makes it spillable again"""
+        if key not in self.pinned:
+            return
+        value = self.pinned.pop(key)
+        self.pinned_nbytes -= safe_sizeof(value)
+        self._update_device_buffer_limit()
+        self.device_keys.add(key)
+        self.device_buffer[key] = value
 
     def set_address(self, addr):
         if isinstance(self.host_buffer, LoggedBuffer):
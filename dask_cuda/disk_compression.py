@@ -0,0 +1,377 @@
+import threading
+import time
+import zlib
+from contextlib import suppress
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from distributed.protocol.compression import byte_sample
+
+
+class Codec:
+    """A compression codec usable for spilled frames
+
+    Parameters
+    ----------
+    name: str
+        Name written in the "compression" entry of the header, which is
+        also used to find the decompressor.
+    compress: callable
+        Function that takes a (byte cast) memoryview of the frame and the
+        itemsize of the original frame and returns the compressed bytes.
+    decompress: callable
+        Function that takes the compressed bytes and returns the original bytes.
+    max_size: int
+        Frames larger than this are never compressed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        compress: Callable[[memoryview, int], Any],
+        decompress: Callable[[Any], Any],
+        max_size: int = 2 ** 31 - 1,
+    ):
+        self.name = name
+        self.compress = compress
+        self.decompress = decompress
+        self.max_size = max_size
+
+    def __repr__(self) -> str:
+        return f"<Codec {self.name}>"
+
+
+# Functions that take the level (None means the default level) and returns a
+# `Codec`. The decompressors are registered separately by name because the
+# level doesn't matter when decompressing.
+_codec_factories: Dict[str, Callable[[Optional[int]], Codec]] = {}
+_decompressors: Dict[str, Callable[[Any], Any]] = {}
+
+
+def _zlib_codec(level: Optional[int]) -> Codec:
+    level = 6 if level is None else level
+    return Codec("zlib", lambda data, _: zlib.compress(data, level), zlib.decompress)
+
+
+_codec_factories["zlib"] = _zlib_codec
+_decompressors["zlib"] = zlib.decompress
+
+
+with suppress(ImportError):
+    import lz4.block
+
+    def _lz4_codec(level: Optional[int]) -> Codec:
+        if level is None:
+            kwargs = {"mode": "default"}
+        else:
+            kwargs = {"mode": "high_compression", "compression": level}
+        return Codec(
+            "lz4",
+            lambda data, _: lz4.block.compress(data, **kwargs),
+            lz4.block.decompress,
+            max_size=0x7E000000,  # LZ4_MAX_INPUT_SIZE
+        )
+
+    _codec_factories["lz4"] = _lz4_codec
+    _decompressors["lz4"] = lz4.block.decompress
+
+
+with suppress(ImportError):
+    import zstandard
+
+    # The (de)compressor objects of zstandard are not thread-safe
+    _zstd_local = threading.local()
+
+    def _zstd_decompress(data):
+        try:
+            d = _zstd_local.decompressor
+        except AttributeError:
+            d = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+        return d.decompress(data)
+
+    def _zstd_codec(level: Optional[int]) -> Codec:
+        level = 3 if level is None else level
+
+        def compress(data, _):
+            try:
+                compressors = _zstd_local.compressors
+            except AttributeError:
+                compressors = _zstd_local.compressors = {}
+            if level not in compressors:
+                compressors[level] = zstandard.ZstdCompressor(level=level)
+            return compressors[level].compress(data)
+
+        return Codec("zstd", compress, _zstd_decompress)
+
+    _codec_factories["zstd"] = _zstd_codec
+    _decompressors["zstd"] = _zstd_decompress
+
+
+with suppress(ImportError):
+    import blosc
+
+    # Blosc's global compression context isn't safe to use from multiple threads
+    _blosc_lock = threading.Lock()
+
+    def _blosc_decompress(data):
+        with _blosc_lock:
+            return blosc.decompress(data)
+
+    def _blosc_codec(level: Optional[int]) -> Codec:
+        level = 5 if level is None else level
+
+        def compress(data, itemsize):
+            # Byte-shuffle requires the element size, which the frames of
+            # numeric columns and arrays retain. Plain bytes are assumed to
+            # hold 8-byte elements, the most common column width.
+            typesize = itemsize if 1 < itemsize <= 255 else 8
+            with _blosc_lock:
+                return blosc.compress(
+                    data,
+                    typesize=typesize,
+                    clevel=level,
+                    shuffle=blosc.SHUFFLE,
+                    cname="lz4",
+                )
+
+        return Codec(
+            "blosc", compress, _blosc_decompress, max_size=blosc.MAX_BUFFERSIZE
+        )
+
+    _codec_factories["blosc"] = _blosc_codec
+    _decompressors["blosc"] = _blosc_decompress
+
+
+def available_codecs() -> List[str]:
+    """Return the names of the codecs that are installed"""
+    return sorted(_codec_factories)
+
+
+def get_codec(spec: Optional[str]) -> Optional[Codec]:
+    """Return the codec matching `spec`
+
+    Parameters
+    ----------
+    spec: str or None
+        The name of the codec optionally followed by a colon and a compression
+        level, e.g. "lz4", "zstd:9", or "blosc:5". "auto" selects lz4 when
+        installed and no compression otherwise. None, False, or "none" disables
+        compression.
+
+    Returns
+    -------
+    The codec or None when compression is disabled
+    """
+    if spec is None or spec is False or str(spec).lower() in ("none", "false"):
+        return None
+    if spec == "auto":
+        return _codec_factories["lz4"](None) if "lz4" in _codec_factories else None
+    name, _, level = str(spec).partition(":")
+    if name not in _codec_factories:
+        raise ValueError(
+            f"Unknown or not installed compression codec '{name}', "
+            f"choices include: {', '.join(available_codecs())}"
+        )
+    return _codec_factories[name](int(level) if level else None)
+
+
+class FrameCompressor:
+    """Adaptive compression of spilled frames
+
+    Each frame is compressed individually and only if it is worth it:
+    small frames are skipped, and a sample of the frame is compressed
+    first so that incompressible frames skip the CPU cost of compressing
+    them in full.
+
+    Parameters
+    ----------
+    codec: str or None
+        The codec to use, see `get_codec()`.
+    min_size: int
+        Frames smaller than this are not compressed.
+    sample_size: int
+        Size of each sample of a frame.
+    nsamples: int
+        Number of samples taken of each frame.
+    max_ratio: float
+        Frames (and samples) that doesn't compress to less than this fraction of
+        their size are stored uncompressed.
+    """
+
+    def __init__(
+        self,
+        codec: Optional[str] = "auto",
+        min_size: int = 10_000,
+        sample_size: int = 10_000,
+        nsamples: int = 5,
+        max_ratio: float = 0.9,
+    ):
+        self.spec = codec
+        self.codec = get_codec(codec)
+        self.min_size = min_size
+        self.sample_size = sample_size
+        self.nsamples = nsamples
+        self.max_ratio = max_ratio
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def __repr__(self) -> str:
+        return f"<FrameCompressor codec={self.spec}>"
+
+    def _record(self, name: str, **counts) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                name,
+                {
+                    "compressed-frames": 0,
+                    "skipped-frames": 0,
+                    "raw-nbytes": 0,
+                    "compressed-nbytes": 0,
+                    "skipped-nbytes": 0,
+                    "compress-seconds": 0.0,
+                    "decompressed-nbytes": 0,
+                    "decompress-seconds": 0.0,
+                },
+            )
+            for k, v in counts.items():
+                stats[k] += v
+
+    def compress_frame(self, frame) -> Tuple[Optional[str], Any]:
+        """Maybe compress a single frame
+
+        Returns
+        -------
+        compression: str or None
+            Name of the codec used or None if the frame wasn't compressed
+        frame:
+            The compressed frame or the original frame
+        """
+        codec = self.codec
+        if codec is None:
+            return None, frame
+        mv = memoryview(frame)
+        itemsize = mv.itemsize
+        mv = mv.cast("B") if mv.ndim != 1 or mv.format != "B" else mv
+        nbytes = mv.nbytes
+        if nbytes < self.min_size or nbytes > codec.max_size:
+            return None, frame
+
+        t0 = time.perf_counter()
+        if nbytes > self.sample_size * self.nsamples:
+            sample = byte_sample(mv, self.sample_size, self.nsamples)
+            if len(codec.compress(sample, itemsize)) > self.max_ratio * len(sample):
+                self._record(
+                    codec.name,
+                    **{
+                        "skipped-frames": 1,
+                        "skipped-nbytes": nbytes,
+                        "compress-seconds": time.perf_counter() - t0,
+                    },
+                )
+                return None, frame
+
+        compressed = codec.compress(mv, itemsize)
+        elapsed = time.perf_counter() - t0
+        if len(compressed) > self.max_ratio * nbytes:
+            self._record(
+                codec.name,
+                **{
+                    "skipped-frames": 1,
+                    "skipped-nbytes": nbytes,
+                    "compress-seconds": elapsed,
+                },
+            )
+            return None, frame
+        self._record(
+            codec.name,
+            **{
+                "compressed-frames": 1,
+                "raw-nbytes": nbytes,
+                "compressed-nbytes": len(compressed),
+                "compress-seconds": elapsed,
+            },
+        )
+        return codec.name, compressed
+
+    def compress(self, header: dict, frames: Iterable) -> Tuple[dict, List]:
+        """Compress `frames` and record the codecs used in a copy of `header`
+
+        Frames already compressed, according to `header["compression"]`, are
+        left untouched.
+        """
+        frames = list(frames)
+        compression = list(header.get("compression") or [None] * len(frames))
+        out = []
+        for i, frame in enumerate(frames):
+            if compression[i] is None:
+                compression[i], frame = self.compress_frame(frame)
+            out.append(frame)
+        header = header.copy()
+        header["compression"] = tuple(compression)
+        return header, out
+
+    def decompress(self, header: dict, frames: Iterable) -> Tuple[dict, List]:
+        """Decompress `frames` compressed by `compress()`
+
+        Returns a copy of `header` without the "compression" entry together
+        with the decompressed frames.
+        """
+        frames = list(frames)
+        if "compression" not in header:
+            return header, frames
+        header = header.copy()
+        compression = header.pop("compression") or [None] * len(frames)
+        out = []
+        for name, frame in zip(compression, frames):
+            if name is not None:
+                t0 = time.perf_counter()
+                try:
+                    decompress = _decompressors[name]
+                except KeyError:
+                    raise ValueError(
+                        f"Cannot decompress spilled frame, the '{name}' "
+                        "codec is not installed"
+                    )
+                frame = decompress(frame)
+                self._record(
+                    name,
+                    **{
+                        "decompressed-nbytes": len(frame),
+                        "decompress-seconds": time.perf_counter() - t0,
+                    },
+                )
+            out.append(frame)
+        return header, out
+
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        """Return the compression statistics of each codec used
+
+        Besides the raw counters, the statistics includes the compression
+        "ratio" of the compressed frames and the compression and decompression
+        throughput in bytes per second. The compression throughput includes
+        the time spent on frames that were skipped.
+        """
+        ret = {}
+        with self._lock:
+            for name, stats in self._stats.items():
+                s = dict(stats)
+                raw = s["raw-nbytes"]
+                s["ratio"] = s["compressed-nbytes"] / raw if raw else 1.0
+                t = s["compress-seconds"]
+                s["compress-throughput"] = (
+                    (raw + s["skipped-nbytes"]) / t if t > 0 else 0.0
+                )
+                t = s["decompress-seconds"]
+                s["decompress-throughput"] = (
+                    s["decompressed-nbytes"] / t if t > 0 else 0.0
+                )
+                ret[name] = s
+        return ret
+
+
+# The compressor used by JIT-unspill when spilling to disk, which is set by
+# `ProxifyHostFile.register_disk_spilling()`
+compressor = FrameCompressor(codec=None)
+
+# The compressor used by the compressed host memory tier of JIT-unspill, which
+# is set by `ProxifyHostFile.register_compressed_spilling()`
+host_compressor = FrameCompressor(codec=None)
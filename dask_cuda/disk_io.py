@@ -0,0 +1,616 @@
+import copy
+import errno
+import itertools
+import logging
+import mmap
+import os
+import struct
+import threading
+import uuid
+import weakref
+from contextlib import suppress
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from distributed.protocol.utils import pack_frames_prelude, unpack_frames
+
+from .content_store import ContentStore
+
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+
+
+def _writev(fd: int, buffers: List[memoryview]) -> None:
+    """Write all of `buffers` to `fd` using vectored I/O
+
+    Handles partial writes and the limit on the number of buffers per call.
+    """
+    i = 0
+    while i < len(buffers):
+        written = os.writev(fd, buffers[i : i + _IOV_MAX])
+        while written > 0:
+            if written >= buffers[i].nbytes:
+                written -= buffers[i].nbytes
+                i += 1
+            else:
+                buffers[i] = buffers[i][written:]
+                written = 0
+
+
+def _frames_to_buffers(frames: Iterable) -> List[memoryview]:
+    """Return the buffers to write, the frame-length index followed by the frames"""
+    frames = [memoryview(f).cast("B") for f in frames]
+    buffers = [memoryview(pack_frames_prelude(frames))]
+    buffers.extend(f for f in frames if f.nbytes > 0)
+    return buffers
+
+
+def disk_write(path: str, frames: Iterable) -> None:
+    """Write frames to a file
+
+    The file starts with an index of the frame lengths followed by the frames.
+    The frames are written directly from their buffers using vectored I/O,
+    thus no concatenated copy of the frames is made. If the write fails, the
+    partially written file is removed.
+
+    Parameters
+    ----------
+    path: str
+        File path to write.
+    frames: Iterable
+        Bytes-like objects to write, must be C-contiguous.
+    """
+    buffers = _frames_to_buffers(frames)
+    try:
+        with open(path, "wb") as f:
+            if hasattr(os, "writev"):
+                _writev(f.fileno(), buffers)
+            else:
+                for buf in buffers:
+                    f.write(buf)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(path)
+        raise
+
+
+def disk_read_frame_lengths(f) -> List[int]:
+    """Read the index of frame lengths of a file written by `disk_write()`
+
+    Parameters
+    ----------
+    f: file object
+        File opened for binary reading positioned at the start of the file.
+        On return, `f` is positioned at the start of the first frame.
+
+    Returns
+    -------
+    lengths: list of int
+        The length of each frame
+    """
+    (n_frames,) = struct.unpack("Q", f.read(8))
+    return list(struct.unpack(f"{n_frames}Q", f.read(8 * n_frames)))
+
+
+def disk_read(
+    path: str, allocator: Optional[Callable[[int], Any]] = None
+) -> List[memoryview]:
+    """Read frames from a file written by `disk_write()`
+
+    By default, the file is memory mapped and the returned frames are memoryviews
+    of the mapping thus no copy of the data is made, the pages are read on access.
+    The mapping is private (copy-on-write), which makes the frames writeable
+    without modifying the file. Notice, the mapping stays valid after the file
+    has been removed.
+
+    If `allocator` is given, each frame is read directly into a buffer allocated
+    by `allocator(nbytes)` using the index of frame lengths.
+
+    Parameters
+    ----------
+    path: str
+        File path to read.
+    allocator: callable, optional
+        Function that returns a writeable buffer of (at least) the given size.
+
+    Returns
+    -------
+    frames: list of memoryview
+        The frames read
+    """
+    with open(path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        if allocator is not None:
+            frames = []
+            for length in disk_read_frame_lengths(f):
+                frame = memoryview(allocator(length)).cast("B")[:length]
+                if length > 0 and f.readinto(frame) != length:
+                    raise IOError(f"Unexpected end of file: {path}")
+                frames.append(frame)
+            return frames
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if hasattr(mm, "madvise"):  # Requires Python 3.8+
+        for advice in ("MADV_SEQUENTIAL", "MADV_WILLNEED"):
+            if hasattr(mmap, advice):
+                mm.madvise(getattr(mmap, advice))
+    return unpack_frames(mm)
+
+
+def disk_read_region(path: str, offset: int, nbytes: int) -> List[memoryview]:
+    """Read frames written at `offset` in a file, such as a segment file
+
+    Like `disk_read()`, the region is memory mapped (copy-on-write) and the
+    returned frames are memoryviews of the mapping.
+
+    Parameters
+    ----------
+    path: str
+        File path to read.
+    offset: int
+        Offset of the frame-length index of the frames.
+    nbytes: int
+        Total size of the frame-length index and the frames.
+
+    Returns
+    -------
+    frames: list of memoryview
+        The frames read
+    """
+    start = offset - offset % mmap.ALLOCATIONGRANULARITY
+    with open(path, "rb") as f:
+        mm = mmap.mmap(
+            f.fileno(), nbytes + offset - start, access=mmap.ACCESS_COPY, offset=start
+        )
+    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+        mm.madvise(mmap.MADV_WILLNEED)
+    return unpack_frames(memoryview(mm)[offset - start :])
+
+
+class DiskQuotaExceeded(OSError):
+    """Raised when spilling to disk would exceed the disk quota"""
+
+
+class DiskQuota:
+    """Tally of the number of bytes spilled to disk, bounded by a quota
+
+    Spilling reserves the bytes to write with `acquire()` before writing,
+    which fails with a clear error instead of running out of disk space in
+    the middle of a write. The bytes are given back with `release()` when
+    the spilled data is removed. When spilling to a SegmentStore, the size of
+    the segment files is reserved, which includes the bytes of removed entries
+    until their segment is compacted.
+
+    This class is threadsafe.
+
+    Parameters
+    ----------
+    limit: int or None
+        Maximum number of bytes spilled to disk. If None, the spilled bytes
+        are tallied but not limited.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._usage = 0
+
+    def __repr__(self) -> str:
+        return f"<DiskQuota usage={self.usage()} limit={self.limit}>"
+
+    def acquire(self, nbytes: int, force: bool = False) -> None:
+        """Reserve `nbytes` bytes of the quota
+
+        Parameters
+        ----------
+        nbytes: int
+            Number of bytes to reserve.
+        force: bool
+            Reserve even if it exceeds the quota, which is used by writes
+            that free more than they reserve such as segment compaction.
+
+        Raises
+        ------
+        DiskQuotaExceeded
+            If the reservation would exceed the quota and `force` is False.
+        """
+        with self._lock:
+            if (
+                not force
+                and self.limit is not None
+                and self._usage + nbytes > self.limit
+            ):
+                raise DiskQuotaExceeded(
+                    errno.EDQUOT,
+                    f"Spilling {nbytes} bytes to disk would exceed the disk quota "
+                    f"of {self.limit} bytes ({self._usage} bytes in use)",
+                )
+            self._usage += nbytes
+
+    def release(self, nbytes: int) -> None:
+        """Give back `nbytes` bytes reserved by `acquire()`"""
+        with self._lock:
+            self._usage -= nbytes
+
+    def usage(self) -> int:
+        """Return the number of bytes reserved"""
+        return self._usage
+
+    def fraction(self) -> float:
+        """Return the fraction of the quota in use, zero if unlimited"""
+        if not self.limit:
+            return 0.0
+        return self._usage / self.limit
+
+
+class Segment:
+    """A segment file of a SegmentStore
+
+    Attributes
+    ----------
+    path: str
+        File path of the segment.
+    size: int
+        Number of bytes written to the segment.
+    live_nbytes: int
+        Number of bytes of the segment that are still referenced.
+    keys: set of str
+        Keys of the entries referenced in the segment.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = 0
+        self.live_nbytes = 0
+        self.keys: Set[str] = set()
+
+
+class SegmentStore:
+    """Append-only store that packs many spilled frame lists into segment files
+
+    Writing a file per spilled object makes filesystem metadata operations
+    (create, unlink, and inode churn) the bottleneck when spilling millions of
+    small objects. Instead, this store appends entries to a large segment file
+    and maintains an in-memory index of (segment, offset, nbytes) per key.
+
+    Removing an entry only decrements the live bytes of its segment. A segment
+    is deleted when it has no live entries left. A background thread compacts
+    sealed segments whose fraction of live bytes drops below
+    `compaction_threshold` by moving their live entries to the active segment.
+
+    When sharing an entry with another process, `link()` makes a hard link of
+    the segment. The link keeps the segment data alive, even if the segment is
+    deleted or compacted by this store, until the receiver removes the link.
+
+    Parameters
+    ----------
+    directory: str
+        Directory to write the segment files.
+    prefix: str
+        Prefix of the segment file names.
+    segment_size: int
+        Size of a segment file before a new segment is started.
+    compaction_threshold: float
+        Compact sealed segments with a smaller fraction of live bytes.
+    background_compaction: bool
+        Whether to run compaction in a background thread or not.
+    quota: DiskQuota or None
+        Reserve the bytes appended to the segment files in this quota, which
+        are given back when a segment file is deleted.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str,
+        segment_size: int = 2 ** 28,
+        compaction_threshold: float = 0.5,
+        background_compaction: bool = True,
+        quota: Optional[DiskQuota] = None,
+    ):
+        self._directory = directory
+        self._quota = quota
+        self._prefix = prefix
+        self._segment_size = segment_size
+        self._compaction_threshold = compaction_threshold
+        self._lock = threading.RLock()
+        self._index: Dict[str, Tuple[Segment, int, int]] = {}
+        self._segment_counter = itertools.count()
+        self._key_counter = itertools.count()
+        self._segments: Set[Segment] = set()
+        self._active: Optional[Segment] = None
+        self._active_fd: Optional[int] = None
+        self._compaction_event = threading.Event()
+        if background_compaction:
+            threading.Thread(
+                target=_compaction_thread_main,
+                args=(weakref.ref(self), self._compaction_event),
+                name="JIT-Unspill compaction thread",
+                daemon=True,
+            ).start()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass  # At interpreter shutdown, the modules used might be gone
+
+    def close(self) -> None:
+        """Close the active segment
+
+        The store can still be used, the next write starts a new segment.
+        """
+        with self._lock:
+            self._seal_active_segment()
+
+    def segments(self) -> Set[Segment]:
+        """Return all segments that contain live entries or are active"""
+        with self._lock:
+            return set(self._segments)
+
+    def _remove_segment(self, seg: Segment) -> None:
+        """Delete the segment file, must be called with the lock held"""
+        os.remove(seg.path)
+        self._segments.discard(seg)
+        if self._quota is not None:
+            self._quota.release(seg.size)
+
+    def _seal_active_segment(self) -> None:
+        """Close the active segment, must be called with the lock held"""
+        if self._active is None:
+            return
+        os.close(self._active_fd)
+        seg = self._active
+        self._active = None
+        self._active_fd = None
+        if seg.live_nbytes == 0:
+            self._remove_segment(seg)
+
+    def _append(
+        self, buffers: List[memoryview], force: bool = False
+    ) -> Tuple[Segment, int, int]:
+        """Append `buffers` to the active segment, must be called with the lock held
+
+        The bytes are reserved in the quota first, see ``DiskQuota.acquire()``.
+
+        Returns
+        -------
+        The segment, offset, and number of bytes written
+        """
+        nbytes = sum(b.nbytes for b in buffers)
+        if self._quota is not None:
+            self._quota.acquire(nbytes, force=force)
+            try:
+                return self._append_reserved(buffers, nbytes)
+            except BaseException:
+                self._quota.release(nbytes)
+                raise
+        return self._append_reserved(buffers, nbytes)
+
+    def _append_reserved(
+        self, buffers: List[memoryview], nbytes: int
+    ) -> Tuple[Segment, int, int]:
+        """Write the already reserved `buffers`, see `_append()`"""
+        if self._active is not None and (
+            self._active.size > 0 and self._active.size + nbytes > self._segment_size
+        ):
+            self._seal_active_segment()
+        if self._active is None:
+            path = os.path.join(
+                self._directory,
+                f"{self._prefix}-segment-{next(self._segment_counter)}",
+            )
+            self._active_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+            self._active = Segment(path)
+            self._segments.add(self._active)
+        seg = self._active
+        offset = seg.size
+        if hasattr(os, "writev"):
+            _writev(self._active_fd, list(buffers))
+        else:
+            for buf in buffers:
+                os.write(self._active_fd, buf)
+        seg.size += nbytes
+        return seg, offset, nbytes
+
+    def _assign(self, key: str, location: Tuple[Segment, int, int]) -> None:
+        """Set the location of `key`, must be called with the lock held"""
+        seg, _, nbytes = location
+        self._index[key] = location
+        seg.live_nbytes += nbytes
+        seg.keys.add(key)
+
+    def _release(self, key: str) -> None:
+        """Remove `key` from the index, must be called with the lock held"""
+        seg, _, nbytes = self._index.pop(key)
+        seg.live_nbytes -= nbytes
+        seg.keys.discard(key)
+        if seg is self._active:
+            return
+        if seg.live_nbytes == 0:
+            self._remove_segment(seg)
+        elif seg.live_nbytes < seg.size * self._compaction_threshold:
+            self._compaction_event.set()
+
+    def put(self, frames: Iterable) -> str:
+        """Write frames to the store
+
+        Parameters
+        ----------
+        frames: Iterable
+            Bytes-like objects to write, must be C-contiguous.
+
+        Returns
+        -------
+        key: str
+            The key of the new entry
+        """
+        buffers = _frames_to_buffers(frames)
+        with self._lock:
+            key = f"{self._prefix}-{next(self._key_counter)}"
+            self._assign(key, self._append(buffers))
+            return key
+
+    def get(self, key: str) -> List[memoryview]:
+        """Read the frames of `key`, see `disk_read_region()`"""
+        with self._lock:
+            # Notice, we map the region while holding the lock to prevent
+            # compaction from removing the segment in the meantime.
+            seg, offset, nbytes = self._index[key]
+            return disk_read_region(seg.path, offset, nbytes)
+
+    def remove(self, key: str) -> None:
+        """Remove the entry of `key`"""
+        with self._lock:
+            self._release(key)
+
+    def link(self, key: str) -> Tuple[str, int, int]:
+        """Make a hard link of the segment of `key` for sharing with other processes
+
+        Returns
+        -------
+        The path of the link, and the offset and size of the entry
+        """
+        with self._lock:
+            seg, offset, nbytes = self._index[key]
+            path = f"{seg.path}-linked-{uuid.uuid4()}"
+            os.link(seg.path, path)
+            return path, offset, nbytes
+
+    def compact(self) -> int:
+        """Move live entries out of sealed segments with few live bytes
+
+        Returns
+        -------
+        Number of segments compacted
+        """
+        with self._lock:
+            candidates = [
+                seg
+                for seg in self._segments
+                if seg is not self._active
+                and seg.live_nbytes < seg.size * self._compaction_threshold
+            ]
+        for seg in candidates:
+            for key in list(seg.keys):
+                with self._lock:
+                    location = self._index.get(key)
+                    if location is None or location[0] is not seg:
+                        continue  # Removed in the meantime
+                    _, offset, nbytes = location
+                    with open(seg.path, "rb") as f:
+                        f.seek(offset)
+                        data = f.read(nbytes)
+                    # Compaction frees more than it writes thus we ignore the
+                    # quota, which is given back when `seg` is deleted.
+                    location = self._append([memoryview(data)], force=True)
+                    self._release(key)
+                    self._assign(key, location)
+        return len(candidates)
+
+
+def _compaction_thread_main(store_ref: "weakref.ReferenceType[SegmentStore]", event):
+    """Main loop of the compaction thread of a SegmentStore
+
+    The thread holds a weak reference to the store and exits when the
+    store has been freed.
+    """
+    logger = logging.getLogger("distributed.worker")
+    while True:
+        woken = event.wait(timeout=1)
+        store = store_ref()
+        if store is None:
+            return
+        if woken:
+            event.clear()
+            try:
+                store.compact()
+            except Exception as e:
+                logger.error("JIT-Unspill: compaction of spill segments failed: %s", e)
+        del store
+
+
+# The segment store used by the "disk" serializer if enabled,
+# see `ProxifyHostFile.register_disk_spilling()`
+segment_store: Optional[SegmentStore] = None
+
+# The tally and quota of the bytes spilled by the "disk" serializer,
+# see `ProxifyHostFile.register_disk_spilling()`
+disk_quota: Optional[DiskQuota] = None
+
+# The locations of spilled data by content hash used to deduplicate spilling,
+# see `ProxifyHostFile.write_to_disk()`
+spilled_content: Optional[ContentStore] = None
+
+
+def spilled_read(header: dict) -> List[memoryview]:
+    """Read the frames of a "disk" serialized object
+
+    Parameters
+    ----------
+    header: dict
+        The header of the "disk" serialized object, which either refers to
+        a file ("path"), a region of a file ("path", "offset", and "nbytes"),
+        or an entry in the segment store ("segment-key").
+
+    Returns
+    -------
+    frames: list of memoryview
+        The frames read
+    """
+    if "segment-key" in header:
+        assert segment_store is not None
+        return segment_store.get(header["segment-key"])
+    if "offset" in header:
+        return disk_read_region(header["path"], header["offset"], header["nbytes"])
+    return disk_read(header["path"])
+
+
+def spilled_remove(header: dict) -> None:
+    """Remove the data of a "disk" serialized object, see `spilled_read()`
+
+    If the header has a "content-hash", the data is shared by all objects
+    spilled with the same content and is only removed when the last of them
+    is removed. If the header has a "disk-nbytes", the bytes are given back
+    to `disk_quota`.
+    """
+    if spilled_content is not None and "content-hash" in header:
+        _, freed = spilled_content.release(header["content-hash"])
+        if not freed:
+            return
+    if disk_quota is not None and "disk-nbytes" in header:
+        disk_quota.release(header["disk-nbytes"])
+    if "segment-key" in header:
+        assert segment_store is not None
+        segment_store.remove(header["segment-key"])
+    else:
+        os.remove(header["path"])
+
+
+def spilled_link(header: dict) -> dict:
+    """Hard link the data of a "disk" serialized object
+
+    Returns a new header, referring to the link, that can be shared with
+    other processes on the same (shared) filesystem.
+    """
+    header = copy.copy(header)
+    # The link is removed independently of the deduplicated data and
+    # doesn't count towards the disk quota of this process
+    header.pop("content-hash", None)
+    header.pop("disk-nbytes", None)
+    if "segment-key" in header:
+        assert segment_store is not None
+        path, offset, nbytes = segment_store.link(header.pop("segment-key"))
+        header.update(path=path, offset=offset, nbytes=nbytes)
+    else:
+        old_path = header["path"]
+        header["path"] = f"{old_path}-linked-{uuid.uuid4()}"
+        os.link(old_path, header["path"])
+    return header
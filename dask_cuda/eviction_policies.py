@@ -0,0 +1,363 @@
+import abc
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Type
+
+# Eviction hints derived from the state of the worker, which take precedence
+# over the eviction policy: victims are taken in ascending hint order and only
+# keys with the same hint are ordered by the policy.
+# See ``ProxifyHostFile.set_eviction_hints()``.
+HINT_NOT_NEEDED = 0  # No pending dependents, e.g. only held for transfer to peers
+HINT_DEFAULT = 1  # No hint or the next dependent doesn't run soon
+HINT_NEEDED_SOON = 2  # A dependent is among the next tasks to run
+HINT_PINNED = 3  # Pinned in memory thus never evicted, see ``ProxifyHostFile.pin()``
+
+
+class EvictionPolicy(abc.ABC):
+    """Base class of the eviction policies used to choose what to spill
+
+    A policy ranks each key tracked by an ``AccessIndex``: it assigns the key
+    to one of `nsegments` segments and gives it a priority within the segment.
+    Victims are taken from the segment chosen by `select_segment()` in
+    ascending priority order.
+
+    The ranking is based on the last access, the access count (as recorded
+    in ``ProxyDetail``), the size, and for cost-aware policies, the estimated
+    cost of reloading the key, see ``SpillCostModel``.
+    """
+
+    nsegments = 1
+
+    # Whether the policy uses the `cost` argument of `rank()`, which is
+    # only calculated for cost-aware policies
+    uses_cost = False
+
+    @abc.abstractmethod
+    def rank(
+        self,
+        key: Hashable,
+        last_access: float,
+        access_count: int,
+        size: int,
+        segment: Optional[int],
+        cost: float,
+    ) -> Tuple[int, Any]:
+        """Rank a new or updated key
+
+        Parameters
+        ----------
+        key: Hashable
+            The key to rank.
+        last_access: float
+            Time of the last access of the key.
+        access_count: int
+            Number of accesses of the key.
+        size: int
+            Size of the key in bytes.
+        segment: int or None
+            The current segment of the key or None if the key is new.
+        cost: float
+            The estimated cost of reloading the key in seconds if the policy
+            `uses_cost` otherwise 1.
+
+        Returns
+        -------
+        The segment and the priority of the key, lowest priority is evicted first
+        """
+
+    def select_segment(self, nbytes: List[int], nkeys: List[int]) -> int:
+        """Return the segment to evict from next
+
+        Parameters
+        ----------
+        nbytes: list of int
+            Number of bytes in each segment not already selected for eviction.
+        nkeys: list of int
+            Number of keys in each segment not already selected for eviction.
+        """
+        return 0
+
+    def evicted(
+        self, key: Hashable, segment: int, priority: Any, size: int, total: int
+    ) -> None:
+        """Notify the policy that `key` has been selected for eviction
+
+        Parameters
+        ----------
+        key: Hashable
+            The evicted key.
+        segment: int
+            The segment of the key.
+        priority: Any
+            The priority of the key.
+        size: int
+            Size of the key in bytes.
+        total: int
+            Total number of bytes tracked before the eviction.
+        """
+
+    def forget(self, key: Hashable) -> None:
+        """Notify the policy that `key` is gone for good and will never return"""
+
+
+class LRU(EvictionPolicy):
+    """Evict the least recently accessed keys first"""
+
+    def rank(self, key, last_access, access_count, size, segment, cost):
+        return 0, last_access
+
+
+class LFU(EvictionPolicy):
+    """Evict the least frequently accessed keys first
+
+    Ties in access count are broken by last access.
+    """
+
+    def rank(self, key, last_access, access_count, size, segment, cost):
+        return 0, (access_count, last_access)
+
+
+class GreedyDualSize(EvictionPolicy):
+    """GreedyDual-Size with frequency (GDSF)
+
+    The priority of a key is ``L + access_count * cost / size`` where `L` is an
+    inflation value set to the priority of the latest eviction, which ages keys
+    that haven't been accessed for a while. Large keys that are rarely accessed
+    and cheap to reload are evicted first.
+
+    The cost is the estimated time it takes to spill and reload the key, which
+    is learned from the observed (de)serialization throughput of its type,
+    see ``SpillCostModel``. It includes a fixed per-object overhead thus the
+    cost per byte of large keys is lower than that of small keys.
+    """
+
+    uses_cost = True
+
+    def __init__(self):
+        self.inflation = 0.0
+
+    def rank(self, key, last_access, access_count, size, segment, cost):
+        size = max(size, 1)
+        priority = self.inflation + access_count * cost / size
+        return 0, (priority, last_access)
+
+    def evicted(self, key, segment, priority, size, total):
+        self.inflation = max(self.inflation, priority[0])
+
+
+class ARC(EvictionPolicy):
+    """Adaptive Replacement Cache (ARC)
+
+    Keys accessed once are in the recency segment (T1) and keys accessed more
+    than once are in the frequency segment (T2). Both segments are ordered by
+    last access. The policy keeps "ghost" lists of recently evicted keys (B1
+    and B2) and adapts the target size of T1: reloading a key evicted from T1
+    grows the target and reloading a key evicted from T2 shrinks it.
+
+    Notice, ghost hits require that a key is the same after being reloaded,
+    which isn't the case for device memory buffers. Thus, the access index of
+    device memory passes the ID of a proxy to the policy instead, see
+    ``AccessIndex.update()``.
+    """
+
+    nsegments = 2
+
+    def __init__(self):
+        self.target = 0  # Target size of T1 in bytes
+        self.total = 0
+        self.ghosts: Tuple[Dict[Hashable, int], Dict[Hashable, int]] = (
+            OrderedDict(),
+            OrderedDict(),
+        )
+        self.ghosts_nbytes = [0, 0]
+
+    def _pop_ghost(self, segment: int, key: Hashable) -> int:
+        size = self.ghosts[segment].pop(key)
+        self.ghosts_nbytes[segment] -= size
+        return size
+
+    def rank(self, key, last_access, access_count, size, segment, cost):
+        if segment is None:
+            b1, b2 = self.ghosts_nbytes
+            if key in self.ghosts[0]:
+                self._pop_ghost(0, key)
+                delta = max(1.0, b2 / b1) * size if b1 else size
+                self.target = min(self.target + delta, self.total)
+                return 1, last_access
+            if key in self.ghosts[1]:
+                self._pop_ghost(1, key)
+                delta = max(1.0, b1 / b2) * size if b2 else size
+                self.target = max(self.target - delta, 0)
+                return 1, last_access
+        if segment == 1 or access_count > 1:
+            return 1, last_access
+        return 0, last_access
+
+    def forget(self, key):
+        for segment in (0, 1):
+            if key in self.ghosts[segment]:
+                self._pop_ghost(segment, key)
+
+    def select_segment(self, nbytes, nkeys):
+        if nkeys[0] > 0 and (nbytes[0] > self.target or nkeys[1] == 0):
+            return 0
+        return 1
+
+    def evicted(self, key, segment, priority, size, total):
+        self.total = total
+        ghosts = self.ghosts[segment]
+        if key in ghosts:
+            self._pop_ghost(segment, key)
+        ghosts[key] = size
+        self.ghosts_nbytes[segment] += size
+        # Each ghost list remembers at most `total` bytes of evicted keys
+        while self.ghosts_nbytes[segment] > total and ghosts:
+            self._pop_ghost(segment, next(iter(ghosts)))
+
+
+class SpillCostModel:
+    """Estimate the cost of spilling and reloading proxied objects
+
+    The model learns the serialization and deserialization throughput of each
+    combination of type name (``ProxyDetail.typename``) and serializer from
+    observed spills and unspills. The throughput is an exponentially weighted
+    moving average.
+
+    The cost of an object is a fixed per-object overhead plus its size divided
+    by the throughput. Without the overhead, the cost would be proportional to
+    the size and cost-aware policies couldn't favor small objects, which cost
+    more per byte to spill and reload.
+
+    This class is threadsafe
+
+    Parameters
+    ----------
+    default_throughput: float
+        Throughput in bytes per second used until a serializer has been observed.
+    alpha: float
+        Weight of a new observation in the moving average.
+    overhead: float
+        Fixed time in seconds it takes to spill and reload an object regardless
+        of its size, such as the allocations and the headers.
+    """
+
+    def __init__(
+        self,
+        default_throughput: float = 1e9,
+        alpha: float = 0.2,
+        overhead: float = 1e-4,
+    ):
+        self.default_throughput = default_throughput
+        self.alpha = alpha
+        self.overhead = overhead
+        self._lock = threading.Lock()
+        # Keyed by (op, typename, serializer) and (op, None, serializer) where op
+        # is "serialize" or "deserialize".
+        self._throughput: Dict[Tuple[str, Optional[str], str], float] = {}
+
+    def record(
+        self, op: str, typename: str, serializer: str, nbytes: int, seconds: float
+    ) -> None:
+        """Record an observed serialization or deserialization
+
+        Parameters
+        ----------
+        op: str
+            Either "serialize" or "deserialize".
+        typename: str
+            Name of the type of the proxied object.
+        serializer: str
+            The serializer serialized to or deserialized from.
+        nbytes: int
+            Size of the proxied object.
+        seconds: float
+            The time it took.
+        """
+        if nbytes <= 0 or seconds <= 0:
+            return
+        throughput = nbytes / seconds
+        with self._lock:
+            for key in ((op, typename, serializer), (op, None, serializer)):
+                old = self._throughput.get(key)
+                if old is None:
+                    self._throughput[key] = throughput
+                else:
+                    self._throughput[key] = old + self.alpha * (throughput - old)
+
+    def throughput(self, op: str, typename: str, serializers: Iterable[str]) -> float:
+        """Return the estimated throughput in bytes per second
+
+        The estimate of `typename` is used if observed with one of `serializers`,
+        otherwise the estimate of any type, and otherwise `default_throughput`.
+        """
+        with self._lock:
+            for name in (typename, None):
+                observed = [
+                    self._throughput[(op, name, s)]
+                    for s in serializers
+                    if (op, name, s) in self._throughput
+                ]
+                if observed:
+                    return sum(observed) / len(observed)
+        return self.default_throughput
+
+    def reload_cost(
+        self, typename: str, serializers: Iterable[str], nbytes: int
+    ) -> float:
+        """Return the estimated time in seconds to spill and reload an object
+
+        Parameters
+        ----------
+        typename: str
+            Name of the type of the proxied object.
+        serializers: Iterable[str]
+            The serializers the object would be spilled with.
+        nbytes: int
+            Size of the proxied object.
+        """
+        serializers = tuple(serializers)
+        return (
+            self.overhead
+            + nbytes / self.throughput("serialize", typename, serializers)
+            + nbytes / self.throughput("deserialize", typename, serializers)
+        )
+
+    def statistics(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Return the learned throughput of each type name and serializer
+
+        Returns
+        -------
+        Dictionary mapping "serialize" and "deserialize" to a dictionary that maps
+        "<typename>/<serializer>" to bytes per second.
+        """
+        ret: Dict[str, Dict[str, float]] = {"serialize": {}, "deserialize": {}}
+        with self._lock:
+            for (op, typename, serializer), v in self._throughput.items():
+                if typename is not None:
+                    ret[op][f"{typename}/{serializer}"] = v
+        return ret
+
+
+policies: Dict[str, Type[EvictionPolicy]] = {
+    "lru": LRU,
+    "lfu": LFU,
+    "gds": GreedyDualSize,
+    "arc": ARC,
+}
+
+
+def get_eviction_policy(name: str) -> EvictionPolicy:
+    """Return a new instance of the eviction policy named `name`
+
+    Parameters
+    ----------
+    name: str
+        One of "lru", "lfu", "gds" (cost-aware GreedyDual-Size), or "arc".
+    """
+    try:
+        return policies[name.lower()]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown eviction policy '{name}', "
+            f"choices include: {', '.join(policies)}"
+        )
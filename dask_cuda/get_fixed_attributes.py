@@ -0,0 +1,107 @@
+import numpy
+import pandas
+
+from dask.utils import Dispatch
+
+dispatch = Dispatch(name="get_fixed_attributes")
+
+
+def get_fixed_attributes(obj) -> dict:
+    """Get cheap metadata of `obj` that a spilled proxy of `obj` can return
+
+    The metadata is captured when the proxied object is serialized (spilled)
+    and makes it possible to inspect spilled data without deserializing it,
+    e.g. `df.dtypes`, `df.columns`, or `arr.shape`. Register new types in
+    `dispatch`, which must return a dictionary mapping attribute names to
+    values. Notice, the values must be small and pickleable.
+
+    The special "_pxy_meta" entry is an empty object of the same type, which
+    is used by `make_meta()` of spilled proxies.
+
+    Parameters
+    ----------
+    obj: Any
+        The object to get the metadata of
+
+    Returns
+    -------
+    ret: dict
+        Dictionary of attribute names and values
+    """
+    return dispatch(obj)
+
+
+@dispatch.register(object)
+def get_fixed_attributes_default(obj):
+    return {}
+
+
+def get_fixed_attributes_array(a):
+    ret = {
+        "shape": a.shape,
+        "ndim": a.ndim,
+        "dtype": a.dtype,
+        "size": a.size,
+        "nbytes": a.nbytes,
+        "itemsize": a.itemsize,
+    }
+    if a.ndim > 0:
+        ret["__len__"] = a.shape[0]
+    return ret
+
+
+def get_fixed_attributes_frame(f, range_index_type):
+    """Metadata of dataframes, series, and indexes of Pandas and cuDF"""
+    ret = {
+        "shape": f.shape,
+        "ndim": f.ndim,
+        "empty": f.empty,
+        "__len__": len(f),
+        # A deep copy since an empty slice is a view that keeps the data alive.
+        # Notice, indexes doesn't have `iloc`.
+        "_pxy_meta": getattr(f, "iloc", f)[:0].copy(deep=True),
+    }
+    if hasattr(f, "columns"):
+        ret["columns"] = f.columns
+        ret["dtypes"] = f.dtypes
+    else:
+        ret["dtype"] = f.dtype
+    # Only range indexes are cheap to keep around. Other indexes, including
+    # just their name or dtype, require deserialization since `.index` must
+    # return the real index.
+    index = getattr(f, "index", None)
+    if isinstance(index, range_index_type):
+        ret["index"] = index
+    return ret
+
+
+@dispatch.register(numpy.ndarray)
+def get_fixed_attributes_numpy(a):
+    return get_fixed_attributes_array(a)
+
+
+@dispatch.register(pandas.DataFrame)
+@dispatch.register(pandas.Series)
+@dispatch.register(pandas.Index)
+def get_fixed_attributes_pandas(f):
+    return get_fixed_attributes_frame(f, pandas.RangeIndex)
+
+
+@dispatch.register_lazy("cupy")
+def get_fixed_attributes_register_cupy():
+    import cupy
+
+    @dispatch.register(cupy.ndarray)
+    def get_fixed_attributes_cupy(a):
+        return get_fixed_attributes_array(a)
+
+
+@dispatch.register_lazy("cudf")
+def get_fixed_attributes_register_cudf():
+    import cudf
+
+    @dispatch.register(cudf.DataFrame)
+    @dispatch.register(cudf.Series)
+    @dispatch.register(cudf.BaseIndex)
+    def get_fixed_attributes_cudf(f):
+        return get_fixed_attributes_frame(f, cudf.RangeIndex)
@@ -0,0 +1,246 @@
+import threading
+import weakref
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Optional
+
+import numpy as np
+
+import dask
+import distributed.protocol
+from dask.utils import parse_bytes
+from distributed.protocol.serialize import register_serialization_family
+
+# Sizes up to the smallest size class are rounded up to it
+MIN_SIZE_CLASS = 4096
+
+
+def size_class(nbytes: int) -> int:
+    """Return the size of the buffers used for allocations of `nbytes`
+
+    Above `MIN_SIZE_CLASS`, each power of two is divided into four size classes
+    thus at most 25% of an allocation is wasted.
+    """
+    if nbytes <= MIN_SIZE_CLASS:
+        return MIN_SIZE_CLASS
+    step = 1 << (nbytes.bit_length() - 3)
+    return -(-nbytes // step) * step
+
+
+def _pinned_available() -> bool:
+    try:
+        import numba.cuda
+
+        return numba.cuda.is_available()
+    except Exception:
+        return False
+
+
+class HostArena:
+    """Pool of reusable host buffers used for device-to-host spilling
+
+    Allocating a fresh host buffer for each spilled frame means heavy
+    malloc/free churn and page faults on large spills. Instead, the arena
+    hands out views of size-classed buffers and when a view is freed, e.g.
+    when a spilled proxy is unspilled, its buffer is returned to the arena
+    for reuse. Freed buffers are cached per size class until the total size
+    of the cached buffers reaches `max_cached`.
+
+    The buffers are allocated in page-locked (pinned) memory, which makes
+    device-host copies faster, when `pinned` is True and CUDA is available.
+    Otherwise, they are regular NumPy arrays.
+
+    This class is threadsafe.
+
+    Parameters
+    ----------
+    pinned: bool
+        Allocate buffers in pinned memory if CUDA is available.
+    max_cached: int
+        Maximum number of bytes of freed buffers to keep for reuse.
+    """
+
+    def __init__(self, pinned: bool = True, max_cached: int = 2 ** 30):
+        self.pinned = pinned and _pinned_available()
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._free: DefaultDict[int, List[np.ndarray]] = defaultdict(list)
+        self._stats = {
+            "allocations": 0,
+            "reuses": 0,
+            "releases": 0,
+            "bytes-in-use": 0,
+            "bytes-cached": 0,
+            "peak-bytes-in-use": 0,
+        }
+
+    def __repr__(self) -> str:
+        backend = "pinned" if self.pinned else "numpy"
+        return f"<HostArena {backend}: {self.statistics()}>"
+
+    def _new_buffer(self, size: int) -> np.ndarray:
+        if self.pinned:
+            import numba.cuda
+
+            return numba.cuda.pinned_array(size, dtype=np.uint8)
+        return np.empty(size, dtype=np.uint8)
+
+    def allocate(self, nbytes: int) -> np.ndarray:
+        """Return an uninitialized host buffer of `nbytes` bytes
+
+        The buffer is returned to the arena when it, and all objects
+        referencing it such as memoryviews of it, have been freed.
+
+        Returns
+        -------
+        A one-dimensional uint8 NumPy array
+        """
+        size = size_class(nbytes)
+        with self._lock:
+            self._stats["allocations"] += 1
+            free = self._free[size]
+            if free:
+                buf = free.pop()
+                self._stats["reuses"] += 1
+                self._stats["bytes-cached"] -= size
+            else:
+                buf = None
+            self._stats["bytes-in-use"] += size
+            self._stats["peak-bytes-in-use"] = max(
+                self._stats["peak-bytes-in-use"], self._stats["bytes-in-use"]
+            )
+        if buf is None:
+            buf = self._new_buffer(size)
+        ret = buf[:nbytes]
+        weakref.finalize(ret, self._release, buf)
+        return ret
+
+    def _release(self, buf: np.ndarray) -> None:
+        size = buf.nbytes
+        with self._lock:
+            self._stats["releases"] += 1
+            self._stats["bytes-in-use"] -= size
+            if self._stats["bytes-cached"] + size <= self.max_cached:
+                self._free[size].append(buf)
+                self._stats["bytes-cached"] += size
+
+    def clear(self) -> None:
+        """Free all cached buffers"""
+        with self._lock:
+            self._free.clear()
+            self._stats["bytes-cached"] = 0
+
+    def statistics(self) -> Dict[str, int]:
+        """Return the allocation statistics
+
+        Returns
+        -------
+        Dict of the number of "allocations", allocations served by a cached
+        buffer ("reuses"), and "releases" together with the current and peak
+        size of buffers handed out ("bytes-in-use" and "peak-bytes-in-use")
+        and the size of the cached buffers ("bytes-cached").
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+# The arena used by the "arena" serializer if enabled, see `register_host_arena()`
+host_arena: Optional[HostArena] = None
+
+
+def register_host_arena(pinned: bool = None, max_cached: int = None) -> HostArena:
+    """Enable the host arena used by the "arena" serializer
+
+    This is a global operation thus all spilling that uses the "arena"
+    serializer shares the same arena, which is created by the first call.
+
+    Parameters
+    ----------
+    pinned: bool or None, default None
+        Allocate the buffers in pinned memory if CUDA is available. If ``None``,
+        the "jit-unspill-host-arena-pinned" config value are used, which defaults
+        to True.
+    max_cached: int or str or None, default None
+        Maximum number of bytes of freed buffers to keep for reuse. If ``None``,
+        the "jit-unspill-host-arena-max-cached" config value are used, which
+        defaults to "1 GiB".
+
+    Returns
+    -------
+    The host arena
+    """
+    global host_arena
+    if host_arena is None:
+        if pinned is None:
+            pinned = dask.config.get("jit-unspill-host-arena-pinned", default=True)
+        if max_cached is None:
+            max_cached = dask.config.get(
+                "jit-unspill-host-arena-max-cached", default="1 GiB"
+            )
+        host_arena = HostArena(pinned=pinned, max_cached=parse_bytes(max_cached))
+    return host_arena
+
+
+def _as_device_bytes(frame):
+    """Return `frame` as a one-dimensional uint8 Numba device array"""
+    import numba.cuda
+
+    ret = numba.cuda.as_cuda_array(frame)
+    if ret.ndim != 1:
+        ret = ret.reshape(ret.size)
+    if ret.dtype != np.uint8:
+        ret = ret.view(np.uint8)
+    return ret
+
+
+def device_to_arena(frame, arena: HostArena) -> memoryview:
+    """Copy the device `frame` into a host buffer allocated by `arena`"""
+    cai = frame.__cuda_array_interface__
+    nbytes = int(np.dtype(cai["typestr"]).itemsize * np.prod(cai["shape"]))
+    ret = arena.allocate(nbytes)
+    if nbytes > 0:
+        _as_device_bytes(frame).copy_to_host(ary=ret)
+    return memoryview(ret)
+
+
+def host_to_device(frame):
+    """Copy the host `frame` to a new device buffer
+
+    Like Distributed, we use a RMM device buffer if RMM is available.
+    """
+    try:
+        import rmm
+    except ImportError:
+        import numba.cuda
+
+        return numba.cuda.to_device(np.frombuffer(frame, dtype=np.uint8))
+    return rmm.DeviceBuffer.to_device(memoryview(frame).cast("B"))
+
+
+def arena_dumps(x):
+    """Serialize `x` with the "cuda" serializer and copy device frames to the arena
+
+    Raises NotImplementedError if the arena is disabled or `x` doesn't support
+    the "cuda" serializer, which makes `serialize()` try the next serializer.
+    """
+    arena = host_arena
+    if arena is None:
+        raise NotImplementedError("The host arena is disabled")
+    try:
+        header, frames = distributed.protocol.serialize(
+            x, serializers=("cuda",), on_error="raise"
+        )
+    except TypeError as e:
+        raise NotImplementedError(str(e)) from e
+    is_device = [hasattr(f, "__cuda_array_interface__") for f in frames]
+    frames = [device_to_arena(f, arena) if d else f for f, d in zip(frames, is_device)]
+    return {"arena-sub-header": header, "is-device": is_device}, frames
+
+
+def arena_loads(header, frames):
+    frames = [
+        host_to_device(f) if d else f for f, d in zip(frames, header["is-device"])
+    ]
+    return distributed.protocol.deserialize(header["arena-sub-header"], frames)
+
+
+register_serialization_family("arena", arena_dumps, arena_loads)
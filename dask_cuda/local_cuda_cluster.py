@@ -12,6 +12,11 @@ from .initialize import initialize
 from .proxify_host_file import ProxifyHostFile
 from .utils import (
     CPUAffinity,
+    DiskQuotaBackpressure,
+    JITUnspillEvictionHints,
+    JITUnspillMetrics,
+    JITUnspillPrefetch,
+    PinKeys,
     RMMSetup,
     _ucx_111,
     cuda_visible_devices,
@@ -399,6 +404,11 @@ class LocalCUDACluster(LocalCluster):
                         self.rmm_async,
                         self.rmm_log_directory,
                     ),
+                    JITUnspillMetrics(),
+                    JITUnspillPrefetch(),
+                    JITUnspillEvictionHints(),
+                    PinKeys(),
+                    DiskQuotaBackpressure(),
                 },
             }
         )
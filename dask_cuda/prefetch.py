@@ -0,0 +1,127 @@
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, List, Set
+
+from dask.sizeof import sizeof
+
+from .proxify_host_file import ProxifyHostFile, find_proxies
+from .proxy_object import ProxyObject
+
+logger = logging.getLogger("distributed.worker")
+
+
+class Prefetcher:
+    """Unspill the dependencies of the next tasks of a worker ahead of execution
+
+    With JIT-unspill, a spilled dependency is unspilled when the task touches
+    it, which makes the task thread wait on disk reads and host-to-device
+    copies. Instead, the prefetcher looks at the ready tasks of the worker
+    with the highest priority and promotes their spilled dependencies one
+    memory tier up, from disk to host or from host to device, in a background
+    thread. See ``ProxyManager.promote()``.
+
+    The prefetching never evicts, a dependency is only promoted if the target
+    tier has room for it below the limit that makes ``ProxyManager.maybe_evict()``
+    spill. Additionally, the number of bytes being promoted at any time is
+    bounded by `budget`.
+
+    `prefetch()` must be called from the worker's event loop, which is where
+    the worker's task states are updated.
+
+    Parameters
+    ----------
+    worker: distributed.Worker
+        The worker, which must use a ProxifyHostFile as its data store.
+    budget: int
+        Maximum number of bytes being promoted at any time.
+    lookahead: int
+        Number of ready tasks, in priority order, to prefetch dependencies of.
+    """
+
+    def __init__(self, worker, budget: int, lookahead: int):
+        assert isinstance(worker.data, ProxifyHostFile)
+        self.worker = worker
+        self.hostfile: ProxifyHostFile = worker.data
+        self.budget = budget
+        self.lookahead = lookahead
+        self._lock = threading.Lock()
+        self._pending: Set[int] = set()  # IDs of the proxies being promoted
+        self._pending_nbytes = 0
+        self._stats = {"promoted": 0, "promoted-bytes": 0, "skipped": 0}
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="JIT-Unspill prefetch"
+        )
+
+    def next_dependencies(self) -> List[Hashable]:
+        """Return the keys of the dependencies of the next tasks to execute"""
+        keys = [key for _, key in heapq.nsmallest(self.lookahead, self.worker.ready)]
+        keys.extend(list(self.worker.constrained)[: self.lookahead])
+        ret = []
+        for key in keys:
+            ts = self.worker.tasks.get(key)
+            if ts is not None:
+                ret.extend(dep.key for dep in ts.dependencies)
+        return ret
+
+    def prefetch(self) -> int:
+        """Start promoting the spilled dependencies of the next tasks
+
+        Returns
+        -------
+        Number of proxies scheduled for promotion
+        """
+        found: List[ProxyObject] = []
+        with self.hostfile.lock:
+            for key in self.next_dependencies():
+                if key in self.hostfile.store:
+                    find_proxies(self.hostfile.store[key], found)
+
+        manager = self.hostfile.manager
+        batch = []
+        with self._lock:
+            for p in found:
+                if id(p) in self._pending or not p._pxy_get().is_serialized():
+                    continue
+                if not manager.contains(id(p)):
+                    continue  # Not tracked by the manager
+                size = sizeof(p)
+                if self._pending_nbytes + size > self.budget:
+                    break
+                self._pending.add(id(p))
+                self._pending_nbytes += size
+                batch.append((p, size))
+        if batch:
+            self._executor.submit(self._promote, batch)
+        return len(batch)
+
+    def _promote(self, batch) -> None:
+        manager = self.hostfile.manager
+        for p, size in batch:
+            try:
+                nbytes = manager.promote(p)
+            except Exception as e:
+                logger.warning("JIT-Unspill: prefetch failed: %s", e)
+                nbytes = 0
+            with self._lock:
+                self._pending.discard(id(p))
+                self._pending_nbytes -= size
+                if nbytes > 0:
+                    self._stats["promoted"] += 1
+                    self._stats["promoted-bytes"] += nbytes
+                else:
+                    self._stats["skipped"] += 1
+
+    def statistics(self) -> Dict[str, int]:
+        """Return the number of "promoted" and "skipped" proxies and bytes promoted
+
+        Returns
+        -------
+        Dict of "promoted", "skipped", and "promoted-bytes"
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
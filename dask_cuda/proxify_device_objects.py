@@ -2,11 +2,15 @@ import functools
 import pydoc
 from collections import defaultdict
 from functools import partial
-from typing import Any, List, MutableMapping
+from typing import Any, Dict, List, Mapping, MutableMapping
 
 import dask
-from dask.utils import Dispatch
+from dask.sizeof import sizeof
+from dask.utils import Dispatch, parse_bytes
 
+from .chunked_proxy_object import ChunkedProxyObject
+from .column_proxy_object import ColumnProxyObject
+from .composite_proxy_object import CompositeProxyObject
 from .proxy_object import ProxyObject, asproxy
 
 dispatch = Dispatch(name="proxify_device_objects")
@@ -54,6 +58,7 @@ def proxify_device_objects(
     found_proxies: List[ProxyObject] = None,
     excl_proxies: bool = False,
     mark_as_explicit_proxies: bool = False,
+    proxy_options: Mapping[str, Any] = None,
 ):
     """ Wrap device objects in ProxyObject
 
@@ -78,6 +83,10 @@ def proxify_device_objects(
     mark_as_explicit_proxies: bool
         Mark found proxies as "explicit", which means that the user allows them
         as input arguments to dask tasks even in compatibility-mode.
+    proxy_options: Mapping[str, Any]
+        Keyword arguments of `new_proxy()`, which proxifies the CUDA device
+        objects not already in `proxied_id_to_proxy`. If None, use an empty
+        dict, which proxifies the objects using ProxyObject.
 
     Returns
     -------
@@ -90,7 +99,11 @@ def proxify_device_objects(
         proxied_id_to_proxy = {}
     if found_proxies is None:
         found_proxies = []
-    ret = dispatch(obj, proxied_id_to_proxy, found_proxies, excl_proxies)
+    if proxy_options is None:
+        proxy_options = {}
+    ret = dispatch(
+        obj, proxied_id_to_proxy, found_proxies, excl_proxies, proxy_options
+    )
     if mark_as_explicit_proxies:
         for p in found_proxies:
             p._pxy_get().explicit_proxy = True
@@ -142,7 +155,11 @@ def proxify_decorator(func):
     def wrapper(*args, **kwargs):
         ret = func(*args, **kwargs)
         if dask.config.get("jit-unspill-compatibility-mode", default=False):
-            ret = proxify_device_objects(ret, mark_as_explicit_proxies=True)
+            ret = proxify_device_objects(
+                ret,
+                mark_as_explicit_proxies=True,
+                proxy_options=proxy_options_from_config(),
+            )
         return ret
 
     return wrapper
@@ -164,27 +181,80 @@ def unproxify_decorator(func):
     return wrapper
 
 
-def proxify(obj, proxied_id_to_proxy, found_proxies, subclass=None):
+def proxy_options_from_config() -> Dict[str, Any]:
+    """Return the options of `new_proxy()` set in the config
+
+    Dataframes are column-granular proxied if the "jit-unspill-column-granular"
+    config value is True and objects larger than the "jit-unspill-chunk-size"
+    config value, if set, are chunked.
+    """
+    chunk_size = dask.config.get("jit-unspill-chunk-size", default=None)
+    return {
+        "column_granular": bool(
+            dask.config.get("jit-unspill-column-granular", default=False)
+        ),
+        "chunk_size": parse_bytes(chunk_size) if chunk_size else None,
+    }
+
+
+def new_proxy(
+    obj,
+    column_granular: bool = False,
+    chunk_size: int = None,
+    device_memory_limit: int = None,
+) -> ProxyObject:
+    """Proxify the device object `obj`
+
+    Parameters
+    ----------
+    obj: Any
+        The device object to proxify.
+    column_granular: bool
+        Proxify dataframes using ColumnProxyObject.
+    chunk_size: int or None
+        Proxify objects larger than `chunk_size` bytes using ChunkedProxyObject
+        split into chunks of `chunk_size` bytes. If None, objects aren't chunked.
+    device_memory_limit: int or None
+        Since the chunks are copies, an object and its chunks briefly exist
+        simultaneously thus objects larger than half of `device_memory_limit`
+        aren't chunked. If None, the size of chunked objects isn't limited.
+    """
+    if column_granular and ColumnProxyObject.supports(obj):
+        return asproxy(obj, subclass=ColumnProxyObject)
+    if chunk_size and ChunkedProxyObject.supports(obj):
+        nbytes = sizeof(obj)
+        if nbytes > chunk_size and (
+            device_memory_limit is None or 2 * nbytes <= device_memory_limit
+        ):
+            return ChunkedProxyObject.from_chunk_size(obj, chunk_size)
+    return asproxy(obj)
+
+
+def proxify(obj, proxied_id_to_proxy, found_proxies, proxy_options):
     _id = id(obj)
     if _id not in proxied_id_to_proxy:
-        proxied_id_to_proxy[_id] = asproxy(obj, subclass=subclass)
+        proxied_id_to_proxy[_id] = new_proxy(obj, **proxy_options)
     ret = proxied_id_to_proxy[_id]
-    found_proxies.append(ret)
+    if isinstance(ret, CompositeProxyObject):
+        # The parts are the proxies managed individually
+        found_proxies.extend(ret._pxy_get_part_proxies())
+    else:
+        found_proxies.append(ret)
     return ret
 
 
 @dispatch.register(object)
 def proxify_device_object_default(
-    obj, proxied_id_to_proxy, found_proxies, excl_proxies
+    obj, proxied_id_to_proxy, found_proxies, excl_proxies, proxy_options
 ):
     if hasattr(obj, "__cuda_array_interface__") and not isinstance(obj, ignore_types):
-        return proxify(obj, proxied_id_to_proxy, found_proxies)
+        return proxify(obj, proxied_id_to_proxy, found_proxies, proxy_options)
     return obj
 
 
 @dispatch.register(ProxyObject)
 def proxify_device_object_proxy_object(
-    obj: ProxyObject, proxied_id_to_proxy, found_proxies, excl_proxies
+    obj: ProxyObject, proxied_id_to_proxy, found_proxies, excl_proxies, proxy_options
 ):
     # Check if `obj` is already known
     pxy = obj._pxy_get()
@@ -200,24 +270,43 @@ def proxify_device_object_proxy_object(
     return obj
 
 
+@dispatch.register(CompositeProxyObject)
+def proxify_device_object_composite_proxy_object(
+    obj: CompositeProxyObject,
+    proxied_id_to_proxy,
+    found_proxies,
+    excl_proxies,
+    proxy_options,
+):
+    dispatch(
+        obj._pxy_get_part_proxies(),
+        proxied_id_to_proxy,
+        found_proxies,
+        excl_proxies,
+        proxy_options,
+    )
+    return obj
+
+
 @dispatch.register(list)
 @dispatch.register(tuple)
 @dispatch.register(set)
 @dispatch.register(frozenset)
 def proxify_device_object_python_collection(
-    seq, proxied_id_to_proxy, found_proxies, excl_proxies
+    seq, proxied_id_to_proxy, found_proxies, excl_proxies, proxy_options
 ):
     return type(seq)(
-        dispatch(o, proxied_id_to_proxy, found_proxies, excl_proxies) for o in seq
+        dispatch(o, proxied_id_to_proxy, found_proxies, excl_proxies, proxy_options)
+        for o in seq
     )
 
 
 @dispatch.register(dict)
 def proxify_device_object_python_dict(
-    seq, proxied_id_to_proxy, found_proxies, excl_proxies
+    seq, proxied_id_to_proxy, found_proxies, excl_proxies, proxy_options
 ):
     return {
-        k: dispatch(v, proxied_id_to_proxy, found_proxies, excl_proxies)
+        k: dispatch(v, proxied_id_to_proxy, found_proxies, excl_proxies, proxy_options)
         for k, v in seq.items()
     }
 
@@ -231,9 +320,9 @@ def _register_cudf():
     @dispatch.register(cudf.Series)
     @dispatch.register(cudf.BaseIndex)
     def proxify_device_object_cudf_dataframe(
-        obj, proxied_id_to_proxy, found_proxies, excl_proxies
+        obj, proxied_id_to_proxy, found_proxies, excl_proxies, proxy_options
     ):
-        return proxify(obj, proxied_id_to_proxy, found_proxies)
+        return proxify(obj, proxied_id_to_proxy, found_proxies, proxy_options)
 
     try:
         from dask.array.dispatch import percentile_lookup
@@ -1,4 +1,6 @@
 import abc
+import heapq
+import itertools
 import logging
 import os
 import threading
@@ -7,75 +9,375 @@ import uuid
 import warnings
 import weakref
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Any,
+    Callable,
+    Container,
     DefaultDict,
     Dict,
     Hashable,
+    Iterable,
     List,
+    Mapping,
     MutableMapping,
     Optional,
     Set,
     Tuple,
+    Union,
 )
 from weakref import ReferenceType
 
 import dask
+import distributed.utils
 from dask.sizeof import sizeof
-from distributed.protocol.compression import decompress, maybe_compress
+from dask.utils import parse_bytes, parse_timedelta
 from distributed.protocol.serialize import (
     merge_and_deserialize,
     register_serialization_family,
     serialize_and_split,
 )
-from distributed.protocol.utils import pack_frames, unpack_frames
 
+from . import disk_compression, disk_io
+from .composite_proxy_object import CompositeProxyObject
+from .content_store import ContentStore, content_hash, readonly_frames
+from .eviction_policies import (
+    HINT_DEFAULT,
+    HINT_NEEDED_SOON,
+    HINT_NOT_NEEDED,
+    HINT_PINNED,
+    LRU,
+    EvictionPolicy,
+    SpillCostModel,
+    get_eviction_policy,
+)
+from .host_arena import register_host_arena
 from .proxify_device_objects import proxify_device_objects, unproxify_device_objects
-from .proxy_object import ProxyObject
+from .proxy_object import ProxyDetail, ProxyObject
+from .spill_metrics import SpillMetrics
+from .utils import parse_pin_limit
+
+
+def find_proxies(obj: Any, found: List[ProxyObject]) -> None:
+    """Append the tracked proxies within `obj` to `found`
+
+    Notice, the parts of a CompositeProxyObject are tracked and found
+    instead of the composite proxy itself.
+    """
+    if isinstance(obj, CompositeProxyObject):
+        found.extend(obj._pxy_get_part_proxies())
+    elif isinstance(obj, ProxyObject):
+        found.append(obj)
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            find_proxies(v, found)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            find_proxies(v, found)
+
+
+class AccessIndex:
+    """Index of keys ordered for eviction
+
+    The order is given by an eviction policy, see ``eviction_policies``, which
+    by default is LRU: the keys are ordered by their last access.
+
+    Each segment of the policy is a binary heap with lazy deletion: updating or
+    removing a key invalidates its current heap entry, which is then discarded
+    when it surfaces. Thus, `update()` is O(log n), `remove()` is O(1), and
+    finding the k first keys to evict is O(k log n).
+
+    Keys are ordered by their eviction hint before the policy, see
+    ``eviction_policies.HINT_DEFAULT``, and pinned keys are never returned for
+    eviction. Ties in priority are broken by size, largest first.
+
+    The policy knows a key by its policy key, which defaults to the key itself.
+    Policies that remember evicted keys, such as ARC, require a policy key that
+    is the same when the key is reloaded.
+
+    This class is not threadsafe
+    """
+
+    def __init__(self, policy: EvictionPolicy = None):
+        self.policy = LRU() if policy is None else policy
+        self._heaps: List[List[Tuple[int, Any, int, int, Hashable]]] = [
+            [] for _ in range(self.policy.nsegments)
+        ]
+        self._nbytes = [0] * self.policy.nsegments
+        self._nkeys = [0] * self.policy.nsegments
+        self._entries: Dict[Hashable, Tuple[int, int, Any, int, int]] = {}
+        self._access: Dict[Hashable, Tuple[float, int, int]] = {}
+        self._policy_keys: Dict[Hashable, Hashable] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def last_access(self, key: Hashable) -> float:
+        return self._access[key][0]
+
+    def access_count(self, key: Hashable) -> int:
+        return self._access[key][1]
+
+    def hint(self, key: Hashable) -> int:
+        return self._access[key][2]
+
+    def update(
+        self,
+        key: Hashable,
+        last_access: float,
+        size: int,
+        access_count: int = 1,
+        cost: float = 1.0,
+        hint: int = HINT_DEFAULT,
+        policy_key: Hashable = None,
+    ) -> None:
+        """Insert `key` or update its last access, size, access count, cost,
+        eviction hint, and policy key"""
+        old = self._entries.get(key)
+        if old is not None:
+            self._nbytes[old[0]] += old[3]
+            self._nkeys[old[0]] -= 1
+        if policy_key is None:
+            policy_key = self._policy_keys.get(key, key)
+        elif policy_key is not key:
+            self._policy_keys[key] = policy_key
+        segment, priority = self.policy.rank(
+            policy_key,
+            last_access,
+            access_count,
+            size,
+            None if old is None else old[0],
+            cost,
+        )
+        entry = (segment, hint, priority, -size, next(self._counter))
+        self._entries[key] = entry
+        self._access[key] = (last_access, access_count, hint)
+        self._nbytes[segment] += size
+        self._nkeys[segment] += 1
+        heapq.heappush(self._heaps[segment], entry[1:] + (key,))
+        if sum(map(len, self._heaps)) > 2 * len(self._entries) + 64:
+            # Too many invalidated entries, rebuild the heaps
+            for heap in self._heaps:
+                heap.clear()
+            for k, e in self._entries.items():
+                self._heaps[e[0]].append(e[1:] + (k,))
+            for heap in self._heaps:
+                heapq.heapify(heap)
+
+    def remove(self, key: Hashable) -> None:
+        """Remove `key`, which invalidates its heap entry"""
+        segment, _, _, neg_size, _ = self._entries.pop(key)
+        del self._access[key]
+        self._policy_keys.pop(key, None)
+        self._nbytes[segment] += neg_size
+        self._nkeys[segment] -= 1
+        if len(self._entries) == 0:
+            for heap in self._heaps:
+                heap.clear()
+
+    def forget(self, policy_key: Hashable) -> None:
+        """Notify the policy that `policy_key` will never be inserted again"""
+        self.policy.forget(policy_key)
+
+    def _head_hint(self, segment: int) -> Optional[int]:
+        """Return the hint of the first valid entry of `segment` (if any)
+
+        Invalid entries at the top of the heap are discarded.
+        """
+        heap = self._heaps[segment]
+        while heap:
+            entry = heap[0]
+            if self._entries.get(entry[4]) == (segment,) + entry[:4]:
+                return entry[0]
+            heapq.heappop(heap)
+        return None
+
+    def idle(self, cutoff: float) -> List[Tuple[Hashable, int]]:
+        """Return the unpinned keys not accessed since `cutoff`
+
+        Unlike `least_recently_accessed()`, this scans all keys and doesn't
+        notify the eviction policy.
+
+        Returns
+        -------
+        List of (key, size) tuples
+        """
+        return [
+            (key, -self._entries[key][3])
+            for key, (last_access, _, hint) in self._access.items()
+            if last_access <= cutoff and hint < HINT_PINNED
+        ]
+
+    def least_recently_accessed(self, nbytes: int) -> List[Tuple[Hashable, int]]:
+        """Return the keys to evict first
+
+        The name reflects the default LRU policy, the order is given by the
+        eviction policy, which is notified of the returned keys.
+
+        Parameters
+        ----------
+        nbytes: int
+            Keep returning keys until their accumulated size reaches `nbytes`
+
+        Returns
+        -------
+        List of (key, size) tuples in eviction order
+        """
+        ret = []
+        popped: List[Tuple[int, Tuple[int, Any, int, int, Hashable]]] = []
+        remaining_nbytes = list(self._nbytes)
+        remaining_nkeys = list(self._nkeys)
+        total_nbytes = sum(self._nbytes)
+        total = 0
+        while total < nbytes and len(popped) < len(self._entries):
+            # The policy selects among the segments with the lowest hint
+            hints = [self._head_hint(i) for i in range(len(self._heaps))]
+            lowest = min(h for h in hints if h is not None)
+            if lowest >= HINT_PINNED:
+                break  # Only pinned keys left
+            segment = self.policy.select_segment(remaining_nbytes, remaining_nkeys)
+            if hints[segment] != lowest:
+                segment = hints.index(lowest)
+            heap = self._heaps[segment]
+            entry = heapq.heappop(heap)
+            key = entry[4]
+            if self._entries.get(key) != (segment,) + entry[:4]:
+                continue  # Notice, invalid entries are discarded for good
+            popped.append((segment, entry))
+            size = -entry[2]
+            ret.append((key, size))
+            total += size
+            remaining_nbytes[segment] -= size
+            remaining_nkeys[segment] -= 1
+            self.policy.evicted(
+                self._policy_keys.get(key, key), segment, entry[1], size, total_nbytes
+            )
+        for segment, entry in popped:
+            heapq.heappush(self._heaps[segment], entry)
+        return ret
 
 
 class Proxies(abc.ABC):
     """Abstract base class to implement tracking of proxies
 
-    This class is not threadsafe
+    Besides the memory usage, each subclass maintains `self._access_index`,
+    which orders the tracked memory using the eviction `policy` and makes it
+    possible to find the memory to evict without a scan of all proxies.
+
+    If the policy is cost-aware, the cost of a proxy is estimated by
+    `cost_model` assuming it is spilled with one of `spill_serializers`.
+
+    Each instance has its own lock, which makes it possible to access the
+    proxies of one tier while another tier is being updated. Moving a proxy
+    between tiers requires the lock of the ProxyManager.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        policy: EvictionPolicy = None,
+        cost_model: SpillCostModel = None,
+        spill_serializers: Tuple[str, ...] = (),
+        pinned: Container[int] = (),
+    ):
         self._proxy_id_to_proxy: Dict[int, ReferenceType[ProxyObject]] = {}
         self._mem_usage = 0
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
+        self._access_index = AccessIndex(policy)
+        self._cost_model = cost_model
+        self._spill_serializers = spill_serializers
+        self._pinned = pinned
+
+    def eviction_hint(self, proxy_id: int, pxy: ProxyDetail) -> int:
+        """The eviction hint of a proxy, which is HINT_PINNED if it is pinned
+
+        The IDs of the pinned proxies are the source of truth for pinning,
+        see ``ProxyManager.pin()``, since the hint of the proxy detail might
+        be overwritten by a concurrent update of the proxy.
+        """
+        if proxy_id in self._pinned:
+            return HINT_PINNED
+        return pxy.eviction_hint
+
+    def reload_cost(self, pxy: ProxyDetail, size: int) -> float:
+        """Estimated cost of spilling and reloading, see `SpillCostModel`"""
+        if self._cost_model is None or not self._access_index.policy.uses_cost:
+            return 1.0
+        return self._cost_model.reload_cost(pxy.typename, self._spill_serializers, size)
 
     def __len__(self) -> int:
         return len(self._proxy_id_to_proxy)
 
+    def prepare(self, proxy: ProxyObject, pxy: ProxyDetail) -> None:
+        """Prepare the addition of `proxy` with the details `pxy`
+
+        Called before `add()` without holding any lock, which makes it possible
+        to do expensive work, such as hashing, outside of the locks.
+        """
+
     @abc.abstractmethod
     def mem_usage_add(self, proxy: ProxyObject) -> None:
-        """Given a new proxy, update `self._mem_usage`"""
+        """Given a new proxy, update `self._mem_usage` and `self._access_index`
+
+        Called with `self._lock` held.
+        """
 
     @abc.abstractmethod
     def mem_usage_remove(self, proxy: ProxyObject) -> None:
-        """Removal of proxy, update `self._mem_usage`"""
+        """Removal of proxy, update `self._mem_usage` and `self._access_index`
+
+        Called with `self._lock` held.
+        """
+
+    @abc.abstractmethod
+    def _touch(self, proxy: ProxyObject) -> None:
+        """Access of proxy, update `self._access_index`
+
+        Called with `self._lock` held.
+        """
 
     def add(self, proxy: ProxyObject) -> None:
         """Add a proxy for tracking, calls `self.mem_usage_add`"""
-        assert not self.contains_proxy_id(id(proxy))
         with self._lock:
+            assert not self.contains_proxy_id(id(proxy))
             self._proxy_id_to_proxy[id(proxy)] = weakref.ref(proxy)
-        self.mem_usage_add(proxy)
+            self.mem_usage_add(proxy)
 
     def remove(self, proxy: ProxyObject) -> None:
         """Remove proxy from tracking, calls `self.mem_usage_remove`"""
         with self._lock:
             del self._proxy_id_to_proxy[id(proxy)]
-        self.mem_usage_remove(proxy)
-        if len(self._proxy_id_to_proxy) == 0:
-            if self._mem_usage != 0:
-                warnings.warn(
-                    "ProxyManager is empty but the tally of "
-                    f"{self} is {self._mem_usage} bytes. "
-                    "Resetting the tally."
-                )
-                self._mem_usage = 0
+            self.mem_usage_remove(proxy)
+            if len(self._proxy_id_to_proxy) == 0:
+                if self._mem_usage != 0:
+                    warnings.warn(
+                        "ProxyManager is empty but the tally of "
+                        f"{self} is {self._mem_usage} bytes. "
+                        "Resetting the tally."
+                    )
+                    self._mem_usage = 0
+
+    def forget(self, proxy_id: int) -> None:
+        """Notify the eviction policy that the proxy of `proxy_id` has been freed"""
+        with self._lock:
+            self._access_index.forget(proxy_id)
+
+    def touch(self, proxy: ProxyObject) -> bool:
+        """Register an access of proxy
+
+        Returns
+        -------
+        Whether the proxy was found, it might have been moved to another tier
+        concurrently in which case the new tier has registered the access.
+        """
+        with self._lock:
+            if not self.contains_proxy_id(id(proxy)):
+                return False
+            self._touch(proxy)
+            return True
 
     def get_proxies(self) -> List[ProxyObject]:
         with self._lock:
@@ -86,6 +388,11 @@ class Proxies(abc.ABC):
                     ret.append(proxy)
             return ret
 
+    def get_proxy_by_id(self, proxy_id: int) -> Optional[ProxyObject]:
+        """Return the proxy of `proxy_id` or None if it has been freed"""
+        with self._lock:
+            return self._proxy_id_to_proxy[proxy_id]()
+
     def contains_proxy_id(self, proxy_id: int) -> bool:
         return proxy_id in self._proxy_id_to_proxy
 
@@ -97,13 +404,186 @@ class ProxiesOnHost(Proxies):
     """Implement tracking of proxies on the CPU
 
     This uses dask.sizeof to update memory usage.
+    The access index is keyed by proxy ID.
     """
 
     def mem_usage_add(self, proxy: ProxyObject):
-        self._mem_usage += sizeof(proxy)
+        size = sizeof(proxy)
+        self._mem_usage += size
+        pxy = proxy._pxy_get()
+        self._access_index.update(
+            id(proxy),
+            pxy.last_access,
+            size,
+            pxy.access_count,
+            self.reload_cost(pxy, size),
+            self.eviction_hint(id(proxy), pxy),
+        )
 
     def mem_usage_remove(self, proxy: ProxyObject):
         self._mem_usage -= sizeof(proxy)
+        self._access_index.remove(id(proxy))
+
+    def _touch(self, proxy: ProxyObject):
+        pxy = proxy._pxy_get()
+        size = sizeof(proxy)
+        self._access_index.update(
+            id(proxy),
+            pxy.last_access,
+            size,
+            pxy.access_count,
+            self.reload_cost(pxy, size),
+            self.eviction_hint(id(proxy), pxy),
+        )
+
+    def least_recently_accessed(self, nbytes: int) -> List[Tuple[int, ProxyObject]]:
+        """Return the least recently accessed proxies
+
+        Parameters
+        ----------
+        nbytes: int
+            Keep returning proxies until their accumulated size reaches `nbytes`
+
+        Returns
+        -------
+        List of (size, proxy) tuples ordered by last access
+        """
+        ret = []
+        with self._lock:
+            for proxy_id, size in self._access_index.least_recently_accessed(nbytes):
+                proxy = self.get_proxy_by_id(proxy_id)
+                if proxy is not None:
+                    ret.append((size, proxy))
+        return ret
+
+    def idle(self, cutoff: float) -> List[Tuple[int, ProxyObject]]:
+        """Return the proxies not accessed since `cutoff`
+
+        Returns
+        -------
+        List of (size, proxy) tuples
+        """
+        ret = []
+        with self._lock:
+            for proxy_id, size in self._access_index.idle(cutoff):
+                proxy = self.get_proxy_by_id(proxy_id)
+                if proxy is not None:
+                    ret.append((size, proxy))
+        return ret
+
+
+class ProxiesOnCompressedHost(ProxiesOnHost):
+    """Implement tracking of proxies compressed in host memory
+
+    The memory usage is the size of the compressed frames, which we record
+    per proxy because the (cached) sizeof of a proxy is its uncompressed size.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._proxy_id_to_nbytes: Dict[int, int] = {}
+
+    def mem_usage_add(self, proxy: ProxyObject):
+        _, frames = proxy._pxy_get().obj
+        size = sum(map(distributed.utils.nbytes, frames))
+        self._proxy_id_to_nbytes[id(proxy)] = size
+        self._mem_usage += size
+        pxy = proxy._pxy_get()
+        self._access_index.update(
+            id(proxy),
+            pxy.last_access,
+            size,
+            pxy.access_count,
+            self.reload_cost(pxy, size),
+            self.eviction_hint(id(proxy), pxy),
+        )
+
+    def mem_usage_remove(self, proxy: ProxyObject):
+        self._mem_usage -= self._proxy_id_to_nbytes.pop(id(proxy))
+        self._access_index.remove(id(proxy))
+
+    def _touch(self, proxy: ProxyObject):
+        pxy = proxy._pxy_get()
+        size = self._proxy_id_to_nbytes[id(proxy)]
+        self._access_index.update(
+            id(proxy),
+            pxy.last_access,
+            size,
+            pxy.access_count,
+            self.reload_cost(pxy, size),
+            self.eviction_hint(id(proxy), pxy),
+        )
+
+
+class ProxiesOnDeduplicatedHost(ProxiesOnHost):
+    """Implement tracking of proxies on the CPU that share identical frames
+
+    When a proxy is added, its serialized frames are replaced by the frames of
+    an already tracked proxy with the same content hash (if any), which makes
+    the proxies share a single copy of the frames. The memory usage only
+    includes each distinct payload once.
+
+    Notice, the shared frames are read-only, see ``content_store.readonly_frames()``.
+    The access index still uses the size of each proxy, thus spilling a proxy
+    that shares its frames only frees memory once all sharing proxies have been
+    spilled. In this case, subsequent evictions spill more proxies.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._content = ContentStore()  # digest -> (frames, size)
+        self._proxy_id_to_digest: Dict[int, str] = {}
+        # Digests computed by `prepare()`: proxy ID -> (hashed obj, digest)
+        self._prepared: Dict[int, Tuple[Any, str]] = {}
+
+    def prepare(self, proxy: ProxyObject, pxy: ProxyDetail) -> None:
+        # Hashing the frames is expensive thus we do it before taking the
+        # locks and record the frames hashed along with the digest
+        self._prepared[id(proxy)] = (pxy.obj, content_hash(pxy.obj[1]))
+
+    def mem_usage_add(self, proxy: ProxyObject):
+        pxy = proxy._pxy_get()
+        header, frames = pxy.obj
+        # Notice, the prepared digest must not outlive the frames it was
+        # computed from, which are replaced below
+        prepared = self._prepared.pop(id(proxy), None)
+        if prepared is not None and prepared[0] is pxy.obj:
+            digest = prepared[1]
+        else:
+            digest = content_hash(frames)
+        size = sizeof(proxy)
+        (frames, _), inserted = self._content.insert(
+            digest, (readonly_frames(frames), size)
+        )
+        pxy.obj = (header, frames)
+        self._proxy_id_to_digest[id(proxy)] = digest
+        if inserted:
+            self._mem_usage += size
+        self._access_index.update(
+            id(proxy),
+            pxy.last_access,
+            size,
+            pxy.access_count,
+            self.reload_cost(pxy, size),
+            self.eviction_hint(id(proxy), pxy),
+        )
+
+    def mem_usage_remove(self, proxy: ProxyObject):
+        (_, size), freed = self._content.release(
+            self._proxy_id_to_digest.pop(id(proxy))
+        )
+        if freed:
+            self._mem_usage -= size
+        self._access_index.remove(id(proxy))
+
+    def _touch(self, proxy: ProxyObject):
+        # A proxy prepared concurrently with its move to this tier isn't added
+        self._prepared.pop(id(proxy), None)
+        super()._touch(proxy)
+
+    def forget(self, proxy_id: int) -> None:
+        self._prepared.pop(proxy_id, None)
+        super().forget(proxy_id)
 
 
 class ProxiesOnDisk(ProxiesOnHost):
@@ -117,10 +597,16 @@ class ProxiesOnDevice(Proxies):
     handle that multiple proxy objects can refer to the same underlying
     device memory object. Thus, we have to track aliasing and make sure
     we don't count down the memory usage prematurely.
+
+    The access index is keyed by device memory object and the last access,
+    access count, and eviction hint of a device memory object are the highest
+    of the proxies referring to it. Since a device memory object is new when
+    reloaded, the eviction policy knows it by the ID of the latest proxy that
+    accessed it.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.proxy_id_to_dev_mems: Dict[int, Set[Hashable]] = {}
         self.dev_mem_to_proxy_ids: DefaultDict[Hashable, Set[int]] = defaultdict(set)
 
@@ -134,6 +620,7 @@ class ProxiesOnDevice(Proxies):
             if len(ps) == 0:
                 self._mem_usage += sizeof(dev_mem)
             ps.add(proxy_id)
+        self._touch(proxy)
 
     def mem_usage_remove(self, proxy: ProxyObject):
         proxy_id = id(proxy)
@@ -142,6 +629,133 @@ class ProxiesOnDevice(Proxies):
             if len(self.dev_mem_to_proxy_ids[dev_mem]) == 0:
                 del self.dev_mem_to_proxy_ids[dev_mem]
                 self._mem_usage -= sizeof(dev_mem)
+                self._access_index.remove(dev_mem)
+            else:
+                self._update_dev_mem_access(dev_mem)
+
+    def _touch(self, proxy: ProxyObject):
+        pxy = proxy._pxy_get()
+        hint = self.eviction_hint(id(proxy), pxy)
+        index = self._access_index
+        for dev_mem in self.proxy_id_to_dev_mems[id(proxy)]:
+            if dev_mem not in index:
+                last_access, access_count = pxy.last_access, pxy.access_count
+            else:
+                if index.hint(dev_mem) != hint:
+                    # The hint might decrease thus we have to check all proxies
+                    self._update_dev_mem_access(dev_mem)
+                    continue
+                old = (index.last_access(dev_mem), index.access_count(dev_mem))
+                last_access = max(old[0], pxy.last_access)
+                access_count = max(old[1], pxy.access_count)
+                if (last_access, access_count) == old:
+                    continue
+            size = sizeof(dev_mem)
+            index.update(
+                dev_mem,
+                last_access,
+                size,
+                access_count,
+                self.reload_cost(pxy, size),
+                hint,
+                policy_key=id(proxy),
+            )
+
+    def _update_dev_mem_access(self, dev_mem: Hashable) -> None:
+        """Recalculate the access of `dev_mem` from the proxies using it"""
+        last_access = None
+        access_count = 0
+        cost = 0.0
+        hint = HINT_NOT_NEEDED
+        size = sizeof(dev_mem)
+        for proxy_id in self.dev_mem_to_proxy_ids[dev_mem]:
+            proxy = self.get_proxy_by_id(proxy_id)
+            if proxy is not None:
+                pxy = proxy._pxy_get()
+                a = pxy.last_access
+                last_access = a if last_access is None else max(last_access, a)
+                access_count = max(access_count, pxy.access_count)
+                cost = max(cost, self.reload_cost(pxy, size))
+                hint = max(hint, self.eviction_hint(proxy_id, pxy))
+        if last_access is not None:
+            self._access_index.update(
+                dev_mem, last_access, size, access_count, cost, hint
+            )
+
+    def get_dev_buffer_to_proxies(self) -> Dict[Hashable, List[ProxyObject]]:
+        """Return the proxies referring to each device memory object
+
+        This uses the incrementally maintained `dev_mem_to_proxy_ids` thus
+        the device memory objects of the proxies are not retrieved again.
+        """
+        with self._lock:
+            ret = {}
+            for dev_mem, proxy_ids in self.dev_mem_to_proxy_ids.items():
+                proxies = []
+                for proxy_id in proxy_ids:
+                    proxy = self.get_proxy_by_id(proxy_id)
+                    if proxy is not None:
+                        proxies.append(proxy)
+                ret[dev_mem] = proxies
+            return ret
+
+    def get_access_info(self) -> List[Tuple[float, int, List[ProxyObject]]]:
+        """Return the last access, size, and proxies of each device memory object
+
+        The last access is the one aggregated by the access index.
+        """
+        with self._lock:
+            index = self._access_index
+            return [
+                (index.last_access(dev_mem), sizeof(dev_mem), proxies)
+                for dev_mem, proxies in self.get_dev_buffer_to_proxies().items()
+            ]
+
+    def least_recently_accessed(
+        self, nbytes: int
+    ) -> List[Tuple[int, List[ProxyObject]]]:
+        """Return the least recently accessed device memory objects
+
+        Parameters
+        ----------
+        nbytes: int
+            Keep returning device memory objects until their accumulated
+            size reaches `nbytes`
+
+        Returns
+        -------
+        List of (size, proxies) tuples ordered by last access where `proxies`
+        are the proxies referring to the device memory object
+        """
+        ret = []
+        with self._lock:
+            for dev_mem, size in self._access_index.least_recently_accessed(nbytes):
+                proxies = []
+                for proxy_id in self.dev_mem_to_proxy_ids[dev_mem]:
+                    proxy = self.get_proxy_by_id(proxy_id)
+                    if proxy is not None:
+                        proxies.append(proxy)
+                ret.append((size, proxies))
+        return ret
+
+    def idle(self, cutoff: float) -> List[Tuple[int, List[ProxyObject]]]:
+        """Return the device memory objects not accessed since `cutoff`
+
+        Returns
+        -------
+        List of (size, proxies) tuples where `proxies` are the proxies
+        referring to the device memory object
+        """
+        ret = []
+        with self._lock:
+            for dev_mem, size in self._access_index.idle(cutoff):
+                proxies = []
+                for proxy_id in self.dev_mem_to_proxy_ids[dev_mem]:
+                    proxy = self.get_proxy_by_id(proxy_id)
+                    if proxy is not None:
+                        proxies.append(proxy)
+                ret.append((size, proxies))
+        return ret
 
 
 class ProxyManager:
@@ -155,28 +769,195 @@ class ProxyManager:
     their location (device or host). The manager then tallies the total memory usage.
 
     Notice, the manager only keeps weak references to the proxies.
+
+    Each tier (Proxies instance) has its own lock that protects its tally and
+    access index. The manager's `lock` is only required when a proxy is added,
+    removed, or moved between tiers, thus threads can access proxies and select
+    proxies to spill concurrently.
+
+    Parameters
+    ----------
+    device_memory_limit: int
+        Number of bytes of CUDA device memory used before spilling to host.
+    memory_limit: int
+        Number of bytes of host memory used before spilling to disk.
+    background_spilling: bool
+        Start a spill thread that, when the memory usage exceeds the high
+        watermark, spills down to the low watermark. The task threads still
+        spill synchronously when the memory limits are exceeded.
+    spill_high_watermark: float
+        Fraction of the memory limits that triggers background spilling.
+    spill_low_watermark: float
+        Fraction of the memory limits that background spilling drains to.
+    spill_workers: int
+        Number of threads used to serialize the proxies selected for spilling.
+        If 1, proxies are serialized one by one by the calling thread.
+    compressed_memory_limit: int
+        Number of bytes of compressed host memory used before spilling to disk.
+        If larger than zero, proxies spilled from host memory are compressed and
+        kept in host memory until this limit is exceeded. If zero, proxies are
+        spilled directly from host memory to disk.
+    eviction_policy: str
+        Name of the policy used to choose the proxies to spill from device,
+        host, and compressed host memory, see ``eviction_policies``.
+    deduplication: bool
+        Store the serialized frames of proxies in host memory with the same
+        content only once, see ``ProxiesOnDeduplicatedHost``.
+    host_arena: bool
+        Spill from device memory into reusable host buffers using the "arena"
+        serializer, see ``host_arena.HostArena``.
+    pin_limit: int or None
+        Number of bytes of device memory that pinned proxies may use, see
+        `pin()`. If None, it is a quarter of `device_memory_limit`.
+    idle_device_age: float or None
+        Start a demotion thread that, during quiet periods, spills proxies not
+        accessed for `idle_device_age` seconds from device to host memory, see
+        `demote_idle()`. If None, idle proxies aren't demoted from device memory.
+    idle_host_age: float or None
+        Like `idle_device_age` but for proxies in host memory, which are spilled
+        to compressed host memory or disk.
+    idle_interval: float
+        Seconds between the checks of the demotion thread. A period is quiet
+        when no proxy has been added or unspilled during the last interval.
+    column_granular: bool
+        Proxify dataframes using ColumnProxyObject, see ``proxify_device_objects``.
+    chunk_size: int or None
+        Proxify device objects larger than `chunk_size` bytes, but no larger
+        than half of `device_memory_limit`, using ChunkedProxyObject. If None,
+        device objects aren't chunked.
     """
 
-    def __init__(self, device_memory_limit: int, memory_limit: int):
+    def __init__(
+        self,
+        device_memory_limit: int,
+        memory_limit: int,
+        background_spilling: bool = False,
+        spill_high_watermark: float = 0.9,
+        spill_low_watermark: float = 0.7,
+        spill_workers: int = 1,
+        compressed_memory_limit: int = 0,
+        eviction_policy: str = "lru",
+        deduplication: bool = False,
+        host_arena: bool = False,
+        pin_limit: int = None,
+        idle_device_age: float = None,
+        idle_host_age: float = None,
+        idle_interval: float = 1.0,
+        column_granular: bool = False,
+        chunk_size: int = None,
+    ):
         self.lock = threading.RLock()
+        # Keyword arguments of `new_proxy()`, which proxifies new device objects
+        self._proxy_options = {
+            "column_granular": column_granular,
+            "chunk_size": chunk_size,
+            "device_memory_limit": device_memory_limit,
+        }
+        # Serializers used to spill from device to host memory. Notice, the
+        # "arena" serializer falls back to "dask" for objects it doesn't support.
+        self._host_serializers: Tuple[str, ...] = ("dask", "pickle")
+        if host_arena:
+            self._host_serializers = ("arena",) + self._host_serializers
+        # Each tier has its own instance of the eviction policy and spill
+        # serializers, which cost-aware policies use to estimate reload costs
+        self.cost_model = SpillCostModel()
+        self.metrics = SpillMetrics()
+        # Pin count and size of each pinned proxy, which the tiers use to
+        # never evict pinned proxies
+        self._pinned: Dict[int, List[int]] = {}
+        self._pinned_nbytes = 0
         self._disk = ProxiesOnDisk()
-        self._host = ProxiesOnHost()
-        self._dev = ProxiesOnDevice()
+        self._compressed = ProxiesOnCompressedHost(
+            get_eviction_policy(eviction_policy),
+            self.cost_model,
+            ("disk",),
+            self._pinned,
+        )
+        host_type = ProxiesOnDeduplicatedHost if deduplication else ProxiesOnHost
+        self._host = host_type(
+            get_eviction_policy(eviction_policy),
+            self.cost_model,
+            ("compressed",) if compressed_memory_limit > 0 else ("disk",),
+            self._pinned,
+        )
+        self._dev = ProxiesOnDevice(
+            get_eviction_policy(eviction_policy),
+            self.cost_model,
+            self._host_serializers,
+            self._pinned,
+        )
         self._device_memory_limit = device_memory_limit
         self._host_memory_limit = memory_limit
+        self._compressed_memory_limit = compressed_memory_limit
+        self._pin_limit = device_memory_limit // 4 if pin_limit is None else pin_limit
+
+        if not 0 < spill_low_watermark <= spill_high_watermark <= 1:
+            raise ValueError(
+                "The spill watermarks must satisfy "
+                "0 < spill_low_watermark <= spill_high_watermark <= 1"
+            )
+        self._spill_high_watermark = spill_high_watermark
+        self._spill_low_watermark = spill_low_watermark
+        self._spill_event = threading.Event()
+        self._spill_thread: Optional[threading.Thread] = None
+        if background_spilling:
+            self._spill_thread = threading.Thread(
+                target=_spill_thread_main,
+                args=(weakref.ref(self), self._spill_event),
+                name="JIT-Unspill spill thread",
+                daemon=True,
+            )
+            self._spill_thread.start()
+
+        self._idle_device_age = idle_device_age
+        self._idle_host_age = idle_host_age
+        self._last_activity = time.monotonic()  # Last proxify or unspill
+        # Disk quota usage when spilling to disk last failed, None when the
+        # last spill to disk succeeded, see `disk_quota_exhausted()`
+        self._disk_full_usage: Optional[int] = None
+        self._demotion_thread: Optional[threading.Thread] = None
+        if idle_device_age is not None or idle_host_age is not None:
+            self._demotion_thread = threading.Thread(
+                target=_demotion_thread_main,
+                args=(weakref.ref(self), idle_interval),
+                name="JIT-Unspill demotion thread",
+                daemon=True,
+            )
+            self._demotion_thread.start()
+
+        if spill_workers < 1:
+            raise ValueError("spill_workers must be higher than 0")
+        self._spill_executor: Optional[ThreadPoolExecutor] = None
+        if spill_workers > 1:
+            self._spill_executor = ThreadPoolExecutor(
+                max_workers=spill_workers, thread_name_prefix="JIT-Unspill spill"
+            )
+        # Accumulated number of bytes spilled and time spent spilling
+        self._spill_stats_lock = threading.Lock()
+        self._spill_stats: Dict[str, List[float]] = {
+            "device-to-host": [0, 0.0],
+            "host-to-compressed": [0, 0.0],
+            "compressed-to-disk": [0, 0.0],
+            "host-to-disk": [0, 0.0],
+        }
 
     def __repr__(self) -> str:
         with self.lock:
             return (
                 f"<ProxyManager dev_limit={self._device_memory_limit}"
                 f" host_limit={self._host_memory_limit}"
+                f" compressed_limit={self._compressed_memory_limit}"
                 f" disk={self._disk.mem_usage()}({len(self._disk)})"
+                f" compressed={self._compressed.mem_usage()}({len(self._compressed)})"
                 f" host={self._host.mem_usage()}({len(self._host)})"
-                f" dev={self._dev.mem_usage()}({len(self._dev)})>"
+                f" dev={self._dev.mem_usage()}({len(self._dev)})"
+                f" pinned={self._pinned_nbytes}({len(self._pinned)})>"
             )
 
     def __len__(self) -> int:
-        return len(self._disk) + len(self._host) + len(self._dev)
+        return (
+            len(self._disk) + len(self._compressed) + len(self._host) + len(self._dev)
+        )
 
     def pprint(self) -> str:
         with self.lock:
@@ -186,6 +967,8 @@ class ProxyManager:
             ret += "\n"
             for proxy in self._disk.get_proxies():
                 ret += f"  disk - {repr(proxy)}\n"
+            for proxy in self._compressed.get_proxies():
+                ret += f"  comp - {repr(proxy)}\n"
             for proxy in self._host.get_proxies():
                 ret += f"  host - {repr(proxy)}\n"
             for proxy in self._dev.get_proxies():
@@ -195,7 +978,9 @@ class ProxyManager:
     def get_proxies_by_serializer(self, serializer: Optional[str]) -> Proxies:
         if serializer == "disk":
             return self._disk
-        elif serializer in ("dask", "pickle"):
+        elif serializer == "compressed":
+            return self._compressed
+        elif serializer in ("dask", "pickle", "arena"):
             return self._host
         else:
             return self._dev
@@ -206,6 +991,8 @@ class ProxyManager:
             return self._dev
         if self._host.contains_proxy_id(proxy_id):
             return self._host
+        if self._compressed.contains_proxy_id(proxy_id):
+            return self._compressed
         if self._disk.contains_proxy_id(proxy_id):
             return self._disk
         return None
@@ -214,10 +1001,23 @@ class ProxyManager:
         with self.lock:
             return (
                 self._disk.contains_proxy_id(proxy_id)
+                or self._compressed.contains_proxy_id(proxy_id)
                 or self._host.contains_proxy_id(proxy_id)
                 or self._dev.contains_proxy_id(proxy_id)
             )
 
+    def prepare(self, proxy: ProxyObject, pxy: ProxyDetail) -> None:
+        """Prepare the addition of `proxy` with the details `pxy`
+
+        Called by ``ProxyObject._pxy_set()`` before `add()` without holding
+        the lock, see ``Proxies.prepare()``. Only a proxy that moves to a new
+        tier is prepared since `add()` merely touches a proxy that stays in
+        its tier.
+        """
+        new_proxies = self.get_proxies_by_serializer(pxy.serializer)
+        if self.get_proxies_by_proxy_object(proxy) is not new_proxies:
+            new_proxies.prepare(proxy, pxy)
+
     def add(self, proxy: ProxyObject, serializer: Optional[str]) -> None:
         with self.lock:
             old_proxies = self.get_proxies_by_proxy_object(proxy)
@@ -226,6 +1026,9 @@ class ProxyManager:
                 if old_proxies is not None:
                     old_proxies.remove(proxy)
                 new_proxies.add(proxy)
+            else:
+                # E.g. a deserialization that doesn't change tier is an access
+                new_proxies.touch(proxy)
 
     def remove(self, proxy: ProxyObject) -> None:
         with self.lock:
@@ -233,6 +1036,9 @@ class ProxyManager:
             proxies: Optional[Proxies] = None
             if self._disk.contains_proxy_id(id(proxy)):
                 proxies = self._disk
+            if self._compressed.contains_proxy_id(id(proxy)):
+                assert proxies is None, "Proxy in multiple locations"
+                proxies = self._compressed
             if self._host.contains_proxy_id(id(proxy)):
                 assert proxies is None, "Proxy in multiple locations"
                 proxies = self._host
@@ -241,10 +1047,13 @@ class ProxyManager:
                 proxies = self._dev
             assert proxies is not None, "Trying to remove unknown proxy"
             proxies.remove(proxy)
+            # The proxy is freed thus its ID might be reused by a new proxy
+            for proxies in (self._dev, self._host, self._compressed, self._disk):
+                proxies.forget(id(proxy))
 
     def validate(self):
         with self.lock:
-            for serializer in ("disk", "dask", "cuda"):
+            for serializer in ("disk", "compressed", "dask", "cuda"):
                 proxies = self.get_proxies_by_serializer(serializer)
                 for p in proxies.get_proxies():
                     assert (
@@ -260,43 +1069,69 @@ class ProxyManager:
                     if pxy.is_serialized():
                         header, _ = pxy.obj
                         assert header["serializer"] == pxy.serializer
+            for proxies in (self._disk, self._compressed, self._host):
+                assert len(proxies._access_index) == len(proxies)
+            assert len(self._dev._access_index) == len(self._dev.dev_mem_to_proxy_ids)
+
+            # The incrementally maintained device memory mapping must match the
+            # device memory objects of the proxies
+            dev_buf_to_proxy_ids: DefaultDict[Hashable, Set[int]] = defaultdict(set)
+            for p in self._dev.get_proxies():
+                for dev_buffer in p._pxy_get_device_memory_objects():
+                    dev_buf_to_proxy_ids[dev_buffer].add(id(p))
+            assert dev_buf_to_proxy_ids == self._dev.dev_mem_to_proxy_ids
+            for dev_buffer, proxy_ids in dev_buf_to_proxy_ids.items():
+                last_access = max(
+                    self._dev.get_proxy_by_id(i)._pxy_get().last_access
+                    for i in proxy_ids
+                )
+                assert self._dev._access_index.last_access(dev_buffer) >= last_access
 
     def proxify(self, obj: object) -> object:
-        with self.lock:
-            found_proxies: List[ProxyObject] = []
-            proxied_id_to_proxy: Dict[int, ProxyObject] = {}
-            ret = proxify_device_objects(obj, proxied_id_to_proxy, found_proxies)
-            last_access = time.monotonic()
-            for p in found_proxies:
-                pxy = p._pxy_get()
-                pxy.last_access = last_access
-                if not self.contains(id(p)):
-                    pxy.manager = self
-                    self.add(proxy=p, serializer=pxy.serializer)
+        # The traversal of `obj` and the access of known proxies only require the
+        # locks of the individual tiers, thus multiple threads can proxify
+        # concurrently. Only the registration of new proxies takes `self.lock`.
+        found_proxies: List[ProxyObject] = []
+        proxied_id_to_proxy: Dict[int, ProxyObject] = {}
+        ret = proxify_device_objects(
+            obj,
+            proxied_id_to_proxy,
+            found_proxies,
+            proxy_options=self._proxy_options,
+        )
+        last_access = self._last_activity = time.monotonic()
+        new_proxies: List[ProxyObject] = []
+        for p in found_proxies:
+            pxy = p._pxy_get()
+            pxy.last_access = last_access
+            pxy.access_count += 1
+            proxies = self.get_proxies_by_proxy_object(p)
+            if proxies is None or not proxies.touch(p):
+                new_proxies.append(p)
+        if new_proxies:
+            with self.lock:
+                for p in new_proxies:
+                    pxy = p._pxy_get()
+                    proxies = self.get_proxies_by_proxy_object(p)
+                    if proxies is None:
+                        pxy.manager = self
+                        self.add(proxy=p, serializer=pxy.serializer)
+                    else:  # Moved to another tier concurrently
+                        proxies.touch(p)
         self.maybe_evict()
         return ret
 
-    def get_dev_buffer_to_proxies(self) -> DefaultDict[Hashable, List[ProxyObject]]:
-        with self.lock:
-            # Notice, multiple proxy object can point to different non-overlapping
-            # parts of the same device buffer.
-            ret = defaultdict(list)
-            for proxy in self._dev.get_proxies():
-                for dev_buffer in proxy._pxy_get_device_memory_objects():
-                    ret[dev_buffer].append(proxy)
-            return ret
+    def get_dev_buffer_to_proxies(self) -> Dict[Hashable, List[ProxyObject]]:
+        # Notice, multiple proxy object can point to different non-overlapping
+        # parts of the same device buffer.
+        return self._dev.get_dev_buffer_to_proxies()
 
     def get_dev_access_info(
         self,
     ) -> Tuple[int, List[Tuple[float, int, List[ProxyObject]]]]:
-        with self.lock:
-            total_dev_mem_usage = 0
-            dev_buf_access = []
-            for dev_buf, proxies in self.get_dev_buffer_to_proxies().items():
-                last_access = max(p._pxy_get().last_access for p in proxies)
-                size = sizeof(dev_buf)
-                dev_buf_access.append((last_access, size, proxies))
-                total_dev_mem_usage += size
+        with self._dev._lock:
+            dev_buf_access = self._dev.get_access_info()
+            total_dev_mem_usage = sum(size for _, size, _ in dev_buf_access)
             assert total_dev_mem_usage == self._dev.mem_usage()
             return total_dev_mem_usage, dev_buf_access
 
@@ -315,65 +1150,511 @@ class ProxyManager:
             self._dev.mem_usage() + extra_dev_mem <= self._device_memory_limit
         ):
             return
+        self.evict_from_device(self._device_memory_limit - extra_dev_mem)
 
-        proxies_to_serialize: List[ProxyObject] = []
-        with self.lock:
-            total_dev_mem_usage, dev_buf_access = self.get_dev_access_info()
-            total_dev_mem_usage += extra_dev_mem
-            if total_dev_mem_usage > self._device_memory_limit:
-                dev_buf_access.sort(key=lambda x: (x[0], -x[1]))
-                for _, size, proxies in dev_buf_access:
-                    for p in proxies:
-                        proxies_to_serialize.append(p)
-                    total_dev_mem_usage -= size
-                    if total_dev_mem_usage <= self._device_memory_limit:
-                        break
+    def evict_from_device(self, target: int) -> None:
+        """Spill the least recently accessed proxies from device to host memory
 
+        Parameters
+        ----------
+        target: int
+            Keep spilling until the device memory usage is at most `target` bytes
+        """
+        excess = self._dev.mem_usage() - target
+        if excess > 0:
+            self._spill_from_device(self._dev.least_recently_accessed(excess))
+
+    def _spill_from_device(self, info: List[Tuple[int, List[ProxyObject]]]) -> None:
+        """Spill the proxies of the device memory objects in `info` to host"""
+        proxies_to_serialize: List[ProxyObject] = []
+        nbytes = 0
         serialized_proxies: Set[int] = set()
-        for p in proxies_to_serialize:
-            # Avoid trying to serialize the same proxy multiple times
-            if id(p) not in serialized_proxies:
-                serialized_proxies.add(id(p))
-                p._pxy_serialize(serializers=("dask", "pickle"))
+        for size, proxies in info:
+            nbytes += size
+            for p in proxies:
+                # Avoid serializing the same proxy multiple times
+                if id(p) not in serialized_proxies:
+                    serialized_proxies.add(id(p))
+                    proxies_to_serialize.append(p)
+
+        self._spill(
+            proxies_to_serialize,
+            nbytes,
+            lambda p: p._pxy_serialize(serializers=self._host_serializers),
+            "device-to-host",
+        )
 
     def maybe_evict_from_host(self, extra_host_mem=0) -> None:
         if (  # Shortcut when not evicting
             self._host.mem_usage() + extra_host_mem <= self._host_memory_limit
         ):
             return
+        self.evict_from_host(self._host_memory_limit - extra_host_mem)
 
-        proxies_to_serialize: List[ProxyObject] = []
-        with self.lock:
-            total_host_mem_usage, info = self.get_host_access_info()
-            total_host_mem_usage += extra_host_mem
-            if total_host_mem_usage > self._host_memory_limit:
-                info.sort(key=lambda x: (x[0], -x[1]))
-                for _, size, proxy in info:
-                    proxies_to_serialize.append(proxy)
-                    total_host_mem_usage -= size
-                    if total_host_mem_usage <= self._host_memory_limit:
-                        break
+    def evict_from_host(self, target: int) -> None:
+        """Spill the least recently accessed proxies from host memory
 
-        serialized_proxies: Set[int] = set()
-        for p in proxies_to_serialize:
-            # Avoid trying to serialize the same proxy multiple times
-            if id(p) not in serialized_proxies:
-                serialized_proxies.add(id(p))
-                ProxifyHostFile.serialize_proxy_to_disk_inplace(p)
+        If the compressed host memory tier is enabled, the proxies are
+        compressed and the compressed tier is then kept within its limit
+        by spilling to disk. Otherwise, the proxies are spilled to disk.
 
-    def force_evict_from_host(self) -> int:
+        Parameters
+        ----------
+        target: int
+            Keep spilling until the host memory usage is at most `target` bytes
+        """
+        excess = self._host.mem_usage() - target
+        if excess > 0:
+            self._spill_from_host(self._host.least_recently_accessed(excess))
+
+    def _spill_from_host(self, info: List[Tuple[int, ProxyObject]]) -> None:
+        """Spill the proxies in `info` to compressed host memory or disk"""
+        if self._compressed_memory_limit > 0:
+            self._spill(
+                [proxy for _, proxy in info],
+                sum(size for size, _ in info),
+                ProxifyHostFile.serialize_proxy_to_compressed_inplace,
+                "host-to-compressed",
+            )
+            self.maybe_evict_from_compressed()
+        else:
+            self._spill(
+                [proxy for _, proxy in info],
+                sum(size for size, _ in info),
+                ProxifyHostFile.serialize_proxy_to_disk_inplace,
+                "host-to-disk",
+            )
+
+    def maybe_evict_from_compressed(self) -> None:
+        if (  # Shortcut when not evicting
+            self._compressed.mem_usage() <= self._compressed_memory_limit
+        ):
+            return
+        self.evict_from_compressed(self._compressed_memory_limit)
+
+    def evict_from_compressed(self, target: int) -> None:
+        """Spill the least recently accessed compressed proxies to disk
+
+        Parameters
+        ----------
+        target: int
+            Keep spilling until the compressed host memory usage is at most
+            `target` bytes
+        """
+        excess = self._compressed.mem_usage() - target
+        if excess <= 0:
+            return
+        info = self._compressed.least_recently_accessed(excess)
+
+        self._spill(
+            [proxy for _, proxy in info],
+            sum(size for size, _ in info),
+            ProxifyHostFile.serialize_proxy_to_disk_inplace,
+            "compressed-to-disk",
+        )
+
+    def _spill(
+        self,
+        proxies: List[ProxyObject],
+        nbytes: int,
+        spill_func: Callable[[ProxyObject], None],
+        direction: str,
+    ) -> None:
+        """Spill `proxies` using `spill_func` and record the throughput
+
+        If a spill thread pool is available, the proxies are spilled concurrently.
+        This is safe because each proxy is serialized into a copy of its
+        ProxyDetail, which is then assigned back to the proxy.
+
+        Proxies that would exceed the disk quota are left where they are, thus
+        host memory might exceed its limit until the disk quota frees up.
+        Meanwhile, ``utils.DiskQuotaBackpressure`` pauses the worker.
+        """
+        if not proxies:
+            return
+
+        def timed_spill_func(p: ProxyObject) -> None:
+            t = time.perf_counter()
+            try:
+                spill_func(p)
+            except disk_io.DiskQuotaExceeded as e:
+                self._disk_quota_exceeded(e)
+                return
+            if direction.endswith("-to-disk"):
+                self._disk_full_usage = None
+            elapsed = time.perf_counter() - t
+            pxy = p._pxy_get()
+            size = sizeof(p)
+            self.cost_model.record(
+                "serialize", pxy.typename, pxy.serializer, size, elapsed
+            )
+            self.metrics.record_transfer(direction, size, elapsed)
+
+        t0 = time.perf_counter()
+        if self._spill_executor is None or len(proxies) == 1:
+            for p in proxies:
+                timed_spill_func(p)
+        else:
+            # Notice, list() waits for all proxies and re-raises any exception
+            list(self._spill_executor.map(timed_spill_func, proxies))
+        elapsed = time.perf_counter() - t0
+        self.metrics.record_eviction(direction.split("-to-")[0], elapsed)
+        with self._spill_stats_lock:
+            stats = self._spill_stats[direction]
+            stats[0] += nbytes
+            stats[1] += elapsed
+
+    def _disk_quota_exceeded(self, e: Exception) -> None:
+        if self._disk_full_usage is None:
+            logging.getLogger("distributed.worker").warning(
+                "JIT-Unspill: %s, keeping the data in host memory", str(e)
+            )
+        self._disk_full_usage = disk_io.disk_quota.usage()
+
+    def disk_quota_exhausted(self) -> bool:
+        """Return whether spilling to disk is expected to exceed the disk quota
+
+        This is the case when the last spill to disk failed because of the
+        disk quota and no spilled data has been removed from disk since.
+        """
+        full = self._disk_full_usage
+        quota = disk_io.disk_quota
+        return full is not None and quota is not None and quota.usage() >= full
+
+    def spill_throughput(self) -> Dict[str, float]:
+        """Return the achieved spill throughput in bytes per second
+
+        Returns
+        -------
+        Dictionary mapping spill direction ("device-to-host", "host-to-compressed",
+        "compressed-to-disk", and "host-to-disk") to the accumulated number of
+        bytes spilled divided by the accumulated time spent spilling.
+        """
+        with self._spill_stats_lock:
+            return {
+                direction: nbytes / elapsed if elapsed > 0 else 0.0
+                for direction, (nbytes, elapsed) in self._spill_stats.items()
+            }
+
+    def record_deserialization(
+        self, pxy: ProxyDetail, serializer: str, nbytes: int, seconds: float
+    ) -> None:
+        """Record an unspill, called by `ProxyDetail.deserialize()`"""
+        self._last_activity = time.monotonic()
+        self.cost_model.record("deserialize", pxy.typename, serializer, nbytes, seconds)
+        direction = _unspill_directions.get(serializer)
+        if direction is not None:
+            self.metrics.record_transfer(direction, nbytes, seconds)
+
+    def record_transfer(self, direction: str, nbytes: int, seconds: float) -> None:
+        """Record a transfer that isn't a spill or an unspill
+
+        This is used when spilled proxies are read into host memory in order
+        to be communicated, e.g. "disk-to-host".
+        """
+        self.metrics.record_transfer(direction, nbytes, seconds)
+
+    def tier_tallies(self) -> Dict[str, Tuple[int, int, Optional[int]]]:
+        """Return the memory usage, number of proxies, and memory limit of each tier
+
+        Returns
+        -------
+        Dictionary mapping "device", "host", "compressed", and "disk" to a tuple
+        of the memory usage in bytes, the number of proxies, and the memory limit
+        (None for disk).
+        """
         with self.lock:
-            _, info = self.get_host_access_info()
-            info.sort(key=lambda x: (x[0], -x[1]))
-        for _, size, proxy in info:
-            ProxifyHostFile.serialize_proxy_to_disk_inplace(proxy)
-            return size
+            return {
+                "device": (
+                    self._dev.mem_usage(),
+                    len(self._dev),
+                    self._device_memory_limit,
+                ),
+                "host": (
+                    self._host.mem_usage(),
+                    len(self._host),
+                    self._host_memory_limit,
+                ),
+                "compressed": (
+                    self._compressed.mem_usage(),
+                    len(self._compressed),
+                    self._compressed_memory_limit,
+                ),
+                "disk": (self._disk.mem_usage(), len(self._disk), None),
+            }
+
+    def force_evict_from_host(self) -> int:
+        if self.disk_quota_exhausted():
+            return 0
+        # Compressed proxies are the least recently accessed in host memory
+        direction = "compressed-to-disk"
+        info = self._compressed.least_recently_accessed(1)
+        if not info:
+            direction = "host-to-disk"
+            info = self._host.least_recently_accessed(1)
+        for size, proxy in info:
+            self._spill(
+                [proxy],
+                size,
+                ProxifyHostFile.serialize_proxy_to_disk_inplace,
+                direction,
+            )
+            return 0 if self.disk_quota_exhausted() else size
         return 0
 
     def maybe_evict(self, extra_dev_mem=0) -> None:
+        if self._spill_thread is not None and (
+            self._dev.mem_usage() + extra_dev_mem
+            > self._device_memory_limit * self._spill_high_watermark
+            or self._host.mem_usage()
+            > self._host_memory_limit * self._spill_high_watermark
+            or self._compressed.mem_usage()
+            > self._compressed_memory_limit * self._spill_high_watermark
+        ):
+            self._spill_event.set()  # Wake up the spill thread
+        # Notice, we always evict synchronously if the limits are exceeded
         self.maybe_evict_from_device(extra_dev_mem)
         self.maybe_evict_from_host()
 
+    def set_eviction_hint(self, proxy: ProxyObject, hint: int) -> None:
+        """Set the eviction hint of `proxy`, see ``eviction_policies.HINT_DEFAULT``
+
+        The hint is advisory thus it is lost if the proxy is updated concurrently.
+        The hint of a pinned proxy takes effect when it is unpinned.
+        """
+        pxy = proxy._pxy_get()
+        if pxy.eviction_hint == hint:
+            return
+        pxy.eviction_hint = hint
+        proxies = self.get_proxies_by_proxy_object(proxy)
+        if proxies is not None:
+            proxies.touch(proxy)
+
+    def pin(self, proxies: Iterable[ProxyObject]) -> None:
+        """Pin `proxies` in device memory
+
+        The proxies are unspilled and never evicted until unpinned, see
+        `unpin()`. A proxy pinned multiple times must be unpinned as many times.
+
+        The pinned proxies still count towards the device memory limit but their
+        size is also tallied against the pin limit. Notice, the tally counts the
+        full size of proxies even when they share device memory.
+
+        Raises
+        ------
+        ValueError
+            If the size of the pinned proxies would exceed the pin limit, in
+            which case none of `proxies` are pinned.
+        """
+        proxies = list(proxies)
+        new: Dict[int, ProxyObject] = {}
+        with self.lock:
+            for p in proxies:
+                if id(p) not in self._pinned:
+                    new[id(p)] = p
+            nbytes = {i: p.__sizeof__() for i, p in new.items()}
+            total = self._pinned_nbytes + sum(nbytes.values())
+            if total > self._pin_limit:
+                raise ValueError(
+                    f"Cannot pin {sum(nbytes.values())} bytes, the pinned device "
+                    f"memory would exceed the pin limit of {self._pin_limit} bytes"
+                )
+            for p in proxies:
+                entry = self._pinned.setdefault(id(p), [0, nbytes.get(id(p), 0)])
+                entry[0] += 1
+            self._pinned_nbytes = total
+        # Update the access index, which reads the pinned proxies from
+        # `self._pinned`, before unspilling. This is done outside of the lock
+        # because unspilling might evict unpinned proxies.
+        for p in new.values():
+            proxies_of_p = self.get_proxies_by_proxy_object(p)
+            if proxies_of_p is not None:
+                proxies_of_p.touch(p)
+            p._pxy_deserialize()
+
+    def unpin(self, proxies: Iterable[ProxyObject]) -> None:
+        """Unpin proxies pinned by `pin()`, which makes them spillable again"""
+        unpinned = []
+        with self.lock:
+            for p in proxies:
+                entry = self._pinned.get(id(p))
+                if entry is None:
+                    continue
+                entry[0] -= 1
+                if entry[0] == 0:
+                    del self._pinned[id(p)]
+                    self._pinned_nbytes -= entry[1]
+                    unpinned.append(p)
+        for p in unpinned:
+            proxies_of_p = self.get_proxies_by_proxy_object(p)
+            if proxies_of_p is not None:
+                proxies_of_p.touch(p)
+
+    def _has_room(self, proxies: Proxies, limit: int, nbytes: int) -> bool:
+        """Whether `nbytes` fits in `proxies` without triggering any spilling"""
+        if self._spill_thread is not None:
+            limit *= self._spill_high_watermark
+        return proxies.mem_usage() + nbytes <= limit
+
+    def promote(self, proxy: ProxyObject) -> int:
+        """Move `proxy` one memory tier up if the tier has room for it
+
+        Proxies on disk or in compressed host memory are read into host memory
+        and proxies in host memory are deserialized into device memory. This is
+        used to unspill proxies ahead of their use, see ``prefetch``.
+
+        Promotion never evicts, the proxy is only promoted if the target tier
+        stays below the limit that would make `maybe_evict()` spill. Also, if
+        the proxy is accessed concurrently, the promotion is discarded.
+
+        Returns
+        -------
+        Number of bytes promoted, zero if `proxy` wasn't promoted
+        """
+        with self.lock:
+            proxies = self.get_proxies_by_proxy_object(proxy)
+        if proxies is None or proxies is self._dev:
+            return 0
+        old_pxy = proxy._pxy_get()
+        pxy = old_pxy.copy()
+        if proxies is self._host:
+            # The device tier tallies the size of the device buffers, which
+            # is the size of the serialized frames
+            size = proxy.__sizeof__()
+            if not self._has_room(self._dev, self._device_memory_limit, size):
+                return 0
+            pxy.deserialize(maybe_evict=False, nbytes=size)
+        else:
+            size = sizeof(proxy)
+            if not self._has_room(self._host, self._host_memory_limit, size):
+                return 0
+            t0 = time.perf_counter()
+            header, frames = pxy.obj
+            if pxy.serializer == "disk":
+                direction = "disk-to-host"
+                try:
+                    frames = disk_io.spilled_read(header)
+                except (OSError, KeyError):
+                    return 0  # Unspilled concurrently
+                header, frames = disk_compression.compressor.decompress(
+                    header["disk-sub-header"], frames
+                )
+            else:
+                direction = "compressed-to-host"
+                header, frames = disk_compression.host_compressor.decompress(
+                    header["compressed-sub-header"], frames
+                )
+            nbytes = sum(map(distributed.utils.nbytes, frames))
+            self.record_transfer(direction, nbytes, time.perf_counter() - t0)
+            if nbytes > size:
+                # The size of spilled proxies underestimates the size in memory
+                size = nbytes
+                if not self._has_room(self._host, self._host_memory_limit, size):
+                    return 0
+            pxy.obj = (header, frames)
+            pxy.serializer = header["serializer"]
+        with self.lock:
+            if proxy._pxy_get() is not old_pxy:
+                return 0  # Accessed or promoted concurrently
+            proxy._pxy_set(pxy)
+        if old_pxy.serializer == "disk":
+            disk_io.spilled_remove(old_pxy.obj[0])
+        return size
+
+    def demote_idle(self) -> Tuple[int, int]:
+        """Spill the proxies that haven't been accessed for a while
+
+        Proxies in device memory not accessed for `idle_device_age` seconds
+        are spilled to host memory and proxies in host memory not accessed for
+        `idle_host_age` seconds are spilled to compressed host memory or disk.
+        Pinned proxies are never demoted.
+
+        This is called by the demotion thread during quiet periods, which makes
+        headroom for bursts of allocations ahead of time instead of having the
+        task threads spill when the memory limits are exceeded.
+
+        Returns
+        -------
+        Number of bytes demoted from device and from host memory
+        """
+        now = time.monotonic()
+        dev_nbytes = host_nbytes = 0
+        if self._idle_device_age is not None:
+            info = self._dev.idle(now - self._idle_device_age)
+            dev_nbytes = sum(size for size, _ in info)
+            self._spill_from_device(info)
+            self.maybe_evict_from_host()
+        if self._idle_host_age is not None:
+            info = self._host.idle(now - self._idle_host_age)
+            host_nbytes = sum(size for size, _ in info)
+            self._spill_from_host(info)
+        return dev_nbytes, host_nbytes
+
+    def background_spilling(self) -> None:
+        """Spill down to the low watermarks, called by the spill thread"""
+        self.evict_from_device(
+            int(self._device_memory_limit * self._spill_low_watermark)
+        )
+        self.evict_from_host(int(self._host_memory_limit * self._spill_low_watermark))
+        if self._compressed_memory_limit > 0:
+            self.evict_from_compressed(
+                int(self._compressed_memory_limit * self._spill_low_watermark)
+            )
+
+
+# The unspill direction of each serializer used by spilled proxies
+_unspill_directions = {
+    "dask": "host-to-device",
+    "pickle": "host-to-device",
+    "arena": "host-to-device",
+    "compressed": "compressed-to-device",
+    "disk": "disk-to-device",
+}
+
+
+def _spill_thread_main(manager_ref: "ReferenceType[ProxyManager]", event):
+    """Main loop of the spill thread of a ProxyManager
+
+    The thread holds a weak reference to the manager and exits when the
+    manager has been freed.
+    """
+    logger = logging.getLogger("distributed.worker")
+    while True:
+        woken = event.wait(timeout=1)
+        manager = manager_ref()
+        if manager is None:
+            return
+        if woken:
+            event.clear()
+            try:
+                manager.background_spilling()
+            except Exception as e:
+                logger.error("JIT-Unspill: background spilling failed: %s", e)
+        del manager
+
+
+def _demotion_thread_main(
+    manager_ref: "ReferenceType[ProxyManager]", interval: float
+) -> None:
+    """Main loop of the demotion thread of a ProxyManager
+
+    Every `interval` seconds, idle proxies are demoted if the manager has been
+    quiet since the last check, see `ProxyManager.demote_idle()`. Like the
+    spill thread, it exits when the manager has been freed.
+    """
+    logger = logging.getLogger("distributed.worker")
+    while True:
+        time.sleep(interval)
+        manager = manager_ref()
+        if manager is None:
+            return
+        if time.monotonic() - manager._last_activity >= interval:
+            try:
+                manager.demote_idle()
+            except Exception as e:
+                logger.error("JIT-Unspill: demotion of idle proxies failed: %s", e)
+        del manager
+
 
 class ProxifyHostFile(MutableMapping):
     """Host file that proxify stored data
@@ -418,15 +1699,119 @@ class ProxifyHostFile(MutableMapping):
         ProxyObjects, set the `mark_as_explicit_proxies=True` when proxifying with
         `proxify_device_objects()`. If ``None``, the "jit-unspill-compatibility-mode"
         config value are used, which defaults to False.
+    background_spilling: bool or None, default None
+        Enables a spill thread that starts spilling when the memory usage exceeds
+        `spill_high_watermark` and spills down to `spill_low_watermark`, which makes
+        task threads rarely block on spilling. If ``None``, the
+        "jit-unspill-background-spilling" config value are used, which defaults
+        to False.
+    spill_high_watermark: float or None, default None
+        Fraction of `device_memory_limit` and `memory_limit` that triggers
+        background spilling. If ``None``, the "jit-unspill-spill-high-watermark"
+        config value are used, which defaults to 0.9.
+    spill_low_watermark: float or None, default None
+        Fraction of `device_memory_limit` and `memory_limit` that background
+        spilling drains to. If ``None``, the "jit-unspill-spill-low-watermark"
+        config value are used, which defaults to 0.7.
+    spill_workers: int or None, default None
+        Number of threads used to serialize proxies concurrently when spilling
+        many proxies at once. If ``None``, the "jit-unspill-spill-workers" config
+        value are used, which defaults to 1 (no concurrency).
+    segment_store: bool or None, default None
+        Pack spilled proxies into large append-only segment files instead of
+        writing a file per proxy, see ``disk_io.SegmentStore``. If ``None``, the
+        setting of an earlier instance is used or, if none, the
+        "jit-unspill-segment-store" config value, which defaults to False.
+        The size of the segments is set by the "jit-unspill-segment-size" config
+        value, which defaults to "256 MiB".
+        WARNING, like `local_directory`, this **cannot** change while running.
+    compression: str or bool or None, default None
+        Codec used to compress data spilled to disk, e.g. "lz4", "zstd:9", or
+        "blosc" (byte-shuffled), see ``disk_compression.get_codec()``. Each frame
+        is only compressed if a sample of it compresses well. Use False to disable
+        compression. If ``None``, the "jit-unspill-compression" config value are
+        used, which defaults to "auto" (lz4 if installed).
+    compressed_memory_limit: int or str or None, default None
+        Number of bytes of host memory used by a compressed host memory tier,
+        which proxies spilled from host memory are compressed into before they
+        are spilled to disk. If zero, the tier is disabled and proxies are spilled
+        directly to disk. If ``None``, the "jit-unspill-compressed-memory-limit"
+        config value are used, which defaults to 0.
+    compressed_codec: str or None, default None
+        Codec used by the compressed host memory tier, see
+        ``disk_compression.get_codec()``. If ``None``, the
+        "jit-unspill-compressed-codec" config value are used, which defaults to
+        "auto" (lz4 if installed otherwise zlib at level 1).
+    eviction_policy: str or None, default None
+        Policy used to choose what to spill: "lru" (least recently used), "lfu"
+        (least frequently used), "gds" (GreedyDual-Size), or "arc" (Adaptive
+        Replacement Cache), see ``eviction_policies``. If ``None``, the
+        "jit-unspill-eviction-policy" config value are used, which defaults
+        to "lru".
+    deduplication: bool or None, default None
+        Store identical spilled payloads, such as the replicated partitions of a
+        broadcast join, only once. The serialized frames in host memory and the
+        data written to disk are keyed by a hash of their content and shared,
+        using reference counts, by all proxies with the same content. If
+        ``None``, the "jit-unspill-deduplication" config value are used, which
+        defaults to False.
+    host_arena: bool or None, default None
+        Spill device memory into a pool of reusable, size-classed host buffers,
+        which are returned to the pool when unspilled, instead of allocating new
+        host buffers for every spilled frame, see ``host_arena.HostArena``. If
+        ``None``, the "jit-unspill-host-arena" config value are used, which
+        defaults to False. The buffers are allocated in pinned memory unless the
+        "jit-unspill-host-arena-pinned" config value is False and at most
+        "jit-unspill-host-arena-max-cached" (default "1 GiB") of freed buffers
+        are kept for reuse.
+    pin_limit: float, int, str or None, default None
+        Maximum size of the device memory pinned by `pin()`, which can be a
+        fraction of `device_memory_limit`, see ``utils.parse_pin_limit()``.
+        If ``None``, the "device-pin-limit" config value are used, which
+        defaults to 0.25.
+    idle_demotion_age: str or float or None, default None
+        Age, e.g. "30s", after which proxies that haven't been accessed are
+        demoted from device to host memory in the background during quiet
+        periods, which keeps headroom for bursts of allocations. If ``None``,
+        the "jit-unspill-idle-demotion-age" config value are used, which
+        defaults to None (disabled).
+    idle_demotion_host_age: str or float or None, default None
+        Like `idle_demotion_age` but for the demotion from host memory to
+        compressed host memory or disk. If ``None``, the
+        "jit-unspill-idle-demotion-host-age" config value are used, which
+        defaults to None (disabled).
+        The demotion thread checks for idle proxies every
+        "jit-unspill-idle-demotion-interval" (default "1s") and only demotes
+        if no proxy has been added or unspilled since the last check.
+    disk_quota: int or str or None, default None
+        Maximum number of bytes spilled to disk. Spilling beyond the quota
+        raises ``disk_io.DiskQuotaExceeded`` before anything is written, see
+        ``utils.DiskQuotaBackpressure`` for pausing the worker ahead of that.
+        Like `local_directory`, the quota is shared by all instances in the
+        process and cannot change while running. If ``None``, the quota of an
+        earlier instance is used or, if none, the "disk-spill-quota" config
+        value, which defaults to None (unlimited).
+    column_granular: bool or None, default None
+        Proxify cuDF dataframes column by column, which makes it possible to spill
+        and unspill each column independently, see ``ColumnProxyObject``. If
+        ``None``, the "jit-unspill-column-granular" config value are used, which
+        defaults to False.
+    chunk_size: int or str or None, default None
+        Proxify device objects larger than `chunk_size` split into row chunks of
+        `chunk_size`, which are spilled and unspilled independently, see
+        ``ChunkedProxyObject``. Objects larger than half of `device_memory_limit`
+        aren't chunked since the object and its chunks briefly coexist. If
+        ``None``, the "jit-unspill-chunk-size" config value are used, which
+        defaults to None (no chunking).
     """
 
     # Notice, we define the following as static variables because they are used by
     # the static register_disk_spilling() method.
     _spill_directory: Optional[str] = None
     _spill_shared_filesystem: bool
+    _spill_deduplication: bool = False
     _spill_to_disk_prefix: str = f"spilled-data-{uuid.uuid4()}"
-    _spill_to_disk_counter: int = 0
-    lock = threading.RLock()
+    _spill_to_disk_counter = itertools.count(1)  # next() is atomic
 
     def __init__(
         self,
@@ -436,10 +1821,100 @@ class ProxifyHostFile(MutableMapping):
         local_directory: str = None,
         shared_filesystem: bool = None,
         compatibility_mode: bool = None,
+        background_spilling: bool = None,
+        spill_high_watermark: float = None,
+        spill_low_watermark: float = None,
+        spill_workers: int = None,
+        segment_store: bool = None,
+        compression: Union[str, bool] = None,
+        compressed_memory_limit: Union[int, str] = None,
+        compressed_codec: str = None,
+        eviction_policy: str = None,
+        deduplication: bool = None,
+        host_arena: bool = None,
+        pin_limit: Union[float, int, str] = None,
+        idle_demotion_age: Union[str, float] = None,
+        idle_demotion_host_age: Union[str, float] = None,
+        disk_quota: Union[int, str] = None,
+        column_granular: bool = None,
+        chunk_size: Union[int, str] = None,
     ):
+        if background_spilling is None:
+            background_spilling = dask.config.get(
+                "jit-unspill-background-spilling", default=False
+            )
+        if spill_high_watermark is None:
+            spill_high_watermark = dask.config.get(
+                "jit-unspill-spill-high-watermark", default=0.9
+            )
+        if spill_low_watermark is None:
+            spill_low_watermark = dask.config.get(
+                "jit-unspill-spill-low-watermark", default=0.7
+            )
+        if spill_workers is None:
+            spill_workers = dask.config.get("jit-unspill-spill-workers", default=1)
+        if compressed_memory_limit is None:
+            compressed_memory_limit = dask.config.get(
+                "jit-unspill-compressed-memory-limit", default=0
+            )
+        if eviction_policy is None:
+            eviction_policy = dask.config.get(
+                "jit-unspill-eviction-policy", default="lru"
+            )
+        if deduplication is None:
+            deduplication = dask.config.get("jit-unspill-deduplication", default=False)
+        if host_arena is None:
+            host_arena = dask.config.get("jit-unspill-host-arena", default=False)
+        if host_arena:
+            register_host_arena()
+        if idle_demotion_age is None:
+            idle_demotion_age = dask.config.get(
+                "jit-unspill-idle-demotion-age", default=None
+            )
+        if idle_demotion_host_age is None:
+            idle_demotion_host_age = dask.config.get(
+                "jit-unspill-idle-demotion-host-age", default=None
+            )
+        idle_interval = dask.config.get(
+            "jit-unspill-idle-demotion-interval", default="1s"
+        )
+        if column_granular is None:
+            column_granular = dask.config.get(
+                "jit-unspill-column-granular", default=False
+            )
+        if chunk_size is None:
+            chunk_size = dask.config.get("jit-unspill-chunk-size", default=None)
         self.store: Dict[Hashable, Any] = {}
-        self.manager = ProxyManager(device_memory_limit, memory_limit)
-        self.register_disk_spilling(local_directory, shared_filesystem)
+        self.pinned: Dict[Hashable, List[ProxyObject]] = {}  # Proxies of pinned keys
+        self.lock = threading.RLock()  # Protects `self.store` and `self.pinned`
+        self.manager = ProxyManager(
+            device_memory_limit,
+            memory_limit,
+            background_spilling=background_spilling,
+            spill_high_watermark=float(spill_high_watermark),
+            spill_low_watermark=float(spill_low_watermark),
+            spill_workers=int(spill_workers),
+            compressed_memory_limit=parse_bytes(compressed_memory_limit),
+            eviction_policy=eviction_policy,
+            deduplication=bool(deduplication),
+            host_arena=bool(host_arena),
+            pin_limit=parse_pin_limit(pin_limit, device_memory_limit),
+            idle_device_age=parse_timedelta(idle_demotion_age),
+            idle_host_age=parse_timedelta(idle_demotion_host_age),
+            idle_interval=parse_timedelta(idle_interval),
+            column_granular=bool(column_granular),
+            chunk_size=parse_bytes(chunk_size) if chunk_size else None,
+        )
+        self.register_disk_spilling(
+            local_directory,
+            shared_filesystem,
+            segment_store,
+            compression,
+            deduplication,
+            disk_quota,
+        )
+        self.disk_quota = disk_io.disk_quota
+        self.register_compressed_spilling(compressed_codec)
         if compatibility_mode is None:
             self.compatibility_mode = dask.config.get(
                 "jit-unspill-compatibility-mode", default=False
@@ -466,8 +1941,10 @@ class ProxifyHostFile(MutableMapping):
     @property
     def fast(self):
         """Dask use this to trigger CPU-to-Disk spilling"""
-        if len(self.manager._host) == 0:
+        if len(self.manager._host) == 0 and len(self.manager._compressed) == 0:
             return False  # We have nothing in host memory to spill
+        if self.manager.disk_quota_exhausted():
+            return False  # We cannot spill to disk
 
         class EvictDummy:
             @staticmethod
@@ -477,11 +1954,13 @@ class ProxifyHostFile(MutableMapping):
         return EvictDummy()
 
     def __setitem__(self, key, value):
+        # Proxify outside of the lock, which might spill
+        proxied = self.manager.proxify(value)
         with self.lock:
             if key in self.store:
                 # Make sure we register the removal of an existing key
                 del self[key]
-            self.store[key] = self.manager.proxify(value)
+            self.store[key] = proxied
 
     def __getitem__(self, key):
         with self.lock:
@@ -494,21 +1973,161 @@ class ProxifyHostFile(MutableMapping):
     def __delitem__(self, key):
         with self.lock:
             del self.store[key]
+            pinned = self.pinned.pop(key, None)
+        if pinned is not None:
+            self.manager.unpin(pinned)
+
+    def pin(self, key) -> None:
+        """Pin the device memory of `key`, which excludes it from spilling
+
+        The proxies of `key` are unspilled and never spilled until `unpin()` is
+        called or the key is deleted. Pinned proxies count towards the device
+        memory limit, thus they leave less room for other proxies, and their size
+        is also tallied against the pin limit.
+
+        Use ``client.run(dask_cuda.utils.pin_keys, keys)`` to pin keys on all
+        workers or annotate tasks with ``dask.annotate(pin=True)``, see
+        ``utils.PinKeys``.
+
+        Raises
+        ------
+        KeyError
+            If `key` isn't found.
+        ValueError
+            If pinning `key` would exceed the pin limit.
+        """
+        with self.lock:
+            if key in self.pinned:
+                return
+            value = self.store[key]
+        found: List[ProxyObject] = []
+        find_proxies(value, found)
+        # Pin outside of the lock, which might spill
+        self.manager.pin(found)
+        with self.lock:
+            if key not in self.pinned and self.store.get(key) is value:
+                self.pinned[key] = found
+                return
+        self.manager.unpin(found)  # Pinned or replaced concurrently
+
+    def unpin(self, key) -> None:
+        """Unpin `key` pinned by `pin()`, which makes it spillable again"""
+        with self.lock:
+            pinned = self.pinned.pop(key, None)
+        if pinned is not None:
+            self.manager.unpin(pinned)
+
+    def set_eviction_hints(
+        self, hints: Mapping[Hashable, Tuple[int, Any]], horizon: Any = None
+    ) -> None:
+        """Set the eviction hints of keys based on the tasks that depend on them
+
+        Keys without pending dependents, such as keys only held for transfer
+        to peers, are evicted first and keys with a dependent that runs soon
+        are evicted last, see ``eviction_policies.HINT_DEFAULT``. The hints of
+        keys not in `hints` are left unchanged.
+
+        Parameters
+        ----------
+        hints: Mapping
+            Mapping of key to a tuple of the number of pending dependents and
+            the priority of the dependent that runs first (or None).
+        horizon: Any
+            Dependents with a priority lower than or equal to `horizon` run
+            soon. If None, no dependent is considered to run soon.
+        """
+        # A proxy might be part of multiple keys in which case it gets the
+        # highest hint of the keys
+        proxy_hints: Dict[int, Tuple[int, ProxyObject]] = {}
+        with self.lock:
+            for key, (ndependents, priority) in hints.items():
+                if key not in self.store:
+                    continue
+                if ndependents == 0:
+                    hint = HINT_NOT_NEEDED
+                elif (
+                    horizon is not None and priority is not None and priority <= horizon
+                ):
+                    hint = HINT_NEEDED_SOON
+                else:
+                    hint = HINT_DEFAULT
+                found: List[ProxyObject] = []
+                find_proxies(self.store[key], found)
+                for p in found:
+                    old = proxy_hints.get(id(p))
+                    if old is None or old[0] < hint:
+                        proxy_hints[id(p)] = (hint, p)
+        for hint, p in proxy_hints.values():
+            self.manager.set_eviction_hint(p, hint)
 
     @classmethod
     def gen_file_path(cls) -> str:
         """Generate an unique file path"""
-        with cls.lock:
-            cls._spill_to_disk_counter += 1
-            assert cls._spill_directory is not None
-            return os.path.join(
-                cls._spill_directory,
-                f"{cls._spill_to_disk_prefix}-{cls._spill_to_disk_counter}",
-            )
+        assert cls._spill_directory is not None
+        return os.path.join(
+            cls._spill_directory,
+            f"{cls._spill_to_disk_prefix}-{next(cls._spill_to_disk_counter)}",
+        )
+
+    @classmethod
+    def write_to_disk(cls, frames) -> Dict[str, Any]:
+        """Write frames to disk
+
+        Use the segment store if enabled otherwise write to a new unique file.
+        If deduplication is enabled and data with the same content has already
+        been spilled, nothing is written and the existing data is referenced.
+
+        Returns
+        -------
+        The location part of the "disk" header, see `disk_io.spilled_read()`
+        """
+        if not cls._spill_deduplication:
+            return cls._write_new_to_disk(frames)
+        assert disk_io.spilled_content is not None
+        digest = content_hash(frames)
+        location = disk_io.spilled_content.acquire(digest)
+        if location is None:
+            new_location = cls._write_new_to_disk(frames)
+            location, inserted = disk_io.spilled_content.insert(digest, new_location)
+            if not inserted:  # Another thread wrote the same content meanwhile
+                disk_io.spilled_remove(new_location)
+        return {**location, "content-hash": digest}
+
+    @classmethod
+    def _write_new_to_disk(cls, frames) -> Dict[str, Any]:
+        # The segment store reserves the size of its segment files itself
+        if disk_io.segment_store is not None:
+            return {"segment-key": disk_io.segment_store.put(frames)}
+
+        # Without a disk quota, e.g. when `register_disk_spilling()` hasn't
+        # been called, the disk is unlimited and nothing is reserved
+        quota = disk_io.disk_quota
+        if quota is None:
+            path = cls.gen_file_path()
+            disk_io.disk_write(path, frames)
+            return {"path": path}
+
+        # Reserve the bytes before writing, which raises DiskQuotaExceeded
+        # when the disk quota is exhausted
+        nbytes = sum(memoryview(f).nbytes for f in frames)
+        quota.acquire(nbytes)
+        try:
+            path = cls.gen_file_path()
+            disk_io.disk_write(path, frames)
+        except BaseException:
+            quota.release(nbytes)
+            raise
+        return {"path": path, "disk-nbytes": nbytes}
 
     @classmethod
     def register_disk_spilling(
-        cls, local_directory: str = None, shared_filesystem: bool = None
+        cls,
+        local_directory: str = None,
+        shared_filesystem: bool = None,
+        segment_store: bool = None,
+        compression: Union[str, bool] = None,
+        deduplication: bool = None,
+        disk_quota: Union[int, str] = None,
     ):
         """Register Dask serializers that writes to disk
 
@@ -530,6 +2149,26 @@ class ProxifyHostFile(MutableMapping):
             Whether the `local_directory` above is shared between all workers or not.
             If ``None``, the "jit-unspill-shared-fs" config value are used, which
             defaults to False.
+        segment_store: bool or None, default None
+            Whether to write to a segment store, see ``disk_io.SegmentStore``.
+            If ``None``, the segment store already registered is used or, if
+            none, the "jit-unspill-segment-store" config value, which defaults
+            to False.
+            WARNING, this **cannot** change while running.
+        compression: str or bool or None, default None
+            Codec used to compress the spilled frames, see
+            ``disk_compression.get_codec()``. If ``None``, the
+            "jit-unspill-compression" config value are used, which defaults
+            to "auto".
+        deduplication: bool or None, default None
+            Whether to write data with the same content only once, see
+            ``write_to_disk()``. If ``None``, the "jit-unspill-deduplication"
+            config value are used, which defaults to False.
+        disk_quota: int or str or None, default None
+            Maximum number of bytes spilled to disk, see ``disk_io.DiskQuota``.
+            If ``None``, the quota already registered is used or, if none, the
+            "disk-spill-quota" config value, which defaults to None (unlimited).
+            WARNING, this **cannot** change while running.
         """
         path = os.path.join(
             local_directory or dask.config.get("temporary-directory") or os.getcwd(),
@@ -549,22 +2188,61 @@ class ProxifyHostFile(MutableMapping):
         else:
             cls._spill_shared_filesystem = shared_filesystem
 
+        # Like the disk path, the quota is shared by all instances thus a
+        # `disk_quota` of None inherits the quota of an earlier instance.
+        if disk_io.disk_quota is None:
+            if disk_quota is None:
+                disk_quota = dask.config.get("disk-spill-quota", default=None)
+            disk_io.disk_quota = disk_io.DiskQuota(
+                None if disk_quota is None else parse_bytes(disk_quota)
+            )
+        elif disk_quota is not None and (
+            disk_io.disk_quota.limit != parse_bytes(disk_quota)
+        ):
+            raise ValueError("Cannot change the JIT-Unspilling disk quota")
+
+        # Like the disk quota, a `segment_store` of None inherits the segment
+        # store of an earlier instance
+        if segment_store is None:
+            segment_store = disk_io.segment_store is not None or dask.config.get(
+                "jit-unspill-segment-store", default=False
+            )
+        if segment_store and disk_io.segment_store is None:
+            disk_io.segment_store = disk_io.SegmentStore(
+                directory=cls._spill_directory,
+                prefix=cls._spill_to_disk_prefix,
+                segment_size=parse_bytes(
+                    dask.config.get("jit-unspill-segment-size", default="256 MiB")
+                ),
+                quota=disk_io.disk_quota,
+            )
+        elif bool(segment_store) != (disk_io.segment_store is not None):
+            raise ValueError("Cannot change the JIT-Unspilling segment store")
+
+        # The codec used is recorded in the header of each spilled frame thus
+        # unlike the options above, the compression can change while running.
+        if compression is None:
+            compression = dask.config.get("jit-unspill-compression", default="auto")
+        if disk_compression.compressor.spec != compression:
+            disk_compression.compressor = disk_compression.FrameCompressor(compression)
+
+        # Like the compression, deduplication can change while running but the
+        # content store is kept since spilled data might still reference it.
+        if deduplication is None:
+            deduplication = dask.config.get("jit-unspill-deduplication", default=False)
+        cls._spill_deduplication = bool(deduplication)
+        if cls._spill_deduplication and disk_io.spilled_content is None:
+            disk_io.spilled_content = ContentStore()
+
         def disk_dumps(x):
             header, frames = serialize_and_split(x, on_error="raise")
-            if frames:
-                compression, frames = zip(*map(maybe_compress, frames))
-            else:
-                compression = []
-            header["compression"] = compression
+            header, frames = disk_compression.compressor.compress(header, frames)
             header["count"] = len(frames)
 
-            path = cls.gen_file_path()
-            with open(path, "wb") as f:
-                f.write(pack_frames(frames))
             return (
                 {
                     "serializer": "disk",
-                    "path": path,
+                    **cls.write_to_disk(frames),
                     "shared-filesystem": cls._spill_shared_filesystem,
                     "disk-sub-header": header,
                 },
@@ -573,22 +2251,88 @@ class ProxifyHostFile(MutableMapping):
 
         def disk_loads(header, frames):
             assert frames == []
-            with open(header["path"], "rb") as f:
-                frames = unpack_frames(f.read())
-            os.remove(header["path"])
-            if "compression" in header["disk-sub-header"]:
-                frames = decompress(header["disk-sub-header"], frames)
-            return merge_and_deserialize(header["disk-sub-header"], frames)
+            frames = disk_io.spilled_read(header)
+            disk_io.spilled_remove(header)
+            sub_header, frames = disk_compression.compressor.decompress(
+                header["disk-sub-header"], frames
+            )
+            return merge_and_deserialize(sub_header, frames)
 
         register_serialization_family("disk", disk_dumps, disk_loads)
 
+    @classmethod
+    def register_compressed_spilling(cls, codec: str = None):
+        """Register Dask serializers that compress in host memory
+
+        The "compressed" serializer is used by the compressed host memory tier.
+        Like ``register_disk_spilling()``, this is a global operation.
+
+        Parameters
+        ----------
+        codec: str or None, default None
+            Codec to compress with, see ``disk_compression.get_codec()``.
+            If ``None``, the "jit-unspill-compressed-codec" config value are used,
+            which defaults to "auto" (lz4 if installed otherwise zlib at level 1).
+        """
+        if codec is None:
+            codec = dask.config.get("jit-unspill-compressed-codec", default="auto")
+        if codec == "auto":
+            # Prefer a codec with fast decompression
+            if "lz4" in disk_compression.available_codecs():
+                codec = "lz4"
+            else:
+                codec = "zlib:1"
+        if disk_compression.host_compressor.spec != codec:
+            disk_compression.host_compressor = disk_compression.FrameCompressor(codec)
+
+        def compressed_dumps(x):
+            header, frames = serialize_and_split(x, on_error="raise")
+            header, frames = disk_compression.host_compressor.compress(header, frames)
+            return {"compressed-sub-header": header}, frames
+
+        def compressed_loads(header, frames):
+            sub_header, frames = disk_compression.host_compressor.decompress(
+                header["compressed-sub-header"], frames
+            )
+            return merge_and_deserialize(sub_header, frames)
+
+        register_serialization_family("compressed", compressed_dumps, compressed_loads)
+
+    @classmethod
+    def serialize_proxy_to_compressed_inplace(cls, proxy: ProxyObject):
+        """Serialize `proxy` to compressed host memory.
+
+        Like ``serialize_proxy_to_disk_inplace()``, we avoid de-serializing
+        if `proxy` is serialized using "dask", "pickle", or "arena".
+
+        Parameters
+        ----------
+        proxy : ProxyObject
+            Proxy object to serialize using the "compressed" serialize.
+        """
+        pxy = proxy._pxy_get(copy=True)
+        if pxy.is_serialized():
+            header, frames = pxy.obj
+            if header["serializer"] in ("dask", "pickle", "arena"):
+                header, frames = disk_compression.host_compressor.compress(
+                    header, frames
+                )
+                pxy.obj = (
+                    {"serializer": "compressed", "compressed-sub-header": header},
+                    frames,
+                )
+                pxy.serializer = "compressed"
+                proxy._pxy_set(pxy)
+                return
+        proxy._pxy_serialize(serializers=("compressed",), proxy_detail=pxy)
+
     @classmethod
     def serialize_proxy_to_disk_inplace(cls, proxy: ProxyObject):
         """Serialize `proxy` to disk.
 
-        Avoid de-serializing if `proxy` is serialized using "dask" or
-        "pickle". In this case the already serialized data is written
-        directly to disk.
+        Avoid de-serializing if `proxy` is serialized using "dask",
+        "pickle", "arena", or "compressed". In this case the already serialized
+        data is written directly to disk.
 
         Parameters
         ----------
@@ -598,14 +2342,15 @@ class ProxifyHostFile(MutableMapping):
         pxy = proxy._pxy_get(copy=True)
         if pxy.is_serialized():
             header, frames = pxy.obj
-            if header["serializer"] in ("dask", "pickle"):
-                path = cls.gen_file_path()
-                with open(path, "wb") as f:
-                    f.write(pack_frames(frames))
+            if header["serializer"] in ("dask", "pickle", "arena", "compressed"):
+                if header["serializer"] == "compressed":
+                    # The frames compressed by the host tier are written as-is
+                    header = header["compressed-sub-header"]
+                header, frames = disk_compression.compressor.compress(header, frames)
                 pxy.obj = (
                     {
                         "serializer": "disk",
-                        "path": path,
+                        **cls.write_to_disk(frames),
                         "shared-filesystem": cls._spill_shared_filesystem,
                         "disk-sub-header": header,
                     },
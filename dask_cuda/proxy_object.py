@@ -1,13 +1,9 @@
-import copy
 import functools
 import operator
-import os
 import pickle
 import time
-import uuid
 from collections import OrderedDict
 from contextlib import nullcontext
-from copy import copy as _copy
 from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple, Type, Union
 
 import pandas
@@ -20,8 +16,6 @@ import dask.utils
 import distributed.protocol
 import distributed.utils
 from dask.sizeof import sizeof
-from distributed.protocol.compression import decompress
-from distributed.protocol.utils import unpack_frames
 from distributed.worker import dumps_function, loads_function
 
 try:
@@ -34,15 +28,22 @@ try:
 except ImportError:
     from dask.dataframe.utils import make_meta as make_meta_dispatch
 
+from . import disk_compression
+from .disk_io import spilled_link, spilled_read, spilled_remove
+from .eviction_policies import HINT_DEFAULT
 from .get_device_memory_objects import get_device_memory_objects
+from .get_fixed_attributes import get_fixed_attributes
 from .is_device_object import is_device_object
+from .type_registry import type_registry
 
 if TYPE_CHECKING:
     from .proxify_host_file import ProxyManager
 
 
 # List of attributes that should be copied to the proxy at creation, which makes
-# them accessible without deserialization of the proxied object
+# them accessible without deserialization of the proxied object. Additionally,
+# the type specific attributes of `get_fixed_attributes()` are copied when the
+# proxied object is serialized.
 _FIXED_ATTRS = ["name", "__len__"]
 
 
@@ -86,12 +87,13 @@ def asproxy(
         else:
             subclass_serialized = dumps_function(subclass)
 
+        type_id = type_registry.type_id(type(obj))
         ret = subclass(
             ProxyDetail(
                 obj=obj,
                 fixed_attr=fixed_attr,
-                type_serialized=pickle.dumps(type(obj)),
-                typename=dask.utils.typename(type(obj)),
+                type_id=type_id,
+                typename=type_registry.get_typename(type_id),
                 is_cuda_object=is_device_object(obj),
                 subclass=subclass_serialized,
                 serializer=None,
@@ -127,17 +129,20 @@ def unproxy(obj):
 
 
 def _pxy_cache_wrapper(attr_name: str):
-    """Caching the access of attr_name in ProxyObject._pxy_cache"""
+    """Caching the access of attr_name in the ProxyObject._pxy_cache_<attr_name> slot
+
+    The slot is None when nothing is cached, thus the cached value cannot be None.
+    """
+    slot = f"_pxy_cache_{attr_name}"
 
     def wrapper1(func):
         @functools.wraps(func)
         def wrapper2(self: "ProxyObject"):
-            try:
-                return self._pxy_cache[attr_name]
-            except KeyError:
+            ret = getattr(self, slot)
+            if ret is None:
                 ret = func(self)
-                self._pxy_cache[attr_name] = ret
-                return ret
+                object.__setattr__(self, slot, ret)
+            return ret
 
         return wrapper2
 
@@ -152,6 +157,9 @@ class ProxyManagerDummy:
     do anything it is purely for convenience.
     """
 
+    def prepare(self, *args, **kwargs):
+        pass
+
     def add(self, *args, **kwargs):
         pass
 
@@ -164,6 +172,15 @@ class ProxyManagerDummy:
     def maybe_evict(self, *args, **kwargs):
         pass
 
+    def record_deserialization(self, *args, **kwargs):
+        pass
+
+    def record_transfer(self, *args, **kwargs):
+        pass
+
+    def proxify(self, obj):
+        return obj
+
     @property
     def lock(self):
         return nullcontext()
@@ -184,8 +201,8 @@ class ProxyDetail:
     fixed_attr: dict
         Dictionary of attributes that are accessible without deserializing
         the proxied object.
-    type_serialized: bytes
-        Pickled type of `obj`.
+    type_id: int
+        ID of the type of `obj` in `type_registry.type_registry`.
     typename: str
         Name of the type of `obj`.
     is_cuda_object: boolean
@@ -204,11 +221,29 @@ class ProxyDetail:
         evicts/serialize proxy objects as needed.
     """
 
+    # Notice, "__dict__" makes it possible to set extra attributes, which is only
+    # allocated when used
+    __slots__ = (
+        "obj",
+        "fixed_attr",
+        "type_id",
+        "typename",
+        "is_cuda_object",
+        "subclass",
+        "serializer",
+        "explicit_proxy",
+        "manager",
+        "last_access",
+        "access_count",
+        "eviction_hint",
+        "__dict__",
+    )
+
     def __init__(
         self,
         obj: Any,
         fixed_attr: Dict[str, Any],
-        type_serialized: bytes,
+        type_id: int,
         typename: str,
         is_cuda_object: bool,
         subclass: Optional[bytes],
@@ -218,7 +253,7 @@ class ProxyDetail:
     ):
         self.obj = obj
         self.fixed_attr = fixed_attr
-        self.type_serialized = type_serialized
+        self.type_id = type_id
         self.typename = typename
         self.is_cuda_object = is_cuda_object
         self.subclass = subclass
@@ -226,6 +261,53 @@ class ProxyDetail:
         self.explicit_proxy = explicit_proxy
         self.manager = manager
         self.last_access: float = 0.0
+        self.access_count: int = 0
+        self.eviction_hint: int = HINT_DEFAULT
+
+    def copy(self) -> "ProxyDetail":
+        """Return a shallow copy
+
+        This is equivalent to `copy.copy()` but a lot faster, which matters
+        because a copy is made on every update of the state of a proxy.
+        """
+        ret = object.__new__(ProxyDetail)
+        ret.obj = self.obj
+        ret.fixed_attr = self.fixed_attr
+        ret.type_id = self.type_id
+        ret.typename = self.typename
+        ret.is_cuda_object = self.is_cuda_object
+        ret.subclass = self.subclass
+        ret.serializer = self.serializer
+        ret.explicit_proxy = self.explicit_proxy
+        ret.manager = self.manager
+        ret.last_access = self.last_access
+        ret.access_count = self.access_count
+        ret.eviction_hint = self.eviction_hint
+        extra = self.__dict__
+        if extra:
+            ret.__dict__.update(extra)
+        return ret
+
+    def __getstate__(self) -> dict:
+        # The type ID is only valid in this process thus we pickle the type.
+        # The eviction hint is specific to the worker thus it isn't pickled.
+        state = {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name not in ("__dict__", "type_id", "eviction_hint")
+        }
+        state.update(self.__dict__)
+        state["type_serialized"] = type_registry.get_serialized(self.type_id)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state = dict(state)
+        self.type_id = type_registry.type_id_from_serialized(
+            state.pop("type_serialized")
+        )
+        self.eviction_hint = HINT_DEFAULT
+        for name, val in state.items():
+            setattr(self, name, val)
 
     def get_init_args(self, include_obj=False) -> OrderedDict:
         """Return the attributes needed to initialize a ProxyObject
@@ -244,7 +326,7 @@ class ProxyDetail:
         args = ["obj"] if include_obj else []
         args += [
             "fixed_attr",
-            "type_serialized",
+            "type_id",
             "typename",
             "is_cuda_object",
             "subclass",
@@ -282,6 +364,9 @@ class ProxyDetail:
                 # The proxied object is serialized with other serializers
                 self.deserialize()
 
+        # Capture the metadata of the object before it is serialized. Notice, we
+        # create a new dictionary since `fixed_attr` is shared with copies.
+        self.fixed_attr = {**self.fixed_attr, **get_fixed_attributes(self.obj)}
         header, _ = self.obj = distributed.protocol.serialize(
             self.obj, serializers, on_error="raise"
         )
@@ -304,20 +389,26 @@ class ProxyDetail:
         """
 
         if self.is_serialized():
+            if nbytes is None:
+                _, frames = self.obj
+                nbytes = sum(map(distributed.utils.nbytes, frames))
+
             # When not deserializing a CUDA-serialized proxied, tell the
             # manager that it might have to evict because of the increased
             # device memory usage.
             if maybe_evict and self.serializer != "cuda":
-                if nbytes is None:
-                    _, frames = self.obj
-                    nbytes = sum(map(distributed.utils.nbytes, frames))
                 self.manager.maybe_evict(nbytes)
 
-            # Deserialize the proxied object
+            # Deserialize the proxied object and let the manager learn the cost
             header, frames = self.obj
+            t0 = time.perf_counter()
             self.obj = distributed.protocol.deserialize(header, frames)
+            self.manager.record_deserialization(
+                self, self.serializer, nbytes, time.perf_counter() - t0
+            )
             self.serializer = None
             self.last_access = time.monotonic()
+            self.access_count += 1
         return self.obj
 
 
@@ -352,8 +443,8 @@ class ProxyObject:
         Access to _pxy is not pass-through to the proxied object, which is
         the case for most other access to the ProxyObject.
 
-    _pxy_cache: dict
-        A dictionary used for caching attributes
+    _pxy_cache_<name>:
+        Slots used for caching attributes, see `_pxy_cache_wrapper()`
 
     Parameters
     ----------
@@ -361,17 +452,27 @@ class ProxyObject:
         The Any kind of object to be proxied.
     """
 
+    # Notice, subclasses without `__slots__` get a `__dict__` as usual
+    __slots__ = (
+        "_pxy_detail",
+        "_pxy_cache_sizeof",
+        "_pxy_cache_device_memory_objects",
+        "__weakref__",
+    )
+
     def __init__(self, detail: ProxyDetail):
         self._pxy_detail = detail
-        self._pxy_cache: Dict[str, Any] = {}
+        self._pxy_cache_sizeof = None
+        self._pxy_cache_device_memory_objects = None
 
     def _pxy_get(self, copy=False) -> ProxyDetail:
         if copy:
-            return _copy(self._pxy_detail)
+            return self._pxy_detail.copy()
         else:
             return self._pxy_detail
 
     def _pxy_set(self, proxy_detail: ProxyDetail):
+        proxy_detail.manager.prepare(self, proxy_detail)
         with proxy_detail.manager.lock:
             self._pxy_detail = proxy_detail
             proxy_detail.manager.add(proxy=self, serializer=proxy_detail.serializer)
@@ -382,7 +483,7 @@ class ProxyObject:
         pxy.manager.remove(self)
         if pxy.serializer == "disk":
             header, _ = pxy.obj
-            os.remove(header["path"])
+            spilled_remove(header)
 
     def _pxy_serialize(
         self, serializers: Iterable[str], proxy_detail: ProxyDetail = None,
@@ -412,7 +513,7 @@ class ProxyObject:
         self._pxy_set(pxy)
 
         # Invalidate the (possible) cached "device_memory_objects"
-        self._pxy_cache.pop("device_memory_objects", None)
+        self._pxy_cache_device_memory_objects = None
 
     def _pxy_deserialize(
         self, maybe_evict: bool = True, proxy_detail: ProxyDetail = None
@@ -430,12 +531,19 @@ class ProxyObject:
             The proxied object (deserialized)
         """
 
+        original = self._pxy_get()
         pxy = self._pxy_get(copy=True) if not proxy_detail else proxy_detail
         if not pxy.is_serialized():
             return pxy.obj
 
         ret = pxy.deserialize(maybe_evict=maybe_evict, nbytes=self.__sizeof__())
-        self._pxy_set(pxy)
+        with pxy.manager.lock:
+            # The eviction above might have spilled this proxy to disk, which
+            # is superseded by the deserialized copy thus we remove the file
+            spilled = self._pxy_get()
+            self._pxy_set(pxy)
+        if spilled is not original and spilled.serializer == "disk":
+            spilled_remove(spilled.obj[0])
         return ret
 
     @_pxy_cache_wrapper("device_memory_objects")
@@ -465,6 +573,14 @@ class ProxyObject:
         return (subclass, (pxy,))
 
     def __getattr__(self, name):
+        """Get attribute `name` of the proxied object
+
+        When spilled, the attribute is looked up in the metadata captured at
+        serialization, see `get_fixed_attributes()`, before deserializing the
+        proxied object. Notice, only a range index is part of the metadata of a
+        dataframe or series thus accessing any other index, even just to get
+        `index.name` or `index.dtype`, deserializes the proxied object.
+        """
         pxy = self._pxy_get()
         if name in _FIXED_ATTRS:
             try:
@@ -473,6 +589,12 @@ class ProxyObject:
                 raise AttributeError(
                     f"type object '{pxy.typename}' has no attribute '{name}'"
                 )
+        # The metadata captured at serialization is only valid while serialized
+        if pxy.is_serialized():
+            try:
+                return pxy.fixed_attr[name]
+            except KeyError:
+                pass
         return getattr(self._pxy_deserialize(), name)
 
     def __setattr__(self, name: str, val):
@@ -510,9 +632,8 @@ class ProxyObject:
         return ret
 
     @property  # type: ignore  # mypy doesn't support decorated property
-    @_pxy_cache_wrapper("type_serialized")
     def __class__(self):
-        return pickle.loads(self._pxy_get().type_serialized)
+        return type_registry.get_type(self._pxy_get().type_id)
 
     @_pxy_cache_wrapper("sizeof")
     def __sizeof__(self):
@@ -529,9 +650,9 @@ class ProxyObject:
             return sizeof(self._pxy_deserialize())
 
     def __len__(self):
-        pxy = self._pxy_get(copy=True)
-        ret = pxy.fixed_attr.get("__len__", None)
+        ret = self._pxy_get().fixed_attr.get("__len__", None)
         if ret is None:
+            pxy = self._pxy_get(copy=True)
             ret = len(pxy.deserialize(nbytes=self.__sizeof__()))
             pxy.fixed_attr["__len__"] = ret
             self._pxy_set(pxy)
@@ -788,40 +909,83 @@ def handle_disk_serialized(pxy: ProxyDetail):
     """
     header, frames = pxy.obj
     if header["shared-filesystem"]:
-        old_path = header["path"]
-        new_path = f"{old_path}-linked-{uuid.uuid4()}"
-        os.link(old_path, new_path)
-        header = copy.copy(header)
-        header["path"] = new_path
+        header = spilled_link(header)
     else:
         # When not on a shared filesystem, we deserialize to host memory
         assert frames == []
-        with open(header["path"], "rb") as f:
-            frames = unpack_frames(f.read())
-        os.remove(header["path"])
-        if "compression" in header["disk-sub-header"]:
-            frames = decompress(header["disk-sub-header"], frames)
-        header = header["disk-sub-header"]
+        t0 = time.perf_counter()
+        frames = spilled_read(header)
+        spilled_remove(header)
+        header, frames = disk_compression.compressor.decompress(
+            header["disk-sub-header"], frames
+        )
         pxy.serializer = header["serializer"]
+        pxy.manager.record_transfer(
+            "disk-to-host",
+            sum(map(distributed.utils.nbytes, frames)),
+            time.perf_counter() - t0,
+        )
+    return header, frames
+
+
+def handle_compressed_serialized(pxy: ProxyDetail):
+    """Handle serialization of a proxy in compressed host memory
+
+    The frames are decompressed, which makes the proxy "dask" or "pickle"
+    serialized again.
+    """
+    t0 = time.perf_counter()
+    header, frames = pxy.obj
+    header, frames = disk_compression.host_compressor.decompress(
+        header["compressed-sub-header"], frames
+    )
+    pxy.obj = (header, frames)
+    pxy.serializer = header["serializer"]
+    pxy.manager.record_transfer(
+        "compressed-to-host",
+        sum(map(distributed.utils.nbytes, frames)),
+        time.perf_counter() - t0,
+    )
     return header, frames
 
 
+def _serialize_header(pxy: ProxyDetail, proxied_header: dict) -> dict:
+    """Return the header of a serialized ProxyObject
+
+    Besides the type ID, the header includes the pickled type, which the
+    registry creates at most once per type.
+    """
+    args = pxy.get_init_args()
+    # The fixed attributes can be any pickleable object
+    args["fixed_attr"] = pickle.dumps(args["fixed_attr"])
+    return {
+        "proxied-header": proxied_header,
+        "obj-pxy-detail": args,
+        "proxied-type": type_registry.get_serialized(pxy.type_id),
+    }
+
+
 @distributed.protocol.dask_serialize.register(ProxyObject)
 def obj_pxy_dask_serialize(obj: ProxyObject):
     """The dask serialization of ProxyObject used by Dask when communicating using TCP
 
     As serializers, it uses "dask" or "pickle", which means that proxied CUDA objects
     are spilled to main memory before communicated. Deserialization is needed, unless
-    obj is serialized to disk on a shared filesystem see `handle_disk_serialized()`.
+    obj is serialized to disk on a shared filesystem see `handle_disk_serialized()`
+    or already spilled to main memory using the "arena" serializer.
     """
     pxy = obj._pxy_get(copy=True)
-    if pxy.serializer == "disk":
+    if pxy.serializer == "arena":
+        header, frames = pxy.obj
+    elif pxy.serializer == "disk":
         header, frames = handle_disk_serialized(pxy)
+    elif pxy.serializer == "compressed":
+        header, frames = handle_compressed_serialized(pxy)
     else:
         header, frames = pxy.serialize(serializers=("dask", "pickle"))
     obj._pxy_set(pxy)
 
-    return {"proxied-header": header, "obj-pxy-detail": pxy.get_init_args()}, frames
+    return _serialize_header(pxy, header), frames
 
 
 @distributed.protocol.cuda.cuda_serialize.register(ProxyObject)
@@ -833,11 +997,14 @@ def obj_pxy_cuda_serialize(obj: ProxyObject):
     serialized proxied like in `obj_pxy_dask_serialize()`
     """
     pxy = obj._pxy_get(copy=True)
-    if pxy.serializer in ("dask", "pickle"):
+    if pxy.serializer in ("dask", "pickle", "arena"):
         header, frames = pxy.obj
     elif pxy.serializer == "disk":
         header, frames = handle_disk_serialized(pxy)
         obj._pxy_set(pxy)
+    elif pxy.serializer == "compressed":
+        header, frames = handle_compressed_serialized(pxy)
+        obj._pxy_set(pxy)
 
     else:
         # Notice, since obj._pxy_serialize() is a inplace operation, we make a
@@ -845,7 +1012,7 @@ def obj_pxy_cuda_serialize(obj: ProxyObject):
         # the worker's data store.
         header, frames = pxy.serialize(serializers=("cuda",))
 
-    return {"proxied-header": header, "obj-pxy-detail": pxy.get_init_args()}, frames
+    return _serialize_header(pxy, header), frames
 
 
 @distributed.protocol.dask_deserialize.register(ProxyObject)
@@ -857,7 +1024,10 @@ def obj_pxy_dask_deserialize(header, frames):
     deserialized using the same serializers that were used when the object was
     serialized.
     """
-    args = header["obj-pxy-detail"]
+    args = dict(header["obj-pxy-detail"])
+    # The type ID of the sender is translated using the pickled type
+    args["type_id"] = type_registry.type_id_from_serialized(header["proxied-type"])
+    args["fixed_attr"] = pickle.loads(args["fixed_attr"])
     if args["subclass"] is None:
         subclass = ProxyObject
     else:
@@ -886,7 +1056,6 @@ def unproxify_input_wrapper(func):
 # Register dispatch of ProxyObject on all known dispatch objects
 for dispatch in (
     dask.dataframe.core.hash_object_dispatch,
-    make_meta_dispatch,
     dask.dataframe.utils.make_scalar,
     dask.dataframe.core.group_split_dispatch,
     dask.array.core.tensordot_lookup,
@@ -900,6 +1069,15 @@ dask.dataframe.methods.concat_dispatch.register(
 )
 
 
+@make_meta_dispatch.register(ProxyObject)
+def make_meta_proxy_object(x, index=None):
+    """Create the meta of a spilled proxy from its fixed attributes if possible"""
+    pxy = x._pxy_get()
+    if pxy.is_serialized() and "_pxy_meta" in pxy.fixed_attr:
+        return make_meta_dispatch(pxy.fixed_attr["_pxy_meta"], index=index)
+    return make_meta_dispatch(unproxy(x), index=index)
+
+
 # We overwrite the Dask dispatch of Pandas objects in order to
 # deserialize all ProxyObjects before concatenating
 dask.dataframe.methods.concat_dispatch.register(
@@ -0,0 +1,248 @@
+import bisect
+import threading
+import weakref
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Sequence
+
+# Upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    float("inf"),
+)
+
+
+class Histogram:
+    """Histogram with fixed bucket bounds
+
+    This class is not threadsafe
+
+    Parameters
+    ----------
+    bounds: Sequence[float]
+        The (inclusive) upper bound of each bucket in ascending order. The last
+        bound should be infinity.
+    """
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        i = min(bisect.bisect_left(self.bounds, value), len(self.bounds) - 1)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        """Return the number of observations less than or equal to each bound"""
+        ret = []
+        total = 0
+        for c in self.counts:
+            total += c
+            ret.append(total)
+        return ret
+
+
+class SpillMetrics:
+    """Metrics of the spilling and unspilling of a ProxyManager
+
+    The transfers are labeled by direction, e.g. "device-to-host" or
+    "disk-to-device", and the evictions by the tier evicted from.
+
+    This class is threadsafe
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.transferred_bytes: DefaultDict[str, int] = defaultdict(int)
+        self.transferred_objects: DefaultDict[str, int] = defaultdict(int)
+        self.transfer_latency: DefaultDict[str, Histogram] = defaultdict(Histogram)
+        self.eviction_latency: DefaultDict[str, Histogram] = defaultdict(Histogram)
+
+    def record_transfer(self, direction: str, nbytes: int, seconds: float) -> None:
+        """Record the spill or unspill of a single proxy"""
+        with self._lock:
+            self.transferred_bytes[direction] += nbytes
+            self.transferred_objects[direction] += 1
+            self.transfer_latency[direction].observe(seconds)
+
+    def record_eviction(self, tier: str, seconds: float) -> None:
+        """Record a call that evicts from `tier`"""
+        with self._lock:
+            self.eviction_latency[tier].observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Return a copy of the metrics as plain dictionaries
+
+        Returns
+        -------
+        Dictionary with a "transfers" entry mapping each direction to its "bytes",
+        "objects", "seconds" and "max-bucket-seconds" (the upper bound of the
+        slowest non-empty latency bucket), and an "evictions" entry mapping each
+        tier to its "count" and "seconds".
+        """
+        with self._lock:
+            transfers = {}
+            for direction, hist in self.transfer_latency.items():
+                transfers[direction] = {
+                    "bytes": self.transferred_bytes[direction],
+                    "objects": self.transferred_objects[direction],
+                    "seconds": hist.sum,
+                    "max-bucket-seconds": max(
+                        b for b, c in zip(hist.bounds, hist.counts) if c > 0
+                    ),
+                }
+            evictions = {
+                tier: {"count": hist.count, "seconds": hist.sum}
+                for tier, hist in self.eviction_latency.items()
+            }
+        return {"transfers": transfers, "evictions": evictions}
+
+
+class SpillMetricsCollector:
+    """Prometheus collector of the spill metrics of JIT-unspill workers
+
+    A single collector is registered per process, which reports the metrics
+    of all registered workers labeled by the worker address.
+    """
+
+    prefix = "dask_worker_jit_unspill"
+
+    def __init__(self):
+        self._workers: "weakref.WeakSet" = weakref.WeakSet()
+
+    def add_worker(self, worker) -> None:
+        self._workers.add(worker)
+
+    def _managers(self) -> List[tuple]:
+        from .proxify_host_file import ProxifyHostFile
+
+        ret = []
+        for worker in list(self._workers):
+            if isinstance(worker.data, ProxifyHostFile):
+                ret.append((str(worker.address), worker.data.manager))
+        return ret
+
+    def collect(self):
+        from prometheus_client.core import (
+            CounterMetricFamily,
+            GaugeMetricFamily,
+            HistogramMetricFamily,
+        )
+
+        managers = self._managers()
+        p = self.prefix
+        transferred_bytes = CounterMetricFamily(
+            f"{p}_transferred_bytes",
+            "Number of bytes spilled or unspilled.",
+            labels=["worker", "direction"],
+        )
+        transferred_objects = CounterMetricFamily(
+            f"{p}_transferred_objects",
+            "Number of proxies spilled or unspilled.",
+            labels=["worker", "direction"],
+        )
+        transfer_latency = HistogramMetricFamily(
+            f"{p}_transfer_duration_seconds",
+            "Duration of spilling or unspilling a proxy.",
+            labels=["worker", "direction"],
+        )
+        eviction_latency = HistogramMetricFamily(
+            f"{p}_eviction_duration_seconds",
+            "Duration of the calls that evict proxies from a memory tier.",
+            labels=["worker", "tier"],
+        )
+        tier_bytes = GaugeMetricFamily(
+            f"{p}_memory_bytes",
+            "Number of bytes in each memory tier.",
+            labels=["worker", "tier"],
+        )
+        tier_limit = GaugeMetricFamily(
+            f"{p}_memory_limit_bytes",
+            "The memory limit of each memory tier.",
+            labels=["worker", "tier"],
+        )
+        tier_proxies = GaugeMetricFamily(
+            f"{p}_proxies",
+            "Number of proxies in each memory tier.",
+            labels=["worker", "tier"],
+        )
+
+        def histogram_buckets(hist: Histogram):
+            return [
+                ("+Inf" if b == float("inf") else str(b), c)
+                for b, c in zip(hist.bounds, hist.cumulative_counts())
+            ]
+
+        for address, manager in managers:
+            metrics: SpillMetrics = manager.metrics
+            with metrics._lock:
+                for direction, hist in metrics.transfer_latency.items():
+                    labels = [address, direction]
+                    transferred_bytes.add_metric(
+                        labels, metrics.transferred_bytes[direction]
+                    )
+                    transferred_objects.add_metric(
+                        labels, metrics.transferred_objects[direction]
+                    )
+                    transfer_latency.add_metric(
+                        labels, histogram_buckets(hist), hist.sum
+                    )
+                for tier, hist in metrics.eviction_latency.items():
+                    eviction_latency.add_metric(
+                        [address, tier], histogram_buckets(hist), hist.sum
+                    )
+            for tier, (nbytes, nproxies, limit) in manager.tier_tallies().items():
+                tier_bytes.add_metric([address, tier], nbytes)
+                tier_proxies.add_metric([address, tier], nproxies)
+                if limit is not None:
+                    tier_limit.add_metric([address, tier], limit)
+
+        yield transferred_bytes
+        yield transferred_objects
+        yield transfer_latency
+        yield eviction_latency
+        yield tier_bytes
+        yield tier_limit
+        yield tier_proxies
+
+
+_collector = None
+_collector_lock = threading.Lock()
+
+
+def register_prometheus_metrics(worker) -> bool:
+    """Export the spill metrics of `worker` as Prometheus metrics
+
+    The metrics are served by the "/metrics" route of the worker's dashboard
+    together with the other worker metrics of Distributed.
+
+    Returns
+    -------
+    Whether the metrics were registered, which requires the prometheus_client
+    package
+    """
+    global _collector
+    try:
+        import prometheus_client
+    except ImportError:
+        return False
+
+    with _collector_lock:
+        if _collector is None:
+            _collector = SpillMetricsCollector()
+            prometheus_client.REGISTRY.register(_collector)
+        _collector.add_worker(worker)
+    return True
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+
+from dask.sizeof import sizeof
+from distributed.protocol.serialize import deserialize
+
+from dask_cuda import disk_io
+from dask_cuda.content_store import ContentStore, content_hash, readonly_frames
+from dask_cuda.proxify_host_file import ProxiesOnDeduplicatedHost, ProxifyHostFile
+from dask_cuda.proxy_object import asproxy
+
+
+def test_content_hash():
+    assert content_hash([b"ab", b"c"]) == content_hash([bytearray(b"ab"), b"c"])
+    assert content_hash([b"ab", b"c"]) != content_hash([b"a", b"bc"])
+    assert content_hash([b"abc"]) != content_hash([b"abc", b""])
+    assert content_hash([np.arange(3)]) == content_hash([np.arange(3).tobytes()])
+
+
+def test_readonly_frames():
+    frames = readonly_frames([bytearray(b"hello")])
+    assert frames[0].readonly
+    assert bytes(frames[0]) == b"hello"
+
+
+def test_content_store():
+    store = ContentStore()
+    assert store.acquire("a") is None
+    assert store.insert("a", 1) == (1, True)
+    assert store.insert("a", 2) == (1, False)
+    assert store.acquire("a") == 1
+    assert store.refcount("a") == 3
+    assert store.release("a") == (1, False)
+    assert store.release("a") == (1, False)
+    assert store.release("a") == (1, True)
+    assert "a" not in store
+    assert store.release("a") == (None, True)
+
+
+def test_deduplicated_host():
+    host = ProxiesOnDeduplicatedHost()
+    proxies = [asproxy(np.arange(100), serializers=("dask",)) for _ in range(3)]
+    proxies.append(asproxy(np.arange(100) + 1, serializers=("dask",)))
+    for p in proxies:
+        host.add(p)
+    size = sizeof(proxies[0])
+    assert host.mem_usage() == size * 2
+
+    # The proxies with the same content share the (read-only) frames
+    _, frames = proxies[0]._pxy_get().obj
+    assert proxies[1]._pxy_get().obj[1] is frames
+    assert all(f.readonly for f in frames)
+    assert proxies[3]._pxy_get().obj[1] is not frames
+
+    # Deserialization of the shared frames returns a writeable copy
+    x = deserialize(*proxies[1]._pxy_get().obj)
+    x[0] = 42
+    np.testing.assert_array_equal(
+        deserialize(*proxies[0]._pxy_get().obj), np.arange(100)
+    )
+
+    host.remove(proxies[0])
+    host.remove(proxies[1])
+    assert host.mem_usage() == size * 2
+    host.remove(proxies[2])
+    assert host.mem_usage() == size
+
+
+def test_deduplicated_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(ProxifyHostFile, "_spill_directory", str(tmp_path))
+    monkeypatch.setattr(ProxifyHostFile, "_spill_deduplication", True)
+    monkeypatch.setattr(disk_io, "spilled_content", ContentStore())
+    monkeypatch.setattr(disk_io, "disk_quota", None)  # An unlimited disk
+
+    headers = [ProxifyHostFile.write_to_disk([b"hello"]) for _ in range(3)]
+    other = ProxifyHostFile.write_to_disk([b"world"])
+    assert len(os.listdir(tmp_path)) == 2
+    assert headers[0] == headers[1] == headers[2]
+    assert bytes(disk_io.spilled_read(headers[1])[0]) == b"hello"
+
+    # A link is independent of the deduplicated data
+    linked = disk_io.spilled_link(headers[0])
+    assert "content-hash" not in linked
+
+    # The data is removed when the last reference is removed
+    disk_io.spilled_remove(headers[0])
+    disk_io.spilled_remove(headers[1])
+    assert bytes(disk_io.spilled_read(headers[2])[0]) == b"hello"
+    disk_io.spilled_remove(headers[2])
+    disk_io.spilled_remove(linked)
+    disk_io.spilled_remove(other)
+    assert os.listdir(tmp_path) == []
+    assert len(disk_io.spilled_content) == 0
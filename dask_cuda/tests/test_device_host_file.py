@@ -13,6 +13,7 @@ from distributed.protocol import (
 )
 from distributed.protocol.pickle import HIGHEST_PROTOCOL
 
+import dask_cuda.device_host_file
 from dask_cuda.device_host_file import DeviceHostFile, device_to_host, host_to_device
 
 cupy = pytest.importorskip("cupy")
@@ -143,6 +144,89 @@ def test_device_host_file_step_by_step(tmp_path):
     assert set(dhf.host.keys()) == set(["x"])
 
 
+def test_device_host_file_pin(tmp_path):
+    b = cupy.random.random(1000)
+    dhf = DeviceHostFile(
+        device_memory_limit=b.nbytes * 3,
+        memory_limit=1024 * 64,
+        local_directory=tmp_path,
+        pin_limit=b.nbytes,
+    )
+    dhf["lut"] = b
+    dhf["b1"] = b
+    dhf["b2"] = b
+    dhf["b3"] = b
+    assert set(dhf.host.keys()) == set(["lut"])
+
+    # Pinning unspills the key, which is excluded from the device buffer
+    dhf.pin("lut")
+    assert set(dhf.pinned.keys()) == set(["lut"])
+    assert set(dhf.device.keys()) == set(["b2", "b3"])
+    assert set(dhf.host.keys()) == set(["b1"])
+    dhf["b4"] = b
+    dhf["b5"] = b
+    assert set(dhf.device.keys()) == set(["b4", "b5"])
+    assert set(dhf) == set(["lut", "b1", "b2", "b3", "b4", "b5"])
+    assert_eq(dhf["lut"], b)
+
+    with pytest.raises(ValueError, match="pin limit"):
+        dhf.pin("b4")
+    dhf["a"] = np.random.random(10)
+    with pytest.raises(ValueError, match="isn't a device object"):
+        dhf.pin("a")
+    with pytest.raises(KeyError):
+        dhf.pin("missing")
+
+    dhf.unpin("lut")
+    assert dhf.pinned_nbytes == 0
+    assert set(dhf.device.keys()) == set(["b4", "b5", "lut"])
+    dhf.pin("lut")
+    del dhf["lut"]
+    assert dhf.pinned_nbytes == 0
+    assert "lut" not in dhf
+
+
+@pytest.mark.skipif(
+    not dask_cuda.device_host_file._zict_keeps_failed_evictions,
+    reason="A disk spill quota requires zict 2.1 or newer",
+)
+def test_device_host_file_disk_quota(tmp_path):
+    a = np.random.random(1000)
+    dhf = DeviceHostFile(
+        device_memory_limit=1024 * 16,
+        memory_limit=a.nbytes,
+        local_directory=tmp_path,
+        disk_quota=a.nbytes * 2.5,
+    )
+    dhf["a1"] = a
+    dhf["a2"] = a
+    dhf["a3"] = a
+    assert set(dhf.disk.keys()) == set(["a1", "a2"])
+    assert dhf.disk_quota.usage() >= a.nbytes * 2
+
+    # Spilling beyond the quota keeps the data in host memory and never
+    # fails an access
+    dhf["a4"] = a
+    assert set(dhf.disk.keys()) == set(["a1", "a2"])
+    assert set(dhf.host.keys()) == set(["a3", "a4"])
+    for k in ["a1", "a2", "a3", "a4"]:
+        assert_eq(dhf[k], a)
+
+    # Deleting gives back the quota
+    for k in list(dhf):
+        del dhf[k]
+    assert dhf.disk_quota.usage() == 0
+
+
+def test_device_host_file_disk_quota_old_zict(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        dask_cuda.device_host_file, "_zict_keeps_failed_evictions", False
+    )
+    with pytest.raises(ValueError, match="requires zict 2.1"):
+        DeviceHostFile(local_directory=tmp_path, disk_quota="1 MiB")
+    DeviceHostFile(local_directory=tmp_path)  # No quota, no problem
+
+
 @pytest.mark.parametrize("collection", [dict, list, tuple])
 @pytest.mark.parametrize("length", [0, 1, 3, 6])
 @pytest.mark.parametrize("value", [10, {"x": [1, 2, 3], "y": [4.0, 5.0, 6.0]}])
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from dask_cuda.disk_compression import FrameCompressor, available_codecs, get_codec
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_compress_roundtrip(codec):
+    compressor = FrameCompressor(codec, min_size=100)
+    compressible = np.arange(10_000, dtype="int64")
+    incompressible = np.random.RandomState(42).bytes(100_000)
+    frames = [b"small", compressible.data, incompressible]
+    header, compressed = compressor.compress({"serializer": "dask"}, frames)
+    assert header["compression"] == (None, codec, None)
+    assert len(compressed[1]) < compressible.nbytes
+    assert compressed[0] is frames[0] and compressed[2] is frames[2]
+
+    header, got = compressor.decompress(header, compressed)
+    assert "compression" not in header
+    assert bytes(got[0]) == b"small"
+    np.testing.assert_array_equal(np.frombuffer(got[1], dtype="int64"), compressible)
+    assert bytes(got[2]) == incompressible
+
+    stats = compressor.statistics()[codec]
+    assert stats["compressed-frames"] == 1
+    assert stats["skipped-frames"] == 1
+    assert stats["skipped-nbytes"] == len(incompressible)
+    assert stats["raw-nbytes"] == stats["decompressed-nbytes"] == compressible.nbytes
+    assert 0 < stats["ratio"] < 0.9
+    assert stats["compress-throughput"] > 0
+
+
+def test_compress_already_compressed_frames():
+    compressor = FrameCompressor("zlib", min_size=100)
+    frame = bytes(1000)
+    header, frames = compressor.compress(
+        {"compression": ("zlib", None)}, [compressor.codec.compress(frame, 1), frame]
+    )
+    assert header["compression"] == ("zlib", "zlib")
+    header, frames = compressor.decompress(header, frames)
+    assert frames == [frame, frame]
+
+
+def test_get_codec():
+    assert get_codec(None) is None
+    assert get_codec(False) is None
+    assert get_codec("none") is None
+    assert get_codec("zlib:1").name == "zlib"
+    with pytest.raises(ValueError, match="Unknown or not installed"):
+        get_codec("not-a-codec")
+    compressor = FrameCompressor(None)
+    header, frames = compressor.compress({}, [bytes(100_000)])
+    assert header["compression"] == (None,)
+    assert compressor.statistics() == {}
@@ -0,0 +1,273 @@
+import errno
+import os
+
+import numpy as np
+import pytest
+
+from dask_cuda import disk_io
+from dask_cuda.disk_io import (
+    DiskQuota,
+    DiskQuotaExceeded,
+    SegmentStore,
+    disk_read,
+    disk_read_region,
+    disk_write,
+    spilled_read,
+    spilled_remove,
+)
+from dask_cuda.proxify_host_file import ProxifyHostFile
+from dask_cuda.proxy_object import asproxy
+
+
+def test_disk_write_read(tmp_path):
+    path = str(tmp_path / "frames")
+    frames = [b"", b"hello", np.arange(100)]
+    disk_write(path, frames)
+
+    got = disk_read(path)
+    assert len(got) == len(frames)
+    assert all(isinstance(f, memoryview) for f in got)
+    assert bytes(got[0]) == b""
+    assert bytes(got[1]) == b"hello"
+    assert bytes(got[2]) == np.arange(100).tobytes()
+
+    # The frames are valid after removal of the file
+    os.remove(path)
+    np.testing.assert_array_equal(np.frombuffer(got[2], dtype=int), np.arange(100))
+
+    # The frames are writeable but writing doesn't modify the file
+    disk_write(path, [b"hello"])
+    got = disk_read(path)
+    got[0][0] = ord("j")
+    assert bytes(got[0]) == b"jello"
+    assert bytes(disk_read(path)[0]) == b"hello"
+
+
+def test_disk_read_allocator(tmp_path):
+    path = str(tmp_path / "frames")
+    frames = [b"", b"hello", np.arange(100)]
+    disk_write(path, frames)
+
+    allocations = []
+
+    def allocator(nbytes):
+        allocations.append(nbytes)
+        return bytearray(nbytes)
+
+    got = disk_read(path, allocator=allocator)
+    assert allocations == [0, 5, np.arange(100).nbytes]
+    assert bytes(got[0]) == b""
+    assert bytes(got[1]) == b"hello"
+    assert bytes(got[2]) == np.arange(100).tobytes()
+
+
+def test_disk_write_many_frames(tmp_path):
+    """Check writing more frames than a single writev() call accepts"""
+    path = str(tmp_path / "frames")
+    frames = [bytes([i % 256]) * (i % 7) for i in range(5000)]
+    disk_write(path, frames)
+    assert [bytes(f) for f in disk_read(path)] == frames
+
+
+def test_segment_store(tmp_path):
+    store = SegmentStore(
+        str(tmp_path),
+        prefix="test",
+        segment_size=120,
+        compaction_threshold=0.6,
+        background_compaction=False,
+    )
+    keys = [store.put([bytes([i]) * 40]) for i in range(5)]
+    assert len(store) == 5
+    # 40 bytes of frames + 16 bytes frame-length index per entry, thus
+    # two entries per segment
+    assert len(store.segments()) == 3
+    assert len(os.listdir(tmp_path)) == 3
+    for i, key in enumerate(keys):
+        assert bytes(store.get(key)[0]) == bytes([i]) * 40
+
+    # A segment is deleted when all of its entries are removed
+    store.remove(keys[0])
+    store.remove(keys[1])
+    assert len(store.segments()) == 2
+    assert len(os.listdir(tmp_path)) == 2
+
+    # Compaction moves the live entry of the half empty segment
+    store.remove(keys[2])
+    assert store.compact() == 1
+    assert len(store) == 2
+    assert bytes(store.get(keys[3])[0]) == bytes([3]) * 40
+    assert bytes(store.get(keys[4])[0]) == bytes([4]) * 40
+
+    # A link keeps the data alive after removal from the store
+    path, offset, nbytes = store.link(keys[4])
+    store.remove(keys[3])
+    store.remove(keys[4])
+    assert len(store) == 0
+    assert bytes(disk_read_region(path, offset, nbytes)[0]) == bytes([4]) * 40
+    os.remove(path)
+
+
+def test_segment_store_close(tmp_path, monkeypatch):
+    store = SegmentStore(str(tmp_path), prefix="test", background_compaction=False)
+    key = store.put([b"hello"])
+    store.close()
+    assert store._active_fd is None
+    assert bytes(store.get(key)[0]) == b"hello"
+
+    # The next write starts a new segment
+    store.put([b"world"])
+    assert len(store.segments()) == 2
+
+    # Freeing the store at interpreter shutdown, where module globals might
+    # be gone, doesn't raise
+    monkeypatch.setattr(disk_io, "os", None)
+    store.__del__()
+    monkeypatch.undo()
+    store.close()
+
+
+def test_register_segment_store(tmp_path, monkeypatch):
+    # The disk path, quota and segment store are process-wide, start anew
+    monkeypatch.setattr(ProxifyHostFile, "_spill_directory", None)
+    monkeypatch.setattr(disk_io, "disk_quota", None)
+    monkeypatch.setattr(disk_io, "segment_store", None)
+    ProxifyHostFile.register_disk_spilling(str(tmp_path), segment_store=True)
+    store = disk_io.segment_store
+    assert store is not None
+
+    # Later registrations inherit the segment store but cannot disable it
+    ProxifyHostFile.register_disk_spilling(str(tmp_path))
+    assert disk_io.segment_store is store
+    with pytest.raises(ValueError, match="Cannot change the JIT-Unspilling segment"):
+        ProxifyHostFile.register_disk_spilling(str(tmp_path), segment_store=False)
+    store.close()
+
+
+def test_segment_store_quota(tmp_path):
+    quota = DiskQuota(200)
+    store = SegmentStore(
+        str(tmp_path),
+        prefix="test",
+        segment_size=120,
+        compaction_threshold=0.6,
+        background_compaction=False,
+        quota=quota,
+    )
+    # Each entry is 56 bytes, see test_segment_store()
+    keys = [store.put([bytes([i]) * 40]) for i in range(3)]
+    assert quota.usage() == 168
+    with pytest.raises(DiskQuotaExceeded):
+        store.put([b"x" * 40])
+    assert quota.usage() == 168
+    assert len(store) == 3
+
+    # Removed entries are charged until their segment is deleted
+    store.remove(keys[0])
+    assert quota.usage() == 168
+    assert store.compact() == 1
+    assert quota.usage() == 112
+    assert quota.usage() == sum(seg.size for seg in store.segments())
+
+    # The active segment is charged until it is sealed
+    store.remove(keys[1])
+    store.remove(keys[2])
+    assert quota.usage() == 112
+    store.put([b"x" * 40])
+    assert quota.usage() == 56
+
+
+def test_spilled_header_helpers(tmp_path, monkeypatch):
+    path = str(tmp_path / "frames")
+    disk_write(path, [b"hello"])
+    header = {"path": path}
+    linked = disk_io.spilled_link(header)
+    spilled_remove(header)
+    assert bytes(spilled_read(linked)[0]) == b"hello"
+    spilled_remove(linked)
+    assert os.listdir(tmp_path) == []
+
+    store = SegmentStore(str(tmp_path), prefix="test", background_compaction=False)
+    monkeypatch.setattr(disk_io, "segment_store", store)
+    header = {"segment-key": store.put([b"hello"])}
+    linked = disk_io.spilled_link(header)
+    assert "segment-key" not in linked
+    spilled_remove(header)
+    assert bytes(spilled_read(linked)[0]) == b"hello"
+    spilled_remove(linked)
+
+
+def test_disk_quota():
+    quota = DiskQuota(100)
+    quota.acquire(60)
+    assert quota.usage() == 60
+    assert quota.fraction() == 0.6
+    with pytest.raises(DiskQuotaExceeded, match="disk quota of 100 bytes") as e:
+        quota.acquire(50)
+    assert e.value.errno == errno.EDQUOT
+    assert quota.usage() == 60
+    quota.release(60)
+    quota.acquire(100)
+    assert quota.fraction() == 1.0
+
+    # Without a limit, the bytes are only tallied
+    quota = DiskQuota()
+    quota.acquire(2 ** 50)
+    assert quota.usage() == 2 ** 50
+    assert quota.fraction() == 0.0
+
+
+def test_spilled_remove_releases_quota(tmp_path, monkeypatch):
+    quota = DiskQuota(100)
+    monkeypatch.setattr(disk_io, "disk_quota", quota)
+    path = str(tmp_path / "frames")
+    disk_write(path, [b"hello"])
+    quota.acquire(5)
+    header = {"path": path, "disk-nbytes": 5}
+    linked = disk_io.spilled_link(header)
+    assert "disk-nbytes" not in linked
+    spilled_remove(linked)
+    assert quota.usage() == 5
+    spilled_remove(header)
+    assert quota.usage() == 0
+
+
+@pytest.mark.parametrize("segment_store", [False, True])
+def test_register_disk_quota(tmp_path, monkeypatch, segment_store):
+    # The disk path, quota and segment store are process-wide, start anew
+    monkeypatch.setattr(ProxifyHostFile, "_spill_directory", None)
+    monkeypatch.setattr(disk_io, "disk_quota", None)
+    monkeypatch.setattr(disk_io, "segment_store", None)
+    ProxifyHostFile.register_disk_spilling(
+        str(tmp_path), segment_store=segment_store, disk_quota="1 MiB"
+    )
+    quota = disk_io.disk_quota
+    store = disk_io.segment_store
+    assert quota.limit == 2 ** 20
+
+    # Later registrations inherit the quota but cannot change it
+    ProxifyHostFile.register_disk_spilling(str(tmp_path))
+    assert disk_io.disk_quota is quota
+    with pytest.raises(ValueError, match="Cannot change the JIT-Unspilling disk quota"):
+        ProxifyHostFile.register_disk_spilling(str(tmp_path), disk_quota="2 MiB")
+
+    # Spilling to disk charges the quota, the segment store charges the
+    # size of its segment files
+    pxy = asproxy(np.arange(1000), serializers=("dask", "pickle"))
+    ProxifyHostFile.serialize_proxy_to_disk_inplace(pxy)
+    assert quota.usage() >= 8000
+    if segment_store:
+        assert quota.usage() == sum(seg.size for seg in store.segments())
+
+    # Once the quota is used up, spilling fails
+    quota.limit = quota.usage()
+    with pytest.raises(DiskQuotaExceeded):
+        ProxifyHostFile.serialize_proxy_to_disk_inplace(
+            asproxy(np.arange(1000), serializers=("dask", "pickle"))
+        )
+
+    # Removing the spilled data gives back the quota
+    del pxy
+    if segment_store:
+        store.close()  # The active segment is only removed when closed
+    assert quota.usage() == 0
@@ -0,0 +1,195 @@
+import pytest
+
+from dask_cuda.eviction_policies import (
+    ARC,
+    HINT_NEEDED_SOON,
+    HINT_NOT_NEEDED,
+    LFU,
+    LRU,
+    GreedyDualSize,
+    SpillCostModel,
+    get_eviction_policy,
+    policies,
+)
+from dask_cuda.proxify_host_file import AccessIndex
+
+
+def victims(index, nbytes):
+    return [key for key, _ in index.least_recently_accessed(nbytes)]
+
+
+def test_access_index():
+    index = AccessIndex()
+    index.update("k1", last_access=1.0, size=10)
+    index.update("k2", last_access=2.0, size=10)
+    index.update("k3", last_access=2.0, size=20)
+    assert len(index) == 3
+    # Ties in last access are broken by size, largest first
+    assert index.least_recently_accessed(nbytes=15) == [("k1", 10), ("k3", 20)]
+    assert index.least_recently_accessed(nbytes=100) == [
+        ("k1", 10),
+        ("k3", 20),
+        ("k2", 10),
+    ]
+
+    # Accessing "k1" makes it the most recently accessed key
+    index.update("k1", last_access=3.0, size=10)
+    assert index.least_recently_accessed(nbytes=1) == [("k3", 20)]
+    assert index.last_access("k1") == 3.0
+
+    index.remove("k3")
+    assert "k3" not in index
+    assert index.least_recently_accessed(nbytes=100) == [("k2", 10), ("k1", 10)]
+
+    # Many updates of the same key doesn't grow the index
+    for i in range(1000):
+        index.update("k2", last_access=4.0 + i, size=10)
+    assert sum(map(len, index._heaps)) < 100
+    assert index.least_recently_accessed(nbytes=100) == [("k1", 10), ("k2", 10)]
+
+
+@pytest.mark.parametrize("name", list(policies))
+def test_get_eviction_policy(name):
+    assert isinstance(get_eviction_policy(name.upper()), policies[name])
+    with pytest.raises(ValueError, match="Unknown eviction policy"):
+        get_eviction_policy("not-a-policy")
+
+
+@pytest.mark.parametrize("name", list(policies))
+def test_policy_index_consistency(name):
+    index = AccessIndex(get_eviction_policy(name))
+    for i in range(100):
+        index.update(i % 10, last_access=i, size=i % 10 + 1, access_count=i // 10)
+    assert len(index) == 10
+    assert sorted(victims(index, 10 ** 6)) == list(range(10))
+    assert sum(index._nbytes) == sum(range(1, 11))
+    for i in range(10):
+        index.remove(i)
+    assert len(index) == 0
+    assert sum(index._nbytes) == 0
+    assert victims(index, 10 ** 6) == []
+
+
+def test_lru():
+    index = AccessIndex(LRU())
+    index.update("hot", last_access=1, size=1, access_count=10)
+    index.update("cold", last_access=2, size=1, access_count=1)
+    assert victims(index, 1) == ["hot"]
+
+
+def test_lfu():
+    index = AccessIndex(LFU())
+    index.update("hot", last_access=1, size=1, access_count=10)
+    index.update("cold", last_access=2, size=1, access_count=1)
+    index.update("cold2", last_access=3, size=1, access_count=1)
+    assert victims(index, 2) == ["cold", "cold2"]
+
+
+def test_greedy_dual_size():
+    policy = GreedyDualSize()
+    index = AccessIndex(policy)
+    index.update("small", last_access=1, size=10, access_count=1)
+    index.update("large", last_access=2, size=1000, access_count=1)
+    assert victims(index, 1) == ["large"]
+    assert policy.inflation == pytest.approx(1 / 1000)
+
+    # A large key accessed often enough is kept over a small one
+    index.update("large", last_access=3, size=1000, access_count=1000)
+    assert victims(index, 1) == ["small"]
+
+
+def test_arc():
+    policy = ARC()
+    index = AccessIndex(policy)
+    index.update("hot", last_access=1, size=10, access_count=2)
+    index.update("once1", last_access=2, size=10, access_count=1)
+    index.update("once2", last_access=3, size=10, access_count=1)
+
+    # Keys accessed once (T1) are evicted before repeatedly accessed keys (T2)
+    assert victims(index, 20) == ["once1", "once2"]
+    assert victims(index, 30) == ["once1", "once2", "hot"]
+
+    # Reloading a key evicted from T1 puts it in T2 and grows the T1 target
+    index.remove("once1")
+    index.update("once1", last_access=4, size=10, access_count=1)
+    assert policy.target == 10
+    # T1 is within its target now thus the least recently used of T2 is evicted
+    assert victims(index, 10) == ["hot"]
+
+
+def test_arc_policy_key():
+    policy = ARC()
+    index = AccessIndex(policy)
+    index.update("buf1", last_access=1, size=10, policy_key="p1")
+    index.update("buf2", last_access=2, size=10, policy_key="p2")
+    assert victims(index, 10) == ["buf1"]
+    index.remove("buf1")
+
+    # A reloaded buffer is a ghost hit when it has the same policy key, which
+    # puts it in T2 and grows the T1 target
+    index.update("buf3", last_access=3, size=10, policy_key="p1")
+    assert policy.target == 10
+    assert victims(index, 10) == ["buf3"]
+    assert "p1" in policy.ghosts[1]
+
+    # Forgotten keys are never ghost hits
+    index.remove("buf3")
+    index.forget("p1")
+    assert "p1" not in policy.ghosts[1]
+    index.update("buf4", last_access=4, size=10, policy_key="p1")
+    assert policy.target == 10
+
+
+def test_greedy_dual_size_cost():
+    index = AccessIndex(GreedyDualSize())
+    index.update("cheap", last_access=1, size=100, access_count=1, cost=0.1)
+    index.update("expensive", last_access=2, size=100, access_count=1, cost=10)
+    assert victims(index, 1) == ["cheap"]
+
+
+def test_greedy_dual_size_cost_model():
+    # The per-object overhead makes small keys more expensive per byte thus a
+    # large key is evicted before a small one with the same access count
+    model = SpillCostModel()
+    index = AccessIndex(GreedyDualSize())
+    for key, last_access, size in [("small", 1, 10), ("large", 2, 10 ** 6)]:
+        cost = model.reload_cost("int", ["disk"], size)
+        index.update(key, last_access, size, access_count=1, cost=cost)
+    assert victims(index, 1) == ["large"]
+
+
+@pytest.mark.parametrize("name", list(policies))
+def test_eviction_hints(name):
+    index = AccessIndex(get_eviction_policy(name))
+    index.update("soon", last_access=1, size=1, hint=HINT_NEEDED_SOON)
+    index.update("default", last_access=2, size=1)
+    index.update("peer", last_access=3, size=1, access_count=10, hint=HINT_NOT_NEEDED)
+    assert victims(index, 3) == ["peer", "default", "soon"]
+
+    # Updating the hint reorders the key
+    index.update("soon", last_access=1, size=1, hint=HINT_NOT_NEEDED)
+    assert index.hint("soon") == HINT_NOT_NEEDED
+    assert sorted(victims(index, 2)) == ["peer", "soon"]
+
+
+def test_spill_cost_model():
+    model = SpillCostModel(default_throughput=100, alpha=0.5, overhead=1)
+    assert model.throughput("serialize", "int", ["disk"]) == 100
+    assert model.reload_cost("int", ["disk"], 100) == 1 + 2
+
+    model.record("serialize", "int", "disk", nbytes=1000, seconds=1)
+    model.record("deserialize", "int", "disk", nbytes=1000, seconds=1)
+    assert model.throughput("serialize", "int", ["disk"]) == 1000
+    # The moving average
+    model.record("serialize", "int", "disk", nbytes=3000, seconds=1)
+    assert model.throughput("serialize", "int", ["disk"]) == 2000
+    assert model.reload_cost("int", ["disk"], 1000) == 1 + 1000 / 2000 + 1000 / 1000
+
+    # Unobserved types fall back on the throughput of all types of the serializer
+    assert model.throughput("serialize", "str", ["disk"]) == 2000
+    assert model.throughput("serialize", "str", ["dask", "disk"]) == 2000
+    assert model.throughput("serialize", "str", ["dask"]) == 100
+
+    # Observations without a duration are ignored
+    model.record("serialize", "int", "disk", nbytes=1000, seconds=0)
+    assert model.statistics()["serialize"] == {"int/disk": 2000}
@@ -0,0 +1,85 @@
+import gc
+
+import numpy as np
+import pytest
+
+from distributed.protocol.serialize import deserialize, serialize
+
+from dask_cuda import host_arena
+from dask_cuda.host_arena import HostArena, size_class
+
+
+def test_size_class():
+    assert size_class(0) == host_arena.MIN_SIZE_CLASS
+    assert size_class(host_arena.MIN_SIZE_CLASS) == host_arena.MIN_SIZE_CLASS
+    assert size_class(4097) == 5120
+    assert size_class(5120) == 5120
+    assert size_class(2 ** 20) == 2 ** 20
+    for n in (4097, 10 ** 5, 10 ** 6 + 1, 3 * 2 ** 30):
+        assert n <= size_class(n) <= n * 1.25
+
+
+def test_host_arena_reuse():
+    arena = HostArena(pinned=False)
+    assert not arena.pinned
+    a = arena.allocate(5000)
+    assert a.nbytes == 5000 and a.dtype == np.uint8
+    assert arena.statistics()["bytes-in-use"] == 5120
+
+    # A memoryview of the buffer keeps it in use
+    view = memoryview(a)
+    del a
+    gc.collect()
+    assert arena.statistics()["releases"] == 0
+    del view
+    stats = arena.statistics()
+    assert stats["releases"] == 1
+    assert stats["bytes-in-use"] == 0
+    assert stats["bytes-cached"] == 5120
+
+    # Allocations of the same size class reuse the buffer
+    b = arena.allocate(4500)
+    stats = arena.statistics()
+    assert stats["allocations"] == 2
+    assert stats["reuses"] == 1
+    assert stats["bytes-cached"] == 0
+    assert stats["peak-bytes-in-use"] == 5120
+    del b
+    arena.clear()
+    assert arena.statistics()["bytes-cached"] == 0
+
+
+def test_host_arena_max_cached():
+    arena = HostArena(pinned=False, max_cached=8192)
+    bufs = [arena.allocate(4096) for _ in range(3)]
+    del bufs
+    stats = arena.statistics()
+    assert stats["releases"] == 3
+    assert stats["bytes-cached"] == 8192
+
+
+def test_arena_serializer_fallback(monkeypatch):
+    monkeypatch.setattr(host_arena, "host_arena", None)
+    header, frames = serialize(np.arange(10), serializers=("arena", "dask"))
+    assert header["serializer"] == "dask"
+
+    # Host objects aren't supported by the "cuda" serializer
+    monkeypatch.setattr(host_arena, "host_arena", HostArena(pinned=False))
+    header, frames = serialize(np.arange(10), serializers=("arena", "dask"))
+    assert header["serializer"] == "dask"
+    np.testing.assert_array_equal(deserialize(header, frames), np.arange(10))
+
+
+def test_arena_serializer_of_device_object(monkeypatch):
+    cupy = pytest.importorskip("cupy")
+    arena = HostArena()
+    monkeypatch.setattr(host_arena, "host_arena", arena)
+    x = cupy.arange(1000)
+    header, frames = serialize(x, serializers=("arena", "dask"))
+    assert header["serializer"] == "arena"
+    assert arena.statistics()["bytes-in-use"] >= x.nbytes
+    y = deserialize(header, frames)
+    assert isinstance(y, cupy.ndarray)
+    cupy.testing.assert_array_equal(x, y)
+    del frames
+    assert arena.statistics()["bytes-in-use"] == 0
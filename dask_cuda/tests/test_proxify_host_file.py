@@ -1,3 +1,6 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable
 
 import numpy as np
@@ -6,6 +9,7 @@ from pandas.testing import assert_frame_equal
 
 import dask
 import dask.dataframe
+import distributed.protocol
 from dask.dataframe.shuffle import shuffle_group
 from dask.sizeof import sizeof
 from distributed import Client
@@ -13,7 +17,14 @@ from distributed.client import wait
 from distributed.worker import get_worker
 
 import dask_cuda
+import dask_cuda.content_store
+import dask_cuda.disk_io
+import dask_cuda.host_arena
 import dask_cuda.proxify_device_objects
+import dask_cuda.proxify_host_file
+from dask_cuda.chunked_proxy_object import ChunkedProxyObject
+from dask_cuda.column_proxy_object import ColumnProxyObject
+from dask_cuda.eviction_policies import HINT_DEFAULT, HINT_NEEDED_SOON, HINT_NOT_NEEDED
 from dask_cuda.get_device_memory_objects import get_device_memory_objects
 from dask_cuda.proxify_host_file import ProxifyHostFile
 from dask_cuda.proxy_object import ProxyObject, asproxy
@@ -171,6 +182,482 @@ def test_one_item_host_limit():
     assert is_proxies_equal(dhf.manager._dev.get_proxies(), [k1])
 
 
+def test_background_spilling():
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes * 4,
+        memory_limit=10 ** 6,
+        background_spilling=True,
+        spill_high_watermark=0.5,
+        spill_low_watermark=0.25,
+    )
+    dhf["k1"] = one_item_array()
+    dhf["k2"] = one_item_array()
+    assert dhf.manager._dev.mem_usage() == one_item_nbytes * 2
+
+    # Exceeding the high watermark, makes the spill thread spill down to
+    # the low watermark while the device memory limit is never exceeded
+    dhf["k3"] = one_item_array()
+    deadline = time.monotonic() + 10
+    while dhf.manager._dev.mem_usage() > one_item_nbytes:
+        assert time.monotonic() < deadline, "spill thread didn't spill"
+        time.sleep(0.01)
+    dhf.manager.validate()
+    assert is_proxies_equal(dhf.manager._host.get_proxies(), [dhf["k1"], dhf["k2"]])
+    assert is_proxies_equal(dhf.manager._dev.get_proxies(), [dhf["k3"]])
+
+    with pytest.raises(ValueError, match="watermarks"):
+        ProxifyHostFile(
+            device_memory_limit=1,
+            memory_limit=1,
+            spill_high_watermark=0.5,
+            spill_low_watermark=0.6,
+        )
+
+
+@pytest.mark.parametrize("spill_workers", [1, 4])
+def test_spill_workers(spill_workers):
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes * 10,
+        memory_limit=10 ** 6,
+        spill_workers=spill_workers,
+    )
+    for i in range(10):
+        dhf[f"k{i}"] = one_item_array() + i
+    # Adding a large array spills all the others at once
+    dhf["large"] = cupy.arange(10)
+    dhf.manager.validate()
+    assert len(dhf.manager._host) == 10
+    assert is_proxies_equal(dhf.manager._dev.get_proxies(), [dhf["large"]])
+    for i in range(10):
+        assert dhf[f"k{i}"][0] == i
+    assert dhf.manager.spill_throughput()["device-to-host"] > 0
+
+
+def test_segment_store(tmp_path, monkeypatch):
+    store = dask_cuda.disk_io.SegmentStore(str(tmp_path), prefix="test")
+    monkeypatch.setattr(dask_cuda.disk_io, "segment_store", store)
+    memory_limit = sizeof(asproxy(one_item_array(), serializers=("dask", "pickle")))
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes,
+        memory_limit=memory_limit,
+        segment_store=True,
+    )
+    for i in range(10):
+        dhf[f"k{i}"] = one_item_array() + i
+    dhf.manager.validate()
+    assert len(dhf.manager._disk) == 8
+    assert len(store) == 8
+    assert len(store.segments()) == 1
+    for i in range(10):
+        assert dhf[f"k{i}"][0] == i
+    dhf.manager.validate()
+
+    # Deleting the keys removes the spilled data from the store
+    for i in range(10):
+        del dhf[f"k{i}"]
+    assert len(store) == 0
+
+
+def test_compressed_host_tier():
+    def item(i):
+        return cupy.full(10_000, i)
+
+    nbytes = item(0).nbytes
+    dhf = ProxifyHostFile(
+        device_memory_limit=nbytes,
+        memory_limit=nbytes * 1.5,
+        compressed_memory_limit=1500,
+        compressed_codec="zlib",
+    )
+    for i in range(6):
+        dhf[f"k{i}"] = item(i)
+    dhf.manager.validate()
+    assert len(dhf.manager._dev) == 1
+    assert len(dhf.manager._host) == 1
+    assert len(dhf.manager._compressed) == 2
+    assert len(dhf.manager._disk) == 2
+    assert 0 < dhf.manager._compressed.mem_usage() <= 1500
+    for p in dhf.manager._compressed.get_proxies():
+        assert p._pxy_get().serializer == "compressed"
+    for i in range(6):
+        assert (dhf[f"k{i}"] == i).all()
+    dhf.manager.validate()
+    assert dhf.manager.spill_throughput()["host-to-compressed"] > 0
+
+
+def test_deduplication(monkeypatch):
+    monkeypatch.setattr(ProxifyHostFile, "_spill_deduplication", False)
+    monkeypatch.setattr(dask_cuda.disk_io, "spilled_content", None)
+    size = sizeof(asproxy(one_item_array(), serializers=("dask", "pickle")))
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes, memory_limit=size * 2, deduplication=True,
+    )
+
+    # The frames are hashed without holding the locks of the manager
+    def content_hash(frames):
+        assert not dhf.manager.lock._is_owned()
+        assert not dhf.manager._host._lock._is_owned()
+        return dask_cuda.content_store.content_hash(frames)
+
+    monkeypatch.setattr(dask_cuda.proxify_host_file, "content_hash", content_hash)
+
+    # Only two distinct payloads, which fit in host memory when deduplicated
+    for i in range(10):
+        dhf[f"k{i}"] = one_item_array() + i % 2
+    dhf.manager.validate()
+    assert len(dhf.manager._dev) == 1
+    assert len(dhf.manager._host) == 9
+    assert len(dhf.manager._disk) == 0
+    assert dhf.manager._host.mem_usage() == size * 2
+
+    # Each distinct payload is written to disk once
+    while dhf.manager.force_evict_from_host():
+        pass
+    assert len(dhf.manager._disk) == 9
+    assert len(dask_cuda.disk_io.spilled_content) == 2
+    paths = {p._pxy_get().obj[0]["path"] for p in dhf.manager._disk.get_proxies()}
+    assert len(paths) == 2
+
+    for i in range(10):
+        assert dhf[f"k{i}"][0] == i % 2
+    dhf.manager.validate()
+    for i in range(10):
+        del dhf[f"k{i}"]
+    assert len(dask_cuda.disk_io.spilled_content) == 0
+    assert not any(os.path.exists(p) for p in paths)
+
+
+def test_deduplication_of_communicated_proxy(monkeypatch):
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes, memory_limit=10 ** 6, deduplication=True
+    )
+    dhf["k1"] = one_item_array() + 1
+    dhf["k2"] = one_item_array() + 2
+    k1 = dhf["k1"]
+    assert k1._pxy_get().serializer == "dask"
+
+    # Communicating a proxy that stays on the host doesn't hash its frames
+    hashed = []
+    monkeypatch.setattr(
+        dask_cuda.proxify_host_file, "content_hash", lambda f: hashed.append(f)
+    )
+    for _ in range(2):
+        distributed.protocol.serialize(k1, serializers=("dask",), on_error="raise")
+    assert hashed == []
+    assert "content_hash" not in k1._pxy_get().__dict__
+    assert len(dhf.manager._host._prepared) == 0
+    monkeypatch.undo()
+
+    # Unspilling releases the frames of the host tier
+    assert k1[0] == 1
+    assert k1._pxy_get().serializer is None
+    assert len(dhf.manager._host._prepared) == 0
+    assert len(dhf.manager._host._content) == 1  # Only the frames of "k2"
+    dhf.manager.validate()
+
+
+def test_host_arena(monkeypatch):
+    monkeypatch.setattr(dask_cuda.host_arena, "host_arena", None)
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes, memory_limit=10 ** 6, host_arena=True
+    )
+    arena = dask_cuda.host_arena.host_arena
+    for i in range(10):
+        dhf[f"k{i}"] = one_item_array() + i
+    dhf.manager.validate()
+    assert len(dhf.manager._host) == 9
+    for p in dhf.manager._host.get_proxies():
+        assert p._pxy_get().serializer == "arena"
+    assert arena.statistics()["allocations"] == 9
+
+    # Unspilling returns the buffers to the arena, which spilling reuses
+    for i in range(10):
+        assert dhf[f"k{i}"][0] == i
+    dhf.manager.validate()
+    stats = arena.statistics()
+    assert stats["releases"] > 0
+    assert stats["reuses"] > 0
+
+
+def test_promote():
+    host_size = sizeof(asproxy(one_item_array(), serializers=("dask", "pickle")))
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes * 2, memory_limit=host_size
+    )
+    for i in range(4):
+        dhf[f"k{i}"] = one_item_array() + i
+    dhf.manager.validate()
+    assert len(dhf.manager._dev) == 2
+    assert len(dhf.manager._host) == 1
+    assert len(dhf.manager._disk) == 1
+    k0, k1 = dhf["k0"], dhf["k1"]
+    assert k0._pxy_get().serializer == "disk"
+
+    # Promotion never evicts thus nothing is promoted when the tiers are full
+    assert dhf.manager.promote(k0) == 0
+    assert dhf.manager.promote(k1) == 0
+
+    del dhf["k2"], dhf["k3"]
+    assert dhf.manager.promote(k1) > 0
+    assert not k1._pxy_get().is_serialized()
+    assert dhf.manager.promote(k0) > 0
+    assert k0._pxy_get().serializer in ("dask", "pickle")
+    dhf.manager.validate()
+    assert k0[0] == 0 and k1[0] == 1
+    dhf.manager.validate()
+
+
+def test_prefetcher():
+    from types import SimpleNamespace
+
+    from dask_cuda.prefetch import Prefetcher
+
+    host_size = sizeof(asproxy(one_item_array(), serializers=("dask", "pickle")))
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes * 2, memory_limit=host_size * 2
+    )
+    for i in range(4):
+        dhf[f"k{i}"] = one_item_array() + i
+    del dhf["k2"], dhf["k3"]
+    assert len(dhf.manager._host) == 2
+
+    # A worker with a single ready task that depends on "k0"
+    worker = SimpleNamespace(
+        data=dhf,
+        ready=[(0, "task")],
+        constrained=[],
+        tasks={
+            "task": SimpleNamespace(
+                dependencies=[SimpleNamespace(key="k0"), SimpleNamespace(key="x")]
+            )
+        },
+    )
+    prefetcher = Prefetcher(worker, budget=10 ** 6, lookahead=2)
+    assert prefetcher.prefetch() == 1
+    prefetcher.close()
+    assert prefetcher.statistics()["promoted"] == 1
+    assert not dhf["k0"]._pxy_get().is_serialized()
+    assert dhf["k1"]._pxy_get().is_serialized()
+    dhf.manager.validate()
+
+
+def test_eviction_hints():
+    dhf = ProxifyHostFile(device_memory_limit=one_item_nbytes * 3, memory_limit=1000)
+    for key in ("soon", "peer", "far"):
+        dhf[key] = one_item_array()
+    dhf.set_eviction_hints(
+        {"soon": (1, (0,)), "peer": (0, None), "far": (2, (5,)), "unknown": (1, 0)},
+        horizon=(1,),
+    )
+    assert dhf["soon"]._pxy_get().eviction_hint == HINT_NEEDED_SOON
+    assert dhf["peer"]._pxy_get().eviction_hint == HINT_NOT_NEEDED
+    assert dhf["far"]._pxy_get().eviction_hint == HINT_DEFAULT
+
+    # Keys without pending dependents are spilled first and keys needed
+    # soon last, even though "soon" is the least recently accessed key
+    dhf["k1"] = one_item_array()
+    assert dhf["peer"]._pxy_get().is_serialized()
+    dhf["k2"] = one_item_array()
+    assert dhf["far"]._pxy_get().is_serialized()
+    dhf["k3"] = one_item_array()
+    assert not dhf["soon"]._pxy_get().is_serialized()
+    dhf.manager.validate()
+
+
+def test_pin():
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes * 3,
+        memory_limit=1000,
+        pin_limit=one_item_nbytes,
+    )
+    dhf["lut"] = one_item_array() + 42
+    for i in range(3):
+        dhf[f"k{i}"] = one_item_array() + i
+    assert dhf["lut"]._pxy_get().is_serialized()
+
+    # Pinning unspills and prevents spilling, even if the proxy detail is
+    # overwritten by a copy made before pinning
+    lut = dhf["lut"]
+    concurrent_copy = lut._pxy_get(copy=True)
+    dhf.manager.pin(p for p in [lut])
+    assert not lut._pxy_get().is_serialized()
+    concurrent_copy.obj = lut._pxy_get().obj
+    concurrent_copy.serializer = None
+    lut._pxy_set(concurrent_copy)
+    for i in range(3, 10):
+        dhf[f"k{i}"] = one_item_array() + i
+    dhf.manager.validate()
+    assert not dhf["lut"]._pxy_get().is_serialized()
+    assert dhf.manager._dev.mem_usage() <= one_item_nbytes * 3
+    with pytest.raises(ValueError, match="pin limit"):
+        dhf.pin("k9")
+
+    # Unpinning and deleting pinned keys release the pinned memory
+    dhf.manager.unpin(p for p in [lut])
+    assert dhf.manager._pinned_nbytes == 0
+    for i in range(10, 13):
+        dhf[f"k{i}"] = one_item_array() + i
+    assert dhf["lut"]._pxy_get().is_serialized()
+    dhf.pin("lut")
+    del dhf["lut"]
+    assert dhf.manager._pinned_nbytes == 0
+    assert dhf.pinned == {}
+    dhf.manager.validate()
+
+
+def test_idle_demotion():
+    # Keep the demotion thread from interfering with the test
+    with dask.config.set({"jit-unspill-idle-demotion-interval": "1h"}):
+        dhf = ProxifyHostFile(
+            device_memory_limit=one_item_nbytes * 10,
+            memory_limit=1000,
+            idle_demotion_age=0,
+            idle_demotion_host_age="1h",
+        )
+    dhf["k1"] = one_item_array()
+    dhf["k2"] = one_item_array() + 1
+    dhf.pin("k2")
+
+    # Idle proxies in device memory are spilled to host but pinned are not
+    dev_nbytes, host_nbytes = dhf.manager.demote_idle()
+    assert dev_nbytes == one_item_nbytes
+    assert host_nbytes == 0
+    assert dhf["k1"]._pxy_get().serializer in ("dask", "pickle")
+    assert not dhf["k2"]._pxy_get().is_serialized()
+    dhf.manager.validate()
+
+    # Proxies in host memory are younger than `idle_demotion_host_age`
+    assert dhf.manager.demote_idle() == (0, 0)
+    assert dhf["k1"]._pxy_get().serializer in ("dask", "pickle")
+
+
+def test_disk_quota(monkeypatch):
+    # The quota is process-wide, start with a new quota
+    monkeypatch.setattr(dask_cuda.disk_io, "disk_quota", None)
+    monkeypatch.setattr(dask_cuda.disk_io, "segment_store", None)
+    memory_limit = sizeof(asproxy(one_item_array(), serializers=("dask", "pickle")))
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes,
+        memory_limit=memory_limit,
+        disk_quota="1 MiB",
+    )
+    assert dhf.disk_quota.limit == 2 ** 20
+
+    # Other tests might still release data spilled to disk
+    start = dhf.disk_quota.usage()
+    dhf["k1"] = one_item_array() + 1
+    dhf["k2"] = one_item_array() + 2
+    dhf["k3"] = one_item_array() + 3
+    assert dhf["k1"]._pxy_get().serializer == "disk"
+
+    # Only leave room for one spilled item, spilling another keeps it in
+    # host memory beyond the host memory limit
+    nbytes = dhf.disk_quota.usage() - start
+    dhf.disk_quota.limit = start + int(nbytes * 1.5)
+    dhf["k4"] = one_item_array() + 4
+    assert dhf.manager.disk_quota_exhausted()
+    assert not dhf.fast  # Nothing the worker can spill to disk
+    assert is_proxies_equal(dhf.manager._disk.get_proxies(), [dhf["k1"]])
+    assert is_proxies_equal(dhf.manager._host.get_proxies(), [dhf["k2"], dhf["k3"]])
+    dhf.manager.validate()
+
+    # Accessing the keys on disk and in host memory never fails
+    for i in range(1, 5):
+        assert dhf[f"k{i}"][0] == i
+    dhf.manager.validate()
+
+    # Deleting the keys gives back the quota
+    for i in range(1, 5):
+        del dhf[f"k{i}"]
+    assert dhf.disk_quota.usage() == start
+
+
+@pytest.mark.parametrize("nthreads", [1, 4])
+def test_concurrent_access(nthreads):
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes * 4, memory_limit=one_item_nbytes * 8,
+    )
+
+    def task(i):
+        for j in range(50):
+            dhf[f"k{i}-{j % 5}"] = one_item_array() + j
+            x = dhf[f"k{i}-{j % 5}"]
+            dhf[f"out{i}"] = [x]  # Proxifying an existing proxy is an access
+            assert x[0] == j
+
+    # Calling `result()` re-raises errors, such as failed asserts, of the threads
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+        futures = [executor.submit(task, i) for i in range(nthreads)]
+        for f in futures:
+            f.result()
+    dhf.manager.validate()
+    assert len(dhf.manager) == nthreads * 5
+    assert dhf.manager._dev.mem_usage() <= one_item_nbytes * 4
+
+
+def test_spill_metrics():
+    memory_limit = sizeof(asproxy(one_item_array(), serializers=("dask", "pickle")))
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes, memory_limit=memory_limit
+    )
+    dhf["k1"] = one_item_array() + 1
+    dhf["k2"] = one_item_array() + 2
+    dhf["k3"] = one_item_array() + 3
+    assert (dhf["k1"] == 1).all()
+
+    snapshot = dhf.manager.metrics.snapshot()
+    transfers = snapshot["transfers"]
+    assert transfers["device-to-host"]["objects"] >= 2
+    assert transfers["device-to-host"]["bytes"] >= one_item_nbytes * 2
+    assert transfers["host-to-disk"]["objects"] >= 1
+    assert transfers["disk-to-device"]["objects"] == 1
+    assert snapshot["evictions"]["device"]["count"] >= 2
+    tallies = dhf.manager.tier_tallies()
+    assert tallies["device"] == (one_item_nbytes, 1, one_item_nbytes)
+    assert sum(n for _, n, _ in tallies.values()) == 3
+
+
+def test_spill_metrics_of_host_arena(monkeypatch):
+    monkeypatch.setattr(dask_cuda.host_arena, "host_arena", None)
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes, memory_limit=10 ** 6, host_arena=True
+    )
+    dhf["k1"] = one_item_array() + 1
+    dhf["k2"] = one_item_array() + 2
+    assert dhf["k1"]._pxy_get().serializer == "arena"
+    assert dhf["k1"][0] == 1
+
+    transfers = dhf.manager.metrics.snapshot()["transfers"]
+    assert transfers["device-to-host"]["objects"] >= 1
+    assert transfers["host-to-device"]["objects"] == 1
+    assert transfers["host-to-device"]["bytes"] >= one_item_nbytes
+
+
+@pytest.mark.parametrize("eviction_policy", ["lru", "lfu", "gds", "arc"])
+def test_eviction_policy(eviction_policy):
+    dhf = ProxifyHostFile(
+        device_memory_limit=one_item_nbytes * 2,
+        memory_limit=1000,
+        eviction_policy=eviction_policy,
+    )
+    dhf["hot"] = one_item_array() + 42
+    hot = dhf["hot"]
+    for i in range(3):
+        dhf[f"use-hot-{i}"] = [hot]  # Proxifying an existing proxy is an access
+    assert hot._pxy_get().access_count == 4
+    dhf["k1"] = one_item_array() + 1
+    dhf["k2"] = one_item_array() + 2
+    dhf.manager.validate()
+    if eviction_policy == "lru":
+        assert hot._pxy_get().is_serialized()
+    else:
+        # The other policies keep the frequently accessed proxy on the device
+        assert not hot._pxy_get().is_serialized()
+        assert dhf["k1"]._pxy_get().is_serialized()
+    assert hot[0] == 42 and dhf["k1"][0] == 1 and dhf["k2"][0] == 2
+    dhf.manager.validate()
+
+
 @pytest.mark.parametrize("jit_unspill", [True, False])
 def test_local_cuda_cluster(jit_unspill):
     """Testing spilling of a proxied cudf dataframe in a local cuda cluster"""
@@ -226,6 +713,102 @@ def test_dataframes_share_dev_mem():
     assert v2._pxy_get().is_serialized()
 
 
+def test_column_granular_spilling():
+    cudf = pytest.importorskip("cudf")
+
+    df = cudf.DataFrame({"a": range(10), "b": range(10)})
+    # The config is read when the ProxifyHostFile is created
+    with dask.config.set({"jit-unspill-column-granular": True}):
+        dhf = ProxifyHostFile(device_memory_limit=200, memory_limit=1000)
+    dhf["df"] = df
+    pxy = dhf["df"]
+    assert isinstance(pxy, ColumnProxyObject)
+    # The columns are tracked individually
+    assert len(dhf.manager) == 2
+    assert dhf.manager._dev.mem_usage() == 160
+    dhf.manager.validate()
+
+    # Exceeding the limit spills a single column
+    dhf["x"] = cupy.arange(10)
+    spilled = [p._pxy_get().is_serialized() for p in pxy._pxy_get_part_proxies()]
+    assert sorted(spilled) == [False, True]
+    assert pxy.dtypes.tolist() == df.dtypes.tolist()
+
+    # Accessing the spilled column only unspills that column
+    label = "a" if spilled[0] else "b"
+    assert pxy[label].to_pandas().equals(df[label].to_pandas())
+    dhf.manager.validate()
+    assert dhf.manager._dev.mem_usage() <= 200
+    assert_frame_equal(pxy.to_pandas(), df.to_pandas())
+
+
+def test_chunked_spilling():
+    dhf = ProxifyHostFile(device_memory_limit=2000, memory_limit=10000, chunk_size=80)
+    dhf["x"] = cupy.arange(100)  # 800 bytes split into 10 chunks
+    x = dhf["x"]
+    assert isinstance(x, ChunkedProxyObject)
+    assert len(dhf.manager) == 10
+    dhf.manager.validate()
+
+    # Exceeding the limit by 200 bytes only spills three chunks. Notice, "y"
+    # is larger than half of the limit thus it isn't chunked.
+    dhf["y"] = cupy.arange(175)
+    assert not isinstance(dhf["y"], ChunkedProxyObject)
+    spilled = [p._pxy_get().is_serialized() for p in x._pxy_get_part_proxies()]
+    assert sum(spilled) == 3
+    dhf.manager.validate()
+
+    # Slicing only unspills the chunks of the rows
+    assert int(x[:10].sum()) == sum(range(10))
+    assert not x._pxy_get_part_proxies()[0]._pxy_get().is_serialized()
+    assert dhf.manager._dev.mem_usage() <= 2000
+    dhf.manager.validate()
+
+
+def test_chunked_spilling_peak_memory():
+    """Chunking copies the rows, which never exceeds the device memory limit"""
+    pool = cupy.cuda.MemoryPool()
+    allocated = []
+
+    def malloc(nbytes):
+        allocated.append(nbytes)
+        return pool.malloc(nbytes)
+
+    def proxify_peak_memory(key, obj):
+        allocated.clear()
+        with cupy.cuda.using_allocator(malloc):
+            dhf[key] = obj
+        return obj.nbytes + sum(allocated)
+
+    dhf = ProxifyHostFile(device_memory_limit=1000, memory_limit=10000, chunk_size=80)
+    assert proxify_peak_memory("x", cupy.arange(50)) == 800
+    assert isinstance(dhf["x"], ChunkedProxyObject)
+    del dhf["x"]
+
+    # Chunking an object larger than half of the limit would exceed the limit
+    assert proxify_peak_memory("y", cupy.arange(100)) == 800
+    assert not isinstance(dhf["y"], ChunkedProxyObject)
+
+
+def test_dev_buffer_to_proxies():
+    x = cupy.arange(10)
+    dhf = ProxifyHostFile(device_memory_limit=1000, memory_limit=1000)
+    dhf["full"] = x
+    dhf["half"] = x[:5]
+    dhf["other"] = one_item_array()
+    dev_buf_to_proxies = dhf.manager.get_dev_buffer_to_proxies()
+    assert sorted(map(len, dev_buf_to_proxies.values())) == [1, 2]
+    dhf.manager.validate()
+
+    # The last access of a shared buffer is the latest access of its proxies
+    dhf["use-half"] = [dhf["half"]]
+    total, access_info = dhf.manager.get_dev_access_info()
+    assert total == x.nbytes + one_item_nbytes
+    last_access = {len(proxies): a for a, _, proxies in access_info}
+    assert last_access[2] == dhf["half"]._pxy_get().last_access
+    assert last_access[2] > last_access[1]
+
+
 def test_cudf_get_device_memory_objects():
     cudf = pytest.importorskip("cudf")
     objects = [
@@ -1,6 +1,8 @@
+import gc
 import operator
 import pickle
 import sys
+import weakref
 from types import SimpleNamespace
 
 import numpy as np
@@ -17,7 +19,9 @@ from distributed.protocol.serialize import deserialize, serialize
 import dask_cudf
 
 import dask_cuda
-from dask_cuda import proxy_object
+from dask_cuda import host_arena, proxy_object
+from dask_cuda.chunked_proxy_object import ChunkedProxyObject
+from dask_cuda.column_proxy_object import ColumnProxyObject
 from dask_cuda.proxify_device_objects import proxify_device_objects
 from dask_cuda.proxify_host_file import ProxifyHostFile
 
@@ -52,6 +56,26 @@ def test_proxy_object(serializers):
     assert org == proxy_object.unproxy(org)
 
 
+def test_proxy_object_compact_layout():
+    pxy = proxy_object.asproxy(np.arange(3))
+    assert proxy_object.ProxyObject.__dictoffset__ == 0  # No __dict__
+    assert proxy_object.ProxyObject.__basicsize__ < 100
+
+    # The caches are filled lazily
+    assert pxy._pxy_cache_sizeof is None
+    assert pxy.__sizeof__() == pxy._pxy_cache_sizeof
+
+    # A copy of the details includes extra attributes
+    detail = pxy._pxy_get()
+    detail.extra_attribute = 42
+    copy = pxy._pxy_get(copy=True)
+    assert copy is not detail
+    for name in proxy_object.ProxyDetail.__slots__:
+        if name != "__dict__":
+            assert getattr(copy, name) is getattr(detail, name)
+    assert copy.extra_attribute == 42
+
+
 class DummyObj:
     """Class that only "pickle" can serialize"""
 
@@ -233,6 +257,22 @@ def test_serialize_of_proxied_cudf(proxy_serializers, dask_serializers):
     assert_frame_equal(df.to_pandas(), pxy.to_pandas())
 
 
+@pytest.mark.parametrize("dask_serializers", [["dask"], ["cuda"]])
+def test_serialize_of_arena_proxy(monkeypatch, dask_serializers):
+    """Check that communicating an "arena" serialized proxy doesn't unspill it"""
+    cupy = pytest.importorskip("cupy")
+    monkeypatch.setattr(host_arena, "host_arena", None)
+    host_arena.register_host_arena(pinned=False)
+    org = cupy.arange(10)
+    pxy = proxy_object.asproxy(org, serializers=("arena",))
+    assert pxy._pxy_get().serializer == "arena"
+    header, frames = serialize(pxy, serializers=dask_serializers, on_error="raise")
+    assert pxy._pxy_get().serializer == "arena"
+    res = deserialize(header, frames)
+    assert res._pxy_get().serializer == "arena"
+    assert all(org == res)
+
+
 @pytest.mark.parametrize("backend", ["numpy", "cupy"])
 def test_fixed_attribute_length(backend):
     """Test fixed attribute `x.__len__` access
@@ -276,6 +316,229 @@ def test_fixed_attribute_name():
     assert pxy._pxy_get().is_serialized()
 
 
+@pytest.mark.parametrize("serializers", [("dask", "pickle"), ("disk",)])
+@pytest.mark.parametrize("backend", ["numpy", "cupy"])
+def test_fixed_attributes_of_array(serializers, backend):
+    """Test that the metadata of spilled arrays doesn't de-serialize"""
+    np = pytest.importorskip(backend)
+    org = np.arange(12, dtype="int32").reshape(3, 4)
+    pxy = proxy_object.asproxy(org, serializers=serializers)
+    assert pxy._pxy_get().is_serialized()
+    assert pxy.shape == (3, 4)
+    assert pxy.ndim == 2
+    assert pxy.dtype == np.dtype("int32")
+    assert pxy.size == 12
+    assert pxy.nbytes == 48
+    assert pxy.itemsize == 4
+    assert len(pxy) == 3
+    assert pxy._pxy_get().is_serialized()
+
+    # The metadata survives pickling of the proxy
+    pxy = pickle.loads(pickle.dumps(pxy))
+    assert pxy.shape == (3, 4)
+    assert pxy._pxy_get().is_serialized()
+
+
+@pytest.mark.parametrize("serializers", [("dask", "pickle"), ("disk",)])
+def test_fixed_attributes_of_dataframe(serializers):
+    """Test that the metadata of spilled dataframes doesn't de-serialize"""
+    df = pandas.DataFrame({"a": range(10), "b": [1.0] * 10})
+    pxy = proxy_object.asproxy(df, serializers=serializers)
+    assert pxy._pxy_get().is_serialized()
+    assert pxy.shape == (10, 2)
+    assert not pxy.empty
+    assert list(pxy.columns) == ["a", "b"]
+    assert_series_equal(pxy.dtypes, df.dtypes)
+    assert pxy.index.equals(df.index)
+    assert_frame_equal(dask.dataframe.utils.make_meta(pxy), df.iloc[:0])
+    assert pxy._pxy_get().is_serialized()
+
+    # Indexes that aren't range indexes aren't cached
+    df.index = list("abcdefghij")
+    pxy = proxy_object.asproxy(df, serializers=serializers)
+    assert pxy.index.equals(df.index)
+    assert not pxy._pxy_get().is_serialized()
+
+
+def test_fixed_attributes_of_dataframe_are_standalone():
+    """Test that the metadata of a spilled dataframe doesn't keep its data alive"""
+    a = np.arange(20.0).reshape(10, 2)
+    ref = weakref.ref(a)
+    df = pandas.DataFrame(a, columns=["a", "b"], copy=False)
+    pxy = proxy_object.asproxy(df, serializers=("disk",))
+    del a, df
+    gc.collect()
+    assert ref() is None
+    assert list(pxy.columns) == ["a", "b"]
+    assert dask.dataframe.utils.make_meta(pxy).empty
+    assert pxy._pxy_get().is_serialized()
+
+
+def test_fixed_attributes_after_mutation():
+    """Test that the metadata is captured when the proxied object is spilled"""
+    df = pandas.DataFrame({"a": range(10)})
+    pxy = proxy_object.asproxy(df)
+    pxy["b"] = 1.0
+    pxy._pxy_serialize(serializers=("dask", "pickle"))
+    assert list(pxy.columns) == ["a", "b"]
+    assert list(dask.dataframe.utils.make_meta(pxy).columns) == ["a", "b"]
+    assert pxy._pxy_get().is_serialized()
+
+
+def test_column_proxy_object():
+    """Test that only the accessed columns are deserialized"""
+    df = pandas.DataFrame({"a": range(10), "b": [1.0] * 10, "c": list("abcdefghij")})
+    pxy = proxy_object.asproxy(
+        df, serializers=("dask", "pickle"), subclass=ColumnProxyObject
+    )
+    proxies = pxy._pxy_get_part_proxies()
+
+    def serialized():
+        return [p._pxy_get().is_serialized() for p in proxies]
+
+    assert isinstance(pxy, pandas.DataFrame)
+    assert list(pxy) == ["a", "b", "c"]
+    assert "a" in pxy
+    assert pxy.shape == (10, 3)
+    assert len(pxy) == 10
+    assert_series_equal(pxy.dtypes, df.dtypes)
+    assert_frame_equal(dask.dataframe.utils.make_meta(pxy), df.iloc[:0])
+    assert serialized() == [True, True, True]
+
+    assert_series_equal(pxy["a"], df["a"])
+    assert serialized() == [False, True, True]
+    assert_frame_equal(pxy[["a", "b"]], df[["a", "b"]])
+    assert serialized() == [False, False, True]
+    assert_frame_equal(proxy_object.unproxy(pxy), df)
+    assert serialized() == [False, False, False]
+
+    with pytest.raises(ValueError, match="Cannot split"):
+        proxy_object.asproxy(df["a"], subclass=ColumnProxyObject)
+
+
+@pytest.mark.parametrize("serializers", [None, ("dask", "pickle")])
+def test_column_proxy_object_serialization(serializers):
+    df = pandas.DataFrame({"a": range(10), "b": [1.0] * 10})
+    pxy = proxy_object.asproxy(df, serializers=serializers, subclass=ColumnProxyObject)
+
+    res = pickle.loads(pickle.dumps(pxy))
+    assert isinstance(res, ColumnProxyObject)
+    assert_frame_equal(proxy_object.unproxy(res), df)
+
+    res = deserialize(*serialize(pxy, serializers=("dask", "pickle")))
+    assert isinstance(res, ColumnProxyObject)
+    assert_frame_equal(proxy_object.unproxy(res), df)
+
+
+def test_column_proxy_object_assignments():
+    df = pandas.DataFrame({"a": range(10), "b": [1.0] * 10})
+    pxy = proxy_object.asproxy(df.copy(), subclass=ColumnProxyObject)
+    pxy["c"] = 42
+    df["c"] = 42
+    assert_frame_equal(proxy_object.unproxy(pxy), df)
+    del pxy["a"]
+    del df["a"]
+    assert_frame_equal(proxy_object.unproxy(pxy), df)
+    pxy.columns = df.columns = ["x", "y"]
+    assert_frame_equal(proxy_object.unproxy(pxy), df)
+    assert pxy.x.sum() == 10.0
+    with pytest.raises(ValueError, match="unsplittable"):
+        del pxy["x"], pxy["y"]
+
+
+@pytest.mark.parametrize("backend", ["numpy", "cupy"])
+def test_chunked_proxy_object_of_array(backend):
+    """Test that slicing only deserializes the chunks of the rows"""
+    np = pytest.importorskip(backend)
+    org = np.arange(1000)
+    with dask.config.set({"jit-unspill-chunk-size": 800}):
+        pxy = proxy_object.asproxy(
+            org, serializers=("dask", "pickle"), subclass=ChunkedProxyObject
+        )
+    proxies = pxy._pxy_get_part_proxies()
+
+    def serialized():
+        return [p._pxy_get().is_serialized() for p in proxies]
+
+    assert len(proxies) == 10
+    assert pxy.shape == org.shape
+    assert pxy.dtype == org.dtype
+    assert pxy.nbytes == org.nbytes
+    assert len(pxy) == len(org)
+    assert all(serialized())
+
+    assert int(pxy[150:250].sum()) == int(org[150:250].sum())
+    assert serialized() == [True, False, False] + [True] * 7
+    assert int(pxy[-1]) == 999
+    assert len(pxy[1000:]) == 0
+    assert all(proxy_object.unproxy(pxy) == org)
+
+    # Assigning rows only unspills and modifies the chunks of the rows
+    org = org.copy()
+    pxy._pxy_serialize(serializers=("dask", "pickle"))
+    pxy[150:250] = -1
+    org[150:250] = -1
+    pxy[-1] = -2
+    org[-1] = -2
+    assert serialized() == [True, False, False] + [True] * 6 + [False]
+    pxy[300:400] = np.arange(100)
+    org[300:400] = np.arange(100)
+    assert pxy._pxy_get_part_proxies() == proxies
+    assert all(proxy_object.unproxy(pxy) == org)
+
+    # Other assignments assemble and split into chunks of the same size
+    pxy[::2] = 0
+    org[::2] = 0
+    assert len(pxy._pxy_get_part_proxies()) == 10
+    assert all(proxy_object.unproxy(pxy) == org)
+
+    # Indexing the other dimensions
+    org = np.arange(24).reshape(12, 2)
+    with dask.config.set({"jit-unspill-chunk-size": 32}):
+        pxy = proxy_object.asproxy(org, subclass=ChunkedProxyObject)
+    assert all(pxy[3:7, 1] == org[3:7, 1])
+    assert int(pxy[5, 1]) == int(org[5, 1])
+    assert pxy[::2].shape == org[::2].shape
+    org = org.copy()
+    pxy[3:7, 1] = -1
+    org[3:7, 1] = -1
+    pxy[2:9] = np.arange(2)
+    org[2:9] = np.arange(2)
+    assert (proxy_object.unproxy(pxy) == org).all()
+
+
+def test_chunked_proxy_object_of_dataframe():
+    df = pandas.DataFrame({"a": range(100), "b": [1.0] * 100})
+    with dask.config.set({"jit-unspill-chunk-size": 400}):
+        pxy = proxy_object.asproxy(
+            df, serializers=("dask", "pickle"), subclass=ChunkedProxyObject
+        )
+    proxies = pxy._pxy_get_part_proxies()
+    assert len(proxies) > 1
+    assert pxy.shape == df.shape
+    assert list(pxy.columns) == ["a", "b"]
+    assert_frame_equal(dask.dataframe.utils.make_meta(pxy), df.iloc[:0])
+    assert all(p._pxy_get().is_serialized() for p in proxies)
+
+    assert_frame_equal(pxy.iloc[30:33], df.iloc[30:33])
+    assert sum(not p._pxy_get().is_serialized() for p in proxies) == 1
+    assert pxy.iloc[40, 1] == df.iloc[40, 1]
+    assert_frame_equal(proxy_object.unproxy(pxy), df)
+
+    res = pickle.loads(pickle.dumps(pxy))
+    assert isinstance(res, ChunkedProxyObject)
+    assert_frame_equal(proxy_object.unproxy(res), df)
+    res = deserialize(*serialize(pxy, serializers=("dask", "pickle")))
+    assert isinstance(res, ChunkedProxyObject)
+    assert_frame_equal(proxy_object.unproxy(res), df)
+
+    # Assigning a column keeps the number of chunks
+    nchunks = len(proxies)
+    pxy["c"] = 2
+    assert len(pxy._pxy_get_part_proxies()) == nchunks
+    assert_frame_equal(proxy_object.unproxy(pxy), df.assign(c=2))
+
+
 @pytest.mark.parametrize("jit_unspill", [True, False])
 def test_spilling_local_cuda_cluster(jit_unspill):
     """Testing spilling of a proxied cudf dataframe in a local cuda cluster"""
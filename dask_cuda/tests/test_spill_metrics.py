@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+from dask_cuda.proxify_host_file import ProxifyHostFile
+from dask_cuda.spill_metrics import (
+    LATENCY_BUCKETS,
+    Histogram,
+    SpillMetrics,
+    SpillMetricsCollector,
+)
+
+
+def test_histogram():
+    hist = Histogram(bounds=(1, 10, math.inf))
+    for value in (0.5, 1, 5, 100):
+        hist.observe(value)
+    assert hist.counts == [2, 1, 1]
+    assert hist.cumulative_counts() == [2, 3, 4]
+    assert hist.count == 4
+    assert hist.sum == 106.5
+
+
+def test_spill_metrics():
+    metrics = SpillMetrics()
+    metrics.record_transfer("device-to-host", 100, 0.002)
+    metrics.record_transfer("device-to-host", 200, 0.003)
+    metrics.record_eviction("device", 0.006)
+    snapshot = metrics.snapshot()
+    assert snapshot["transfers"] == {
+        "device-to-host": {
+            "bytes": 300,
+            "objects": 2,
+            "seconds": pytest.approx(0.005),
+            "max-bucket-seconds": 0.005,
+        }
+    }
+    assert snapshot["evictions"] == {
+        "device": {"count": 1, "seconds": pytest.approx(0.006)}
+    }
+    assert len(metrics.transfer_latency["device-to-host"].counts) == len(
+        LATENCY_BUCKETS
+    )
+
+
+def test_prometheus_collector():
+    pytest.importorskip("prometheus_client")
+    from prometheus_client import CollectorRegistry, generate_latest
+
+    class Worker:
+        address = "tcp://127.0.0.1:1234"
+
+        def __init__(self, data):
+            self.data = data
+
+    dhf = ProxifyHostFile(device_memory_limit=1000, memory_limit=2000)
+    dhf.manager.metrics.record_transfer("host-to-disk", 100, 0.01)
+    dhf.manager.metrics.record_eviction("host", 0.01)
+    worker = Worker(dhf)
+    collector = SpillMetricsCollector()
+    collector.add_worker(worker)
+    collector.add_worker(Worker({}))  # Not using JIT-unspill, is skipped
+    registry = CollectorRegistry()
+    registry.register(collector)
+
+    text = generate_latest(registry).decode()
+    labels = 'direction="host-to-disk",worker="tcp://127.0.0.1:1234"'
+    assert f"dask_worker_jit_unspill_transferred_bytes_total{{{labels}}} 100.0" in text
+    assert "dask_worker_jit_unspill_eviction_duration_seconds_count" in text
+    assert (
+        'dask_worker_jit_unspill_memory_limit_bytes{tier="host",'
+        'worker="tcp://127.0.0.1:1234"} 2000.0' in text
+    )
@@ -0,0 +1,67 @@
+import pickle
+import threading
+
+import numpy as np
+
+from distributed.protocol.serialize import deserialize, serialize
+
+from dask_cuda.proxy_object import asproxy
+from dask_cuda.type_registry import TypeRegistry, type_registry
+
+
+class LocalType:
+    pass
+
+
+def test_type_registry():
+    registry = TypeRegistry()
+    i = registry.type_id(LocalType)
+    assert registry.type_id(LocalType) == i
+    assert registry.type_id(int) != i
+    assert registry.get_type(i) is LocalType
+    assert registry.get_typename(i) == f"{__name__}.LocalType"
+    assert len(registry) == 2
+
+    serialized = registry.get_serialized(i)
+    assert pickle.loads(serialized) is LocalType
+    assert registry.get_serialized(i) is serialized  # Pickled once
+    assert registry.type_id_from_serialized(serialized) == i
+
+    # A pickled type from another process is registered
+    other = TypeRegistry()
+    assert other.get_type(other.type_id_from_serialized(serialized)) is LocalType
+
+
+def test_type_registry_concurrent():
+    registry = TypeRegistry()
+    types = [type(f"T{i}", (), {}) for i in range(100)]
+    ids = [{} for _ in range(4)]
+
+    def register(out):
+        for t in types:
+            out[t] = registry.type_id(t)
+
+    threads = [threading.Thread(target=register, args=(out,)) for out in ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(out == ids[0] for out in ids)
+    assert sorted(ids[0].values()) == list(range(100))
+
+
+def test_proxy_type_id():
+    pxy = asproxy(np.arange(3))
+    type_id = pxy._pxy_get().type_id
+    assert type_registry.get_type(type_id) is np.ndarray
+    assert pxy.__class__ is np.ndarray
+
+    header, frames = serialize(pxy, serializers=("dask", "pickle"))
+    assert header["proxied-type"] == type_registry.get_serialized(type_id)
+    res = deserialize(header, frames)
+    assert res._pxy_get().type_id == type_id
+    assert isinstance(res, np.ndarray)
+
+    res = pickle.loads(pickle.dumps(pxy))
+    assert res._pxy_get().type_id == type_id
+    assert (res == np.arange(3)).all()
@@ -1,9 +1,15 @@
 import os
+from types import SimpleNamespace
 
 import pytest
 from numba import cuda
 
+import dask
+
+from dask_cuda.disk_io import DiskQuota
 from dask_cuda.utils import (
+    DiskQuotaBackpressure,
+    JITUnspillEvictionHints,
     _ucx_111,
     cuda_visible_devices,
     get_cpu_affinity,
@@ -16,6 +22,7 @@ from dask_cuda.utils import (
     nvml_device_index,
     parse_cuda_visible_device,
     parse_device_memory_limit,
+    parse_pin_limit,
     unpack_bitmask,
 )
 
@@ -251,6 +258,107 @@ def test_parse_device_memory_limit():
     assert parse_device_memory_limit("1GB") == 1000000000
 
 
+def test_parse_pin_limit():
+    assert parse_pin_limit(0.5, 1000) == 500
+    assert parse_pin_limit(1000, 10) == 1000
+    assert parse_pin_limit("1kB", 10) == 1000
+    assert parse_pin_limit(None, 1000) == 250
+    with dask.config.set({"device-pin-limit": "2kB"}):
+        assert parse_pin_limit(None, 1000) == 2000
+
+
+def test_disk_quota_backpressure():
+    quota = DiskQuota(100)
+    rss = [0]
+    worker = SimpleNamespace(
+        data=SimpleNamespace(disk_quota=quota),
+        paused=False,
+        memory_pause_fraction=0.8,
+        memory_limit=100,
+        monitor=SimpleNamespace(
+            proc=SimpleNamespace(memory_info=lambda: SimpleNamespace(rss=rss[0]))
+        ),
+        ensure_computing=lambda: None,
+    )
+    plugin = DiskQuotaBackpressure(pause_fraction=0.5)
+    plugin.worker = worker
+
+    quota.acquire(60)
+    plugin.check()
+    assert worker.paused
+
+    # The worker isn't re-paused after being resumed by the memory monitor
+    worker.paused = False
+    plugin.check()
+    assert not worker.paused
+
+    # The worker isn't resumed if it was paused by the memory monitor
+    quota.release(60)
+    plugin.check()
+    quota.acquire(60)
+    worker.paused = True
+    plugin.check()
+    quota.release(60)
+    plugin.check()
+    assert worker.paused
+
+    # nor if the host memory is above the worker's pause fraction
+    worker.paused = False
+    quota.acquire(60)
+    plugin.check()
+    assert worker.paused
+    rss[0] = 90
+    quota.release(60)
+    plugin.check()
+    assert worker.paused
+
+    # Otherwise, the worker is resumed
+    rss[0] = 0
+    worker.paused = False
+    quota.acquire(60)
+    plugin.check()
+    assert worker.paused
+    quota.release(60)
+    plugin.check()
+    assert not worker.paused
+
+
+def test_jit_unspill_eviction_hints():
+    t1 = SimpleNamespace(key="t1", state="ready", priority=(1,), dependencies=[])
+    t2 = SimpleNamespace(key="t2", state="ready", priority=(2,), dependencies=[])
+    a = SimpleNamespace(key="a", dependents=[t1, t2], dependencies=[])
+    b = SimpleNamespace(key="b", dependents=[t2], dependencies=[])
+    t1.dependencies = [a]
+    t2.dependencies = [a, b]
+    worker = SimpleNamespace(
+        data={"a": None, "b": None},
+        ready=[((1,), "t1"), ((2,), "t2")],
+        tasks={"a": a, "b": b, "t1": t1, "t2": t2},
+    )
+    plugin = JITUnspillEvictionHints(lookahead=1)
+    plugin.worker = worker
+    plugin.transition("a", "executing", "memory")
+    plugin.transition("b", "executing", "memory")
+    assert plugin.hints() == ({"a": (2, (1,)), "b": (1, (2,))}, (1,))
+    assert plugin.hints() == ({}, (1,))
+
+    # Only the dependencies of a transitioned task are updated
+    t1.state = "memory"
+    worker.ready = [((2,), "t2")]
+    plugin.transition("t1", "executing", "memory")
+    assert plugin.hints() == ({"a": (1, (2,)), "b": (1, (2,))}, (2,))
+
+    # Keys that don't run soon anymore are updated
+    worker.ready = [((0,), "t0"), ((2,), "t2")]
+    assert plugin.hints() == ({"a": (1, (2,)), "b": (1, (2,))}, (0,))
+
+    # Keys removed from memory are forgotten
+    del worker.data["a"]
+    plugin.transition("a", "memory", "released")
+    assert plugin.hints() == ({}, (0,))
+    assert "a" not in plugin._summaries
+
+
 def test_parse_visible_mig_devices():
     pynvml = pytest.importorskip("pynvml")
     pynvml.nvmlInit()
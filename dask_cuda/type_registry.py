@@ -0,0 +1,77 @@
+import pickle
+import sys
+import threading
+from typing import Dict, List, Optional
+
+import dask.utils
+
+
+class TypeRegistry:
+    """Process-wide registry that assigns a small integer ID to each type
+
+    Proxies store the ID of the type of the proxied object instead of the
+    pickled type. The pickled type is only created when a proxy of the type is
+    serialized, and at most once per type. Pickled types received from other
+    processes are unpickled at most once per type.
+
+    This class is threadsafe
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._types: List[type] = []
+        self._typenames: List[str] = []
+        self._serialized: List[Optional[bytes]] = []
+        self._type_to_id: Dict[type, int] = {}
+        self._serialized_to_id: Dict[bytes, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def type_id(self, typ: type) -> int:
+        """Return the ID of `typ`, which is registered if new"""
+        try:
+            return self._type_to_id[typ]
+        except KeyError:
+            pass
+        with self._lock:
+            if typ not in self._type_to_id:
+                # Notice, the ID is published last since lookups are lock-free
+                self._types.append(typ)
+                self._typenames.append(sys.intern(dask.utils.typename(typ)))
+                self._serialized.append(None)
+                self._type_to_id[typ] = len(self._types) - 1
+            return self._type_to_id[typ]
+
+    def type_id_from_serialized(self, serialized: bytes) -> int:
+        """Return the ID of the pickled type `serialized`, which is registered if new"""
+        try:
+            return self._serialized_to_id[serialized]
+        except KeyError:
+            pass
+        type_id = self.type_id(pickle.loads(serialized))
+        with self._lock:
+            self._serialized_to_id[serialized] = type_id
+        return type_id
+
+    def get_type(self, type_id: int) -> type:
+        """Return the type of `type_id`"""
+        return self._types[type_id]
+
+    def get_typename(self, type_id: int) -> str:
+        """Return the name of the type of `type_id`, see `dask.utils.typename()`"""
+        return self._typenames[type_id]
+
+    def get_serialized(self, type_id: int) -> bytes:
+        """Return the pickled type of `type_id`"""
+        ret = self._serialized[type_id]
+        if ret is None:
+            ret = pickle.dumps(self._types[type_id])
+            with self._lock:
+                self._serialized[type_id] = ret
+                self._serialized_to_id.setdefault(ret, type_id)
+        return ret
+
+
+# The registry used by all proxies of this process
+type_registry = TypeRegistry()
@@ -1,3 +1,6 @@
+import heapq
+import itertools
+import logging
 import math
 import os
 import time
@@ -8,8 +11,10 @@ from multiprocessing import cpu_count
 import numpy as np
 import pynvml
 import toolz
+from tornado.ioloop import PeriodicCallback
 
-from dask.utils import parse_bytes
+import dask
+from dask.utils import format_bytes, parse_bytes, parse_timedelta
 from distributed import Worker, wait
 
 try:
@@ -76,6 +81,425 @@ class RMMSetup:
             )
 
 
+class JITUnspillMetrics:
+    """Export the spill metrics of JIT-unspill workers as Prometheus metrics
+
+    Does nothing if prometheus_client isn't installed. Workers that don't
+    use JIT-unspill are skipped when the metrics are collected.
+    """
+
+    def setup(self, worker=None):
+        from .spill_metrics import register_prometheus_metrics
+
+        register_prometheus_metrics(worker)
+
+
+class JITUnspillPrefetch:
+    """Unspill the dependencies of the next tasks of JIT-unspill workers ahead of use
+
+    Does nothing on workers that don't use JIT-unspill, see ``prefetch.Prefetcher``.
+
+    Parameters
+    ----------
+    enabled: bool or None, default None
+        Whether to prefetch. If ``None``, the "jit-unspill-prefetch" config value
+        are used, which defaults to False.
+    budget: int or str or None, default None
+        Maximum number of bytes being prefetched at any time. If ``None``, the
+        "jit-unspill-prefetch-budget" config value are used, which defaults to
+        "1 GiB".
+    lookahead: int or None, default None
+        Number of ready tasks to prefetch the dependencies of. If ``None``, the
+        "jit-unspill-prefetch-lookahead" config value are used, which defaults
+        to twice the number of threads of the worker.
+    interval: str or float or None, default None
+        Interval between prefetching besides when tasks become ready. If ``None``,
+        the "jit-unspill-prefetch-interval" config value are used, which defaults
+        to "100ms".
+    """
+
+    name = "jit-unspill-prefetch"
+
+    def __init__(self, enabled=None, budget=None, lookahead=None, interval=None):
+        self.enabled = enabled
+        self.budget = budget
+        self.lookahead = lookahead
+        self.interval = interval
+        self.prefetcher = None
+        self._loop = None
+        self._scheduled = False
+
+    def setup(self, worker=None):
+        from .proxify_host_file import ProxifyHostFile
+
+        enabled = self.enabled
+        if enabled is None:
+            enabled = dask.config.get("jit-unspill-prefetch", default=False)
+        if not enabled or not isinstance(worker.data, ProxifyHostFile):
+            return
+
+        from .prefetch import Prefetcher
+
+        budget = self.budget
+        if budget is None:
+            budget = dask.config.get("jit-unspill-prefetch-budget", default="1 GiB")
+        lookahead = self.lookahead
+        if lookahead is None:
+            lookahead = dask.config.get(
+                "jit-unspill-prefetch-lookahead", default=2 * worker.nthreads
+            )
+        interval = self.interval
+        if interval is None:
+            interval = dask.config.get("jit-unspill-prefetch-interval", default="100ms")
+        self.prefetcher = Prefetcher(
+            worker, budget=parse_bytes(budget), lookahead=int(lookahead)
+        )
+        self._loop = worker.loop
+        pc = PeriodicCallback(
+            self.prefetcher.prefetch, parse_timedelta(interval, default="ms") * 1000
+        )
+        worker.periodic_callbacks[self.name] = pc
+        pc.start()
+
+    def transition(self, key, start, finish, **kwargs):
+        # Prefetch as soon as tasks become ready, coalescing transitions that
+        # happen in the same event loop iteration
+        if self.prefetcher is None or finish != "ready" or self._scheduled:
+            return
+        self._scheduled = True
+        self._loop.add_callback(self._prefetch)
+
+    def _prefetch(self):
+        self._scheduled = False
+        self.prefetcher.prefetch()
+
+    def teardown(self, worker=None):
+        if self.prefetcher is not None:
+            pc = worker.periodic_callbacks.pop(self.name, None)
+            if pc is not None:
+                pc.stop()
+            self.prefetcher.close()
+
+
+class JITUnspillEvictionHints:
+    """Give JIT-unspill workers eviction hints derived from their task states
+
+    Periodically, the number of pending dependents of each key in memory and
+    the priority of its dependent that runs first are passed to
+    ``ProxifyHostFile.set_eviction_hints()``. This way, keys only held for
+    transfer to peers are spilled first and keys needed by the next tasks to
+    run are spilled last. Does nothing on workers that don't use JIT-unspill.
+
+    The hints are updated incrementally: a task transition marks the task and
+    its dependencies as changed, and only the changed keys and the keys whose
+    first dependent crossed the horizon of the tasks that run soon are passed
+    on, which doesn't require a walk of all keys and their dependents.
+
+    Parameters
+    ----------
+    enabled: bool or None, default None
+        Whether to give hints. If ``None``, the "jit-unspill-eviction-hints"
+        config value are used, which defaults to False.
+    lookahead: int or None, default None
+        Number of ready tasks, in priority order, that run soon. If ``None``,
+        the "jit-unspill-eviction-hints-lookahead" config value are used, which
+        defaults to twice the number of threads of the worker.
+    interval: str or float or None, default None
+        Interval between hint updates. If ``None``, the
+        "jit-unspill-eviction-hints-interval" config value are used, which
+        defaults to "100ms".
+    """
+
+    name = "jit-unspill-eviction-hints"
+
+    # States of tasks that haven't used their dependencies yet
+    pending_states = ("waiting", "ready", "constrained", "executing")
+
+    def __init__(self, enabled=None, lookahead=None, interval=None):
+        self.enabled = enabled
+        self.lookahead = lookahead
+        self.interval = interval
+        self.worker = None
+        # Keys with changed dependents, and the number of pending dependents
+        # and the priority of the first dependent of the keys in memory
+        self._changed = set()
+        self._summaries = {}
+        # Heap of (priority, counter, key) of the keys that don't run soon
+        # and the keys that do
+        self._later = []
+        self._soon = set()
+        self._counter = itertools.count()
+
+    def setup(self, worker=None):
+        from .proxify_host_file import ProxifyHostFile
+
+        enabled = self.enabled
+        if enabled is None:
+            enabled = dask.config.get("jit-unspill-eviction-hints", default=False)
+        if not enabled or not isinstance(worker.data, ProxifyHostFile):
+            return
+
+        lookahead = self.lookahead
+        if lookahead is None:
+            lookahead = dask.config.get(
+                "jit-unspill-eviction-hints-lookahead", default=2 * worker.nthreads
+            )
+        interval = self.interval
+        if interval is None:
+            interval = dask.config.get(
+                "jit-unspill-eviction-hints-interval", default="100ms"
+            )
+        self.lookahead = int(lookahead)
+        self.worker = worker
+        pc = PeriodicCallback(
+            self.update, parse_timedelta(interval, default="ms") * 1000
+        )
+        worker.periodic_callbacks[self.name] = pc
+        pc.start()
+
+    def transition(self, key, start, finish, **kwargs):
+        if self.worker is None:
+            return
+        self._changed.add(key)
+        ts = self.worker.tasks.get(key)
+        if ts is not None:
+            self._changed.update(d.key for d in ts.dependencies)
+
+    def _summarize(self, key):
+        """Return the number of pending dependents and the first priority of `key`
+
+        Returns None if `key` isn't in memory.
+        """
+        ts = self.worker.tasks.get(key)
+        if ts is None or key not in self.worker.data:
+            return None
+        pending = [d for d in ts.dependents if d.state in self.pending_states]
+        priorities = [d.priority for d in pending if d.priority is not None]
+        return len(pending), min(priorities) if priorities else None
+
+    def _push_later(self, key, priority):
+        if priority is not None:
+            heapq.heappush(self._later, (priority, next(self._counter), key))
+
+    def hints(self):
+        """Return the hints that changed since the last call and the horizon
+
+        See ``ProxifyHostFile.set_eviction_hints()``.
+        """
+        worker = self.worker
+        ready = heapq.nsmallest(self.lookahead, worker.ready)
+        horizon = ready[-1][0] if ready else None
+        ret = {}
+        changed, self._changed = self._changed, set()
+        for key in changed:
+            self._soon.discard(key)
+            summary = self._summarize(key)
+            if summary is None:
+                self._summaries.pop(key, None)
+                continue
+            self._summaries[key] = ret[key] = summary
+            self._push_later(key, summary[1])
+
+        # Keys that don't run soon anymore
+        for key in list(self._soon):
+            priority = self._summaries[key][1]
+            if horizon is None or priority > horizon:
+                self._soon.remove(key)
+                ret[key] = self._summaries[key]
+                self._push_later(key, priority)
+
+        # Keys that run soon now, outdated heap entries are discarded
+        while horizon is not None and self._later and self._later[0][0] <= horizon:
+            priority, _, key = heapq.heappop(self._later)
+            summary = self._summaries.get(key)
+            if summary is None or summary[1] != priority or key in self._soon:
+                continue
+            self._soon.add(key)
+            ret[key] = summary
+        if len(self._later) > 2 * len(self._summaries) + 64:
+            # Too many outdated heap entries, rebuild the heap
+            self._later = [
+                (priority, next(self._counter), key)
+                for key, (_, priority) in self._summaries.items()
+                if priority is not None and key not in self._soon
+            ]
+            heapq.heapify(self._later)
+        return ret, horizon
+
+    def update(self):
+        hints, horizon = self.hints()
+        self.worker.data.set_eviction_hints(hints, horizon)
+
+    def teardown(self, worker=None):
+        if self.worker is not None:
+            pc = worker.periodic_callbacks.pop(self.name, None)
+            if pc is not None:
+                pc.stop()
+
+
+class DiskQuotaBackpressure:
+    """Pause task execution on workers running out of their disk spill quota
+
+    Periodically, the fraction of the disk quota of the data store in use, see
+    ``disk_io.DiskQuota``, is compared to `pause_fraction`. Above it, the worker
+    is paused, like Distributed's memory monitor does when the process memory
+    exceeds "distributed.worker.memory.pause", so tasks already running can
+    complete and data can be released or fetched by peers. Once back below, the
+    worker is resumed unless it was paused by the memory monitor.
+
+    Like the memory monitor, the worker is only paused when crossing
+    `pause_fraction` and not at every check, thus the memory monitor might
+    resume the worker in the meantime. Does nothing on workers without a
+    limited disk quota.
+
+    Parameters
+    ----------
+    pause_fraction: float or None, default None
+        Fraction of the disk quota above which the worker is paused. If ``None``,
+        the "disk-spill-quota-pause" config value are used, which defaults to 0.9.
+    interval: str or float or None, default None
+        Interval between checks. If ``None``, the "disk-spill-quota-interval"
+        config value are used, which defaults to "100ms".
+    """
+
+    name = "disk-spill-quota"
+
+    def __init__(self, pause_fraction=None, interval=None):
+        self.pause_fraction = pause_fraction
+        self.interval = interval
+        self.worker = None
+        # Whether the disk quota is above `pause_fraction` and whether this
+        # plugin is the one that paused the worker
+        self.paused = False
+        self.paused_worker = False
+
+    def setup(self, worker=None):
+        quota = getattr(worker.data, "disk_quota", None)
+        if quota is None or quota.limit is None:
+            return
+
+        pause_fraction = self.pause_fraction
+        if pause_fraction is None:
+            pause_fraction = dask.config.get("disk-spill-quota-pause", default=0.9)
+        interval = self.interval
+        if interval is None:
+            interval = dask.config.get("disk-spill-quota-interval", default="100ms")
+        self.pause_fraction = float(pause_fraction)
+        self.worker = worker
+        pc = PeriodicCallback(
+            self.check, parse_timedelta(interval, default="ms") * 1000
+        )
+        worker.periodic_callbacks[self.name] = pc
+        pc.start()
+
+    def check(self):
+        """Pause or resume the worker depending on the disk quota in use"""
+        logger = logging.getLogger("distributed.worker")
+        worker = self.worker
+        quota = worker.data.disk_quota
+        frac = quota.fraction()
+        if frac > self.pause_fraction:
+            if not self.paused:
+                self.paused = True
+                if not worker.paused:
+                    logger.warning(
+                        "Worker is at %d%% of its disk spill quota of %s. "
+                        "Pausing worker.",
+                        int(frac * 100),
+                        format_bytes(quota.limit),
+                    )
+                    self.paused_worker = True
+                    worker.paused = True
+        elif self.paused:
+            self.paused = False
+            paused_worker, self.paused_worker = self.paused_worker, False
+            if paused_worker and worker.paused and not self.host_memory_paused():
+                logger.warning(
+                    "Worker is at %d%% of its disk spill quota of %s. "
+                    "Resuming worker.",
+                    int(frac * 100),
+                    format_bytes(quota.limit),
+                )
+                worker.paused = False
+                worker.ensure_computing()
+
+    def host_memory_paused(self) -> bool:
+        """Return whether the memory monitor would keep the worker paused
+
+        This is the case when the process memory exceeds the worker's
+        "distributed.worker.memory.pause" fraction of its memory limit.
+        """
+        worker = self.worker
+        pause_fraction = getattr(worker, "memory_pause_fraction", False)
+        if not pause_fraction or not worker.memory_limit:
+            return False
+        memory = worker.monitor.proc.memory_info().rss
+        return memory / worker.memory_limit > pause_fraction
+
+    def teardown(self, worker=None):
+        if self.worker is not None:
+            pc = worker.periodic_callbacks.pop(self.name, None)
+            if pc is not None:
+                pc.stop()
+
+
+def pin_keys(keys, dask_worker=None):
+    """Pin `keys` in the device memory of a worker, excluding them from spilling
+
+    Use with ``client.run(pin_keys, keys)``. Keys not found on the worker are
+    ignored. The worker must use either DeviceHostFile or ProxifyHostFile, see
+    ``DeviceHostFile.pin()`` and ``ProxifyHostFile.pin()``.
+
+    Returns
+    -------
+    List of the pinned keys
+    """
+    data = dask_worker.data
+    if not hasattr(data, "pin"):
+        raise TypeError(f"The data store of the worker doesn't support pinning: {data}")
+    ret = []
+    for key in keys:
+        try:
+            data.pin(key)
+        except KeyError:
+            continue
+        ret.append(key)
+    return ret
+
+
+def unpin_keys(keys, dask_worker=None):
+    """Unpin `keys` pinned by `pin_keys()`, use with ``client.run(unpin_keys, keys)``"""
+    data = dask_worker.data
+    if hasattr(data, "unpin"):
+        for key in keys:
+            data.unpin(key)
+
+
+class PinKeys:
+    """Pin the keys of tasks annotated with ``dask.annotate(pin=True)``
+
+    The keys are pinned in device memory when they are computed, see
+    `pin_keys()`. Keys that would exceed the pin limit are logged and left
+    unpinned. Does nothing on workers that don't support pinning.
+    """
+
+    def setup(self, worker=None):
+        self.worker = worker
+
+    def transition(self, key, start, finish, **kwargs):
+        if finish != "memory" or not hasattr(self.worker.data, "pin"):
+            return
+        ts = self.worker.tasks.get(key)
+        if ts is None or not (ts.annotations or {}).get("pin", False):
+            return
+        try:
+            self.worker.data.pin(key)
+        except (KeyError, ValueError) as e:
+            logging.getLogger("distributed.worker").warning(
+                "Failed to pin %s: %s", key, e
+            )
+
+
 def unpack_bitmask(x, mask_bits=64):
     """Unpack a list of integers containing bitmasks.
 
@@ -630,6 +1054,39 @@ def parse_device_memory_limit(device_memory_limit, device_index=0):
         return int(device_memory_limit)
 
 
+def parse_pin_limit(pin_limit, device_memory_limit):
+    """Parse the limit of the device memory used by pinned keys
+
+    Parameters
+    ----------
+    pin_limit: float, int, str or None
+        This can be a float (fraction of `device_memory_limit`), an integer
+        (bytes), or a string (like 5GB or 5000M). If None, the "device-pin-limit"
+        config value are used, which defaults to 0.25.
+    device_memory_limit: int
+        Number of bytes of device memory used before spilling.
+
+    Examples
+    --------
+    >>> parse_pin_limit(0.5, 1000)
+    500
+    >>> parse_pin_limit("1kB", 10000)
+    1000
+    """
+    if pin_limit is None:
+        pin_limit = dask.config.get("device-pin-limit", default=0.25)
+
+    with suppress(ValueError, TypeError):
+        pin_limit = float(pin_limit)
+        if isinstance(pin_limit, float) and pin_limit <= 1:
+            return int(device_memory_limit * pin_limit)
+
+    if isinstance(pin_limit, str):
+        return parse_bytes(pin_limit)
+    else:
+        return int(pin_limit)
+
+
 class MockWorker(Worker):
     """Mock Worker class preventing NVML from getting used by SystemMonitor.
 